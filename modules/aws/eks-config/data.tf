@@ -1,7 +1,3 @@
 data "aws_iam_policy" "ebs_csi_driver_policy" {
   name = "AmazonEBSCSIDriverPolicy"
 }
-
-data "http" "multus_yaml" {
-  url = "https://raw.githubusercontent.com/aws/amazon-vpc-cni-k8s/master/config/multus/v4.0.2-eksbuild.1/multus-daemonset-thick.yml"
-}
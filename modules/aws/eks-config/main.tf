@@ -54,8 +54,28 @@ resource "helm_release" "ebs_csi" {
   wait = false
 }
 
+# The Multus manifest is vendored under 'multus/' (see DEVELOPMENT.md), so
+# that planning does not depend on fetching it from GitHub.  The lock file
+# records where it came from and its digest, which is checked before
+# applying.  Planning fails if the manifest has not been vendored.
+locals {
+  multus_lock = jsondecode(file("${path.module}/multus/multus.json"))
+  multus_yaml = file("${path.module}/multus/multus-daemonset-thick.yml")
+}
+
 resource "kubernetes_manifest" "multus" {
-  for_each = toset(compact(split("---", data.http.multus_yaml.response_body)))
+  for_each = toset(compact(split("---", local.multus_yaml)))
+
+  lifecycle {
+    precondition {
+      condition     = sha256(local.multus_yaml) == local.multus_lock.sha256
+      error_message = <<-EOT
+      The vendored Multus manifest does not match the digest in 'multus/multus.json'.
+      Run 'python3 multus.py fetch --ref <tag-or-commit>' from the 'tests' directory
+      to re-vendor it.
+      EOT
+    }
+  }
 
   manifest = yamldecode(each.key)
 }
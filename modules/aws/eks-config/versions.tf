@@ -12,11 +12,6 @@ terraform {
       version = ">= 2.9, < 3.0"
     }
 
-    http = {
-      source  = "hashicorp/http"
-      version = ">= 3.3"
-    }
-
     kubernetes = {
       source  = "hashicorp/kubernetes"
       version = ">= 2.18"
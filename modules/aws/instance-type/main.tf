@@ -0,0 +1,33 @@
+# The properties of an instance type are fixed, so may be read from a local
+# catalog instead of querying the EC2 API on every plan, if 'use_catalog' is
+# set.  The catalog is generated and validated by tests/instance_types.py.
+
+locals {
+  catalog = jsondecode(file("${path.module}/instance-types.json"))
+
+  catalog_entry = (
+    var.use_catalog ?
+    lookup(local.catalog.instance_types, var.instance_type, null) :
+    null
+  )
+}
+
+data "aws_ec2_instance_type" "this" {
+  count = local.catalog_entry == null ? 1 : 0
+
+  instance_type = var.instance_type
+}
+
+locals {
+  props = (
+    local.catalog_entry != null ?
+    local.catalog_entry :
+    {
+      default_cores                = data.aws_ec2_instance_type.this[0].default_cores
+      default_threads_per_core     = data.aws_ec2_instance_type.this[0].default_threads_per_core
+      default_vcpus                = data.aws_ec2_instance_type.this[0].default_vcpus
+      ipv4_addresses_per_interface = data.aws_ec2_instance_type.this[0].ipv4_addresses_per_interface
+      maximum_network_interfaces   = data.aws_ec2_instance_type.this[0].maximum_network_interfaces
+    }
+  )
+}
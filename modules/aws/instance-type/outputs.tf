@@ -0,0 +1,29 @@
+output "default_cores" {
+  description = "Default number of CPU cores"
+  value       = local.props.default_cores
+}
+
+output "default_threads_per_core" {
+  description = "Default number of threads per core"
+  value       = local.props.default_threads_per_core
+}
+
+output "default_vcpus" {
+  description = "Default number of vCPUs"
+  value       = local.props.default_vcpus
+}
+
+output "ipv4_addresses_per_interface" {
+  description = "Maximum number of private IPv4 addresses per network interface"
+  value       = local.props.ipv4_addresses_per_interface
+}
+
+output "maximum_network_interfaces" {
+  description = "Maximum number of network interfaces"
+  value       = local.props.maximum_network_interfaces
+}
+
+output "from_catalog" {
+  description = "Whether the properties were read from the local catalog"
+  value       = local.catalog_entry != null
+}
@@ -1,3 +0,0 @@
-data "aws_ec2_instance_type" "this" {
-  instance_type = var.instance_type
-}
@@ -1,3 +1,10 @@
+module "instance_type" {
+  source = "../instance-type"
+
+  instance_type = var.instance_type
+  use_catalog   = var.use_catalog
+}
+
 locals {
   constants = {
     "cloud-router" = {
@@ -101,7 +108,7 @@ locals {
 
 locals {
   minimal_cpuset = (
-    data.aws_ec2_instance_type.this.default_cores < 4 ?
+    module.instance_type.default_cores < 4 ?
     null :
     "2-3"
   )
@@ -126,8 +133,8 @@ locals {
     null :
     (
       local.is_multi_numa ?
-      data.aws_ec2_instance_type.this.default_cores / 2 - 1 :
-      data.aws_ec2_instance_type.this.default_cores - 1
+      module.instance_type.default_cores / 2 - 1 :
+      module.instance_type.default_cores - 1
     )
   )
 
@@ -14,3 +14,13 @@ variable "use_case" {
     error_message = "Must be one of: 'cloud-router', 'minimal', 'maximal'."
   }
 }
+
+variable "use_catalog" {
+  description = <<-EOT
+  Read the properties of the instance type from the local catalog, rather than the EC2 API.
+  Refer to the 'instance-type' module.
+  EOT
+  type        = bool
+  default     = false
+  nullable    = false
+}
@@ -5,10 +5,12 @@ data "aws_ami" "this" {
   }
 }
 
-data "aws_ec2_instance_type" "this" {
-  instance_type = var.instance_type
+data "aws_eks_cluster" "this" {
+  name = var.cluster_name
 }
 
-data "aws_eks_cluster" "this" {
+data "aws_eks_cluster_auth" "this" {
+  count = var.wait && var.wait_method == "watch" ? 1 : 0
+
   name = var.cluster_name
 }
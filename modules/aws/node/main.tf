@@ -1,16 +1,20 @@
-# The interface handling here is non-ideal but is the best we can do.
+# There are two ways of attaching the secondary network interfaces,
+# selected by 'network_interface_attachment'.
 #
-# Ideally would cold-attach networking interfaces (i.e. attach when
-# the instances is initially launched) but the AWS CLI has some limitations
-# reflected in the Terraform resource that means this doesn't work:
-#  - Interfaces end up with the default security group.
-#  - Can't turn off source_dest_check
+# Hot-attach (the default): the interfaces are attached after the EC2
+# instance has been launched, once kubelet has started.  This requires
+# waiting for the node to be ready (see 'wait' below), and comes with a
+# drawback - no support for delete_on_termination, which means that we have
+# to wait for all the network interfaces to be destroyed before destroying
+# the instance on teardown, which can take a few minutes.
 #
-# As such, have to host-attach these after the EC2 instance has been launched.
-# This comes with its own drawback - no support for delete_on_termination,
-# which means that we have to wait for all the network interfaces to
-# be destroyed before destroying the instance on teardown, which can
-# take a few minutes.
+# Cold-attach: all the interfaces, including the primary interface, are
+# created up front with the required security groups and source_dest_check
+# disabled, and attached when the instance is launched.  (Letting the
+# instance create the interfaces doesn't work, as they end up with the
+# default security group and source_dest_check can't be turned off.)  This
+# doesn't wait for the node to be ready before attaching the interfaces, and
+# on teardown the interfaces are detached when the instance is terminated.
 
 locals {
   ami_generated_by_packer = [
@@ -36,12 +40,20 @@ locals {
   )
 }
 
+module "instance_type" {
+  source = "../instance-type"
+
+  instance_type = var.instance_type
+  use_catalog   = var.use_catalog
+}
+
 module "node_props" {
   source = "../node-props"
 
   count = local.node_props_required ? 1 : 0
 
   instance_type = var.instance_type
+  use_catalog   = var.use_catalog
   use_case      = "maximal"
 }
 
@@ -99,13 +111,16 @@ locals {
 
   # Add a 'name' label to the user-provided labels.
   # Note that this takes precedence (`merge` has right-precedence); this is
-  # because the "wait" Job below is scheduled onto this node via this label.
+  # because the "wait" Job below is scheduled onto this node via this label
+  # (and the "wait" watch looks for the node by this label).
   required_labels = {
     "ios-xr.cisco.com/name" = var.name
   }
   labels = var.labels != null ? merge(var.labels, local.required_labels) : local.required_labels
 
   kubelet_node_labels_arg = join(",", [for k, v in local.labels : "${k}=${v}"])
+
+  cold_attach = var.network_interface_attachment == "cold"
 }
 
 resource "aws_instance" "this" {
@@ -133,22 +148,35 @@ resource "aws_instance" "this" {
   }
 
   ami                         = var.ami
-  associate_public_ip_address = false
+  associate_public_ip_address = local.cold_attach ? null : false
   iam_instance_profile        = var.iam_instance_profile
   instance_type               = var.instance_type
   key_name                    = var.key_name
   placement_group             = var.placement_group
 
-  # Primary network interface.
-  subnet_id              = var.subnet_id
-  private_ip             = var.private_ip_address
-  secondary_private_ips  = var.secondary_private_ips
-  vpc_security_group_ids = var.security_groups
-  source_dest_check      = false
+  # Primary network interface, if not cold-attached.
+  subnet_id              = local.cold_attach ? null : var.subnet_id
+  private_ip             = local.cold_attach ? null : var.private_ip_address
+  secondary_private_ips  = local.cold_attach ? null : var.secondary_private_ips
+  vpc_security_group_ids = local.cold_attach ? null : var.security_groups
+  source_dest_check      = local.cold_attach ? null : false
+
+  # Cold-attached network interfaces.
+  dynamic "network_interface" {
+    for_each = local.cold_attach ? concat(
+      [aws_network_interface.primary[0].id],
+      [for ni in aws_network_interface.cold : ni.id],
+    ) : []
+
+    content {
+      device_index         = network_interface.key
+      network_interface_id = network_interface.value
+    }
+  }
 
   # Turn off SMT.
   cpu_options {
-    core_count       = data.aws_ec2_instance_type.this.default_cores
+    core_count       = module.instance_type.default_cores
     threads_per_core = 1
   }
 
@@ -195,10 +223,11 @@ resource "aws_instance" "this" {
 resource "aws_network_interface" "this" {
   # Wait for kubelet to start before attaching the network interfaces.
   depends_on = [
-    kubernetes_job.wait
+    kubernetes_job.wait,
+    terraform_data.wait,
   ]
 
-  for_each = {
+  for_each = local.cold_attach ? {} : {
     for i, ni in var.network_interfaces :
     i => ni
   }
@@ -218,10 +247,41 @@ resource "aws_network_interface" "this" {
   }
 }
 
+resource "aws_network_interface" "primary" {
+  count = local.cold_attach ? 1 : 0
+
+  lifecycle {
+    # Secondary IP addresses are assigned to the interface by the VPC CNI.
+    ignore_changes = [private_ip_list, private_ips, private_ips_count]
+  }
+
+  subnet_id               = var.subnet_id
+  private_ip_list_enabled = true
+  private_ip_list         = concat([var.private_ip_address], var.secondary_private_ips)
+  security_groups         = var.security_groups
+  source_dest_check       = false
+}
+
+resource "aws_network_interface" "cold" {
+  for_each = local.cold_attach ? {
+    for i, ni in var.network_interfaces :
+    i => ni
+  } : {}
+
+  subnet_id         = each.value.subnet_id
+  private_ips       = each.value.private_ips
+  security_groups   = each.value.security_groups
+  source_dest_check = false
+
+  tags = {
+    "node.k8s.amazonaws.com/no_manage" = "true"
+  }
+}
+
 resource "time_sleep" "wait" {
   count = var.wait ? 1 : 0
 
-  # Wait for 10 seconds before starting the node-readiness Job.
+  # Wait for 10 seconds before checking the node is ready.
   # If using an XRd-compatible AMI this should give enough time for the XRd
   # bootstrap script to run.
   create_duration = "10s"
@@ -232,7 +292,7 @@ resource "time_sleep" "wait" {
 }
 
 resource "kubernetes_job" "wait" {
-  count = var.wait ? 1 : 0
+  count = var.wait && var.wait_method == "job" ? 1 : 0
 
   metadata {
     generate_name = "wait-for-node-ready-"
@@ -270,3 +330,35 @@ resource "kubernetes_job" "wait" {
 
   wait_for_completion = true
 }
+
+# Alternatively, watch the Node object via the Kubernetes API, which returns
+# as soon as the node is Ready, without pulling an image.
+resource "terraform_data" "wait" {
+  count = var.wait && var.wait_method == "watch" ? 1 : 0
+
+  triggers_replace = time_sleep.wait[0].id
+
+  provisioner "local-exec" {
+    interpreter = ["python3"]
+    command     = "${path.module}/scripts/wait-for-node.py"
+
+    # The timeout matches the create timeout of the Job above.
+    # The token is read at plan time and expires after 15 minutes, so the
+    # script fetches a new one for the cluster (using the AWS CLI, in the
+    # cluster's region, and with the given profile and role) if it is
+    # rejected.
+    environment = merge(
+      {
+        CLUSTER_NAME   = data.aws_eks_cluster.this.name
+        CLUSTER_REGION = split(":", data.aws_eks_cluster.this.arn)[3]
+        KUBE_SERVER    = data.aws_eks_cluster.this.endpoint
+        KUBE_CA_DATA   = data.aws_eks_cluster.this.certificate_authority[0].data
+        KUBE_TOKEN     = data.aws_eks_cluster_auth.this[0].token
+        NODE_NAME      = aws_instance.this.tags["Name"]
+        TIMEOUT        = 600
+      },
+      var.wait_aws_profile != null ? { AWS_CLI_PROFILE = var.wait_aws_profile } : {},
+      var.wait_aws_role_arn != null ? { AWS_CLI_ROLE_ARN = var.wait_aws_role_arn } : {},
+    )
+  }
+}
@@ -34,7 +34,7 @@ output "isolated_cores_list" {
 
 output "network_interface" {
   description = "The primary network interface attached to the node"
-  value       = aws_network_interface.this
+  value       = local.cold_attach ? aws_network_interface.cold : aws_network_interface.this
 }
 
 output "private_ip" {
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Wait for a worker node to join the cluster and become Ready.
+
+This watches the Node objects carrying the 'ios-xr.cisco.com/name' label via
+the Kubernetes watch API, and exits as soon as a matching node is Ready.
+
+Configuration is taken from the environment (to keep the token off the
+command line):
+  KUBE_SERVER     URL of the Kubernetes API server.
+  KUBE_CA_DATA    Base64-encoded CA certificate of the API server (optional).
+  KUBE_TOKEN      Bearer token to authenticate with (optional).
+  CLUSTER_NAME    Name of the EKS cluster (optional).  If given, a new token
+                  is fetched with 'aws eks get-token' when the token is
+                  rejected, since EKS tokens expire after 15 minutes.
+  CLUSTER_REGION  AWS region of the EKS cluster (optional).
+  AWS_CLI_PROFILE AWS CLI profile to fetch a new token with (optional).
+  AWS_CLI_ROLE_ARN
+                  ARN of a role to assume to fetch a new token (optional).
+  NODE_NAME       Value of the 'ios-xr.cisco.com/name' label to wait for.
+  TIMEOUT         Seconds to wait before failing (default: 600).
+
+Only the Python standard library (and the AWS CLI, to refresh the token) is
+used.
+"""
+
+import base64
+import json
+import os
+import ssl
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+NAME_LABEL = "ios-xr.cisco.com/name"
+
+# Seconds to wait before retrying after the API server cannot be reached.
+RETRY_INTERVAL = 5
+
+
+def log(msg):
+    print(f"wait-for-node: {msg}", file=sys.stderr, flush=True)
+
+
+def is_ready(node):
+    """Check whether a Node object has the Ready condition."""
+    for condition in node.get("status", {}).get("conditions") or []:
+        if condition.get("type") == "Ready":
+            return condition.get("status") == "True"
+    return False
+
+
+class Client:
+    """Minimal client for the Kubernetes API."""
+
+    def __init__(
+        self,
+        server,
+        token=None,
+        ca_data=None,
+        cluster_name=None,
+        aws_cli_args=(),
+    ):
+        self.server = server.rstrip("/")
+        self.token = token
+        self.cluster_name = cluster_name
+        self.aws_cli_args = list(aws_cli_args)
+        self.context = None
+        if ca_data:
+            self.context = ssl.create_default_context(
+                cadata=base64.b64decode(ca_data).decode(),
+            )
+
+    def refresh_token(self):
+        """
+        Fetch a new token for the EKS cluster using the AWS CLI.
+
+        :returns:
+            True if a new token was fetched.
+
+        """
+        if not self.cluster_name:
+            return False
+        try:
+            p = subprocess.run(
+                [
+                    "aws",
+                    "eks",
+                    "get-token",
+                    "--cluster-name",
+                    self.cluster_name,
+                    "--output",
+                    "json",
+                    *self.aws_cli_args,
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.token = json.loads(p.stdout)["status"]["token"]
+        except (
+            OSError,
+            subprocess.CalledProcessError,
+            ValueError,
+            KeyError,
+        ) as e:
+            log(f"Failed to refresh token: {e}")
+            return False
+        return True
+
+    def open(self, path, params, timeout):
+        url = f"{self.server}{path}?{urllib.parse.urlencode(params)}"
+        request = urllib.request.Request(url)
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        return urllib.request.urlopen(
+            request,
+            timeout=timeout,
+            context=self.context,
+        )
+
+
+def wait_for_node(client, name, timeout):
+    """
+    Wait for the node with the given name label to be Ready.
+
+    The current nodes are listed first, then changes are watched from that
+    point on.  If the watch ends (e.g. the server times it out, or the
+    resource version has expired) then the nodes are listed again.
+
+    :returns:
+        True if the node became Ready, False if the timeout was reached.
+
+    """
+    deadline = time.monotonic() + timeout
+    params = {"labelSelector": f"{NAME_LABEL}={name}"}
+    # Whether the token has been refreshed since the last successful request.
+    refreshed = False
+
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            with client.open("/api/v1/nodes", params, remaining) as resp:
+                node_list = json.load(resp)
+            refreshed = False
+            if any(is_ready(node) for node in node_list["items"]):
+                return True
+
+            watch_params = params | {
+                "watch": "1",
+                "resourceVersion": node_list["metadata"]["resourceVersion"],
+                "timeoutSeconds": str(max(1, int(remaining))),
+            }
+            # Allow some slack for the server to end the watch itself.
+            with client.open(
+                "/api/v1/nodes",
+                watch_params,
+                remaining + RETRY_INTERVAL,
+            ) as resp:
+                for line in resp:
+                    event = json.loads(line)
+                    if event["type"] == "ERROR":
+                        log(f"Watch ended: {event['object'].get('message')}")
+                        break
+                    if event["type"] in ("ADDED", "MODIFIED") and is_ready(
+                        event["object"],
+                    ):
+                        return True
+        except urllib.error.HTTPError as e:
+            # The token may have expired, but other authorization failures
+            # will not fix themselves.
+            if e.code == 401 and not refreshed and client.refresh_token():
+                log("Token rejected, retrying with a new token")
+                refreshed = True
+                continue
+            if e.code in (401, 403):
+                raise
+            log(f"Failed to query nodes: {e}")
+            time.sleep(min(RETRY_INTERVAL, max(0, remaining)))
+        except (OSError, ValueError) as e:
+            # The API server may briefly be unreachable.
+            log(f"Failed to query nodes: {e}")
+            time.sleep(min(RETRY_INTERVAL, max(0, remaining)))
+
+    return False
+
+
+def main():
+    name = os.environ["NODE_NAME"]
+    timeout = float(os.environ.get("TIMEOUT", "600"))
+    # Fetch new tokens with the same region and credentials as Terraform,
+    # rather than whatever the AWS CLI would use by default.
+    aws_cli_args = []
+    for var, arg in (
+        ("CLUSTER_REGION", "--region"),
+        ("AWS_CLI_PROFILE", "--profile"),
+        ("AWS_CLI_ROLE_ARN", "--role-arn"),
+    ):
+        if os.environ.get(var):
+            aws_cli_args += [arg, os.environ[var]]
+    client = Client(
+        os.environ["KUBE_SERVER"],
+        token=os.environ.get("KUBE_TOKEN"),
+        ca_data=os.environ.get("KUBE_CA_DATA"),
+        cluster_name=os.environ.get("CLUSTER_NAME"),
+        aws_cli_args=aws_cli_args,
+    )
+
+    log(f"Waiting for node {name} to be Ready")
+    start = time.monotonic()
+    if not wait_for_node(client, name, timeout):
+        log(f"Timed out after {timeout:.0f}s waiting for node {name}")
+        return 1
+    log(f"Node {name} is Ready after {time.monotonic() - start:.0f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
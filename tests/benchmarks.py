@@ -0,0 +1,235 @@
+"""
+Benchmark results, baselines, and regression checks.
+
+The benchmarks in ``ut/bench`` measure how long each Terraform step takes for
+a configuration, writing the results to a JSON file.  A results file can be
+kept as a baseline, and later results compared against it::
+
+    python benchmarks.py compare BASELINE RESULTS
+
+This fails if any step has become slower than the baseline by more than a
+threshold, or if any scaling series (e.g. ``dev/flex`` at increasing node
+counts) grows superlinearly.
+
+"""
+
+__all__ = (
+    "SCHEMA_VERSION",
+    "STEPS",
+    "BenchmarkResult",
+    "compare",
+    "load_results",
+    "save_results",
+    "scaling_exponents",
+)
+
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable
+
+import cattrs
+from attrs import define, field
+
+SCHEMA_VERSION = 1
+
+STEPS = ("init", "plan", "apply", "destroy")
+
+
+@define
+class BenchmarkResult:
+    """
+    The result of benchmarking a Terraform configuration.
+
+    ..attribute:: name
+        Unique name of the benchmark.
+
+    ..attribute:: timings
+        Wall time in seconds for each step, e.g. "plan".
+
+    ..attribute:: series
+        Name of the scaling series this benchmark belongs to, if any.
+        Benchmarks in the same series differ only in their ``scale``.
+
+    ..attribute:: scale
+        Size of the configuration within its series, e.g. the node count.
+
+    """
+
+    name: str
+    timings: dict[str, float] = field(factory=dict)
+    series: str | None = None
+    scale: int | None = None
+
+
+def save_results(results: Iterable[BenchmarkResult], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": SCHEMA_VERSION,
+        "results": [cattrs.unstructure(r) for r in results],
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def load_results(path: Path) -> dict[str, BenchmarkResult]:
+    """
+    Load benchmark results.
+
+    :returns:
+        Mapping of benchmark name to result.
+
+    :raises ValueError:
+        If the results have an unexpected schema version.
+
+    """
+    data = json.loads(path.read_text())
+    if data.get("version") != SCHEMA_VERSION:
+        raise ValueError(
+            f"Unsupported results version {data.get('version')!r}, "
+            f"expected {SCHEMA_VERSION}",
+        )
+    results = cattrs.structure(data["results"], list[BenchmarkResult])
+    return {r.name: r for r in results}
+
+
+def compare(
+    baseline: dict[str, BenchmarkResult],
+    results: dict[str, BenchmarkResult],
+    *,
+    threshold: float = 1.25,
+    min_delta: float = 1.0,
+) -> list[str]:
+    """
+    Compare results against a baseline.
+
+    :param threshold:
+        Ratio of result to baseline time above which a step has regressed.
+
+    :param min_delta:
+        Minimum increase in seconds for a step to have regressed, so that
+        noise in very short steps is not flagged.
+
+    :returns:
+        A description of each regression.
+
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        for step, t in result.timings.items():
+            base_t = baseline[name].timings.get(step)
+            if base_t is None:
+                continue
+            if t > base_t * threshold and t - base_t > min_delta:
+                regressions.append(
+                    f"{name} {step}: {t:.1f}s, baseline {base_t:.1f}s "
+                    f"({t / base_t:.2f}x)",
+                )
+    return regressions
+
+
+def scaling_exponents(
+    results: Iterable[BenchmarkResult],
+) -> dict[tuple[str, str], float]:
+    """
+    Estimate how each step's time grows with scale, for each series.
+
+    This is the slope of a least-squares fit of log(time) against log(scale),
+    so is about 1 for linear growth and about 2 for quadratic growth.
+
+    :returns:
+        Mapping of (series, step) to the scaling exponent.  Series with fewer
+        than two distinct scales are omitted.
+
+    """
+    points: dict[tuple[str, str], list[tuple[float, float]]] = defaultdict(
+        list,
+    )
+    for r in results:
+        if r.series is None or not r.scale:
+            continue
+        for step, t in r.timings.items():
+            if t > 0:
+                points[(r.series, step)].append(
+                    (math.log(r.scale), math.log(t)),
+                )
+
+    exponents = {}
+    for key, ps in points.items():
+        mean_x = sum(x for x, _ in ps) / len(ps)
+        mean_y = sum(y for _, y in ps) / len(ps)
+        sxx = sum((x - mean_x) ** 2 for x, _ in ps)
+        if sxx == 0:
+            continue
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in ps)
+        exponents[key] = sxy / sxx
+    return exponents
+
+
+def _compare_main(args: Any) -> int:
+    baseline = load_results(args.baseline)
+    results = load_results(args.results)
+
+    failures = compare(
+        baseline,
+        results,
+        threshold=args.threshold,
+        min_delta=args.min_delta,
+    )
+    for (series, step), exponent in sorted(
+        scaling_exponents(results.values()).items(),
+    ):
+        print(f"{series} {step}: scaling exponent {exponent:.2f}")
+        if step in ("plan", "apply") and exponent > args.max_exponent:
+            failures.append(
+                f"{series} {step}: superlinear scaling (exponent "
+                f"{exponent:.2f} > {args.max_exponent})",
+            )
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare Terraform benchmark results",
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    compare_parser = subparsers.add_parser(
+        "compare",
+        help="Compare results against a baseline",
+    )
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("results", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown ratio above which a step has regressed",
+    )
+    compare_parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=1.0,
+        help="Minimum slowdown in seconds for a step to have regressed",
+    )
+    compare_parser.add_argument(
+        "--max-exponent",
+        type=float,
+        default=1.2,
+        help="Maximum allowed scaling exponent for plan and apply",
+    )
+    compare_parser.set_defaults(func=_compare_main)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,55 @@
 import datetime as dt
 import logging
+import os
 from pathlib import Path
 
 import pytest
 
+from timings import TIMINGS_FILE_ENV_VAR
+
 logger = logging.getLogger(__name__)
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--moto-in-process",
+        action="store_true",
+        help=(
+            "Make boto3 calls from test fixtures directly against the Moto "
+            "backends in-process, rather than over HTTP to the Moto server. "
+            "Terraform still uses the Moto server, which shares the same "
+            "backends."
+        ),
+    )
+    parser.addoption(
+        "--bench",
+        action="store_true",
+        help="Run the benchmarks in ut/bench, which are skipped by default.",
+    )
+    parser.addoption(
+        "--bench-output",
+        type=Path,
+        help=(
+            "File to write benchmark results to.  Defaults to a timestamped "
+            "file in the logs directory."
+        ),
+    )
+
+
 def pytest_configure(config: pytest.Config) -> None:
+    log_dir = Path("logs")
+    timestamp = dt.datetime.now().strftime(r"%Y%m%d_%H%M%S")
     if not config.getoption("log_file"):
-        log_dir = Path("logs")
         log_dir.mkdir(parents=True, exist_ok=True)
         (log_dir / ".gitignore").write_text("*")
-        log_file = (
-            log_dir
-            / f"xrd_terraform_tests.log.{dt.datetime.now().strftime(r'%Y%m%d_%H%M%S')}"
-        )
+        log_file = log_dir / f"xrd_terraform_tests.log.{timestamp}"
         config.option.log_file = str(log_file)
+
+    # Record the timing of each Terraform command.  This is inherited by any
+    # pytest-xdist workers, so that they all append to the same file.
+    if TIMINGS_FILE_ENV_VAR not in os.environ:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        (log_dir / ".gitignore").write_text("*")
+        os.environ[TIMINGS_FILE_ENV_VAR] = str(
+            (log_dir / f"xrd_terraform_timings.jsonl.{timestamp}").absolute(),
+        )
@@ -0,0 +1,197 @@
+"""
+Generate and validate the instance type catalog.
+
+The catalog at ``modules/aws/instance-type/instance-types.json`` records the
+properties of EC2 instance types so that the ``instance-type`` module does not
+need to query the EC2 API on every plan.
+
+Usage::
+
+    python instance_types.py generate [--region REGION]
+    python instance_types.py validate [--region REGION]
+
+"""
+
+__all__ = (
+    "CATALOG_FILE",
+    "SCHEMA_VERSION",
+    "dump_catalog",
+    "generate_catalog",
+    "load_catalog",
+    "validate_catalog",
+)
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+import boto3
+from mypy_boto3_ec2 import EC2Client
+
+CATALOG_FILE = (
+    Path(__file__).parent.parent
+    / "modules"
+    / "aws"
+    / "instance-type"
+    / "instance-types.json"
+)
+
+# Increment when the set of properties, or their meaning, changes.
+SCHEMA_VERSION = 1
+
+
+def _props(info: dict[str, Any]) -> dict[str, int | None]:
+    """
+    Extract the catalog properties from a ``DescribeInstanceTypes`` entry.
+
+    These match the attributes of the ``aws_ec2_instance_type`` data source
+    that are output by the ``instance-type`` module.
+
+    """
+    vcpu_info = info["VCpuInfo"]
+    network_info = info["NetworkInfo"]
+    return {
+        "default_cores": vcpu_info.get("DefaultCores"),
+        "default_threads_per_core": vcpu_info.get("DefaultThreadsPerCore"),
+        "default_vcpus": vcpu_info.get("DefaultVCpus"),
+        "ipv4_addresses_per_interface": network_info.get(
+            "Ipv4AddressesPerInterface",
+        ),
+        "maximum_network_interfaces": network_info.get(
+            "MaximumNetworkInterfaces",
+        ),
+    }
+
+
+def generate_catalog(ec2_client: EC2Client) -> dict[str, Any]:
+    """
+    Generate the catalog from the EC2 API.
+
+    :param ec2_client:
+        EC2 client to query.
+
+    """
+    instance_types = {}
+    paginator = ec2_client.get_paginator("describe_instance_types")
+    for page in paginator.paginate():
+        for info in page["InstanceTypes"]:
+            instance_types[info["InstanceType"]] = _props(info)
+
+    # Record where the catalog came from, so that a catalog generated from a
+    # mock EC2 API (e.g. Moto) is not mistaken for one from the real API.
+    endpoint = ec2_client.meta.endpoint_url
+    if urlparse(endpoint).hostname.endswith(".amazonaws.com"):
+        source = "ec2"
+    else:
+        source = endpoint
+    return {
+        "version": SCHEMA_VERSION,
+        "region": ec2_client.meta.region_name,
+        "source": source,
+        "instance_types": dict(sorted(instance_types.items())),
+    }
+
+
+def load_catalog(path: Path = CATALOG_FILE) -> dict[str, Any]:
+    """
+    Load the catalog.
+
+    :raises ValueError:
+        If the catalog has an unexpected schema version.
+
+    """
+    catalog = json.loads(path.read_text())
+    if catalog.get("version") != SCHEMA_VERSION:
+        raise ValueError(
+            f"Unsupported catalog version {catalog.get('version')!r}, "
+            f"expected {SCHEMA_VERSION}",
+        )
+    return catalog
+
+
+def dump_catalog(catalog: dict[str, Any], path: Path = CATALOG_FILE) -> None:
+    """
+    Write the catalog.
+
+    Each instance type is written on a single line so that diffs between
+    versions of the catalog are easy to review.
+
+    """
+    lines = [
+        "{",
+        f'  "version": {json.dumps(catalog["version"])},',
+        f'  "region": {json.dumps(catalog["region"])},',
+        f'  "source": {json.dumps(catalog.get("source"))},',
+        '  "instance_types": {',
+    ]
+    entries = [
+        f"    {json.dumps(k)}: {json.dumps(v, sort_keys=True)}"
+        for k, v in catalog["instance_types"].items()
+    ]
+    lines.append(",\n".join(entries))
+    lines += ["  }", "}"]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def validate_catalog(
+    catalog: dict[str, Any],
+    ec2_client: EC2Client,
+) -> list[str]:
+    """
+    Check the catalog against the EC2 API.
+
+    Instance types that are not in the catalog are not an error, since the
+    module falls back to querying the EC2 API for these.  Likewise instance
+    types that are not offered in the queried region are skipped.
+
+    :param catalog:
+        The catalog to validate.
+
+    :param ec2_client:
+        EC2 client to query.
+
+    :returns:
+        A description of each discrepancy found.
+
+    """
+    errors = []
+    expected = generate_catalog(ec2_client)["instance_types"]
+    for instance_type, props in catalog["instance_types"].items():
+        if instance_type not in expected:
+            continue
+        if props != expected[instance_type]:
+            errors.append(
+                f"{instance_type}: expected {expected[instance_type]}, "
+                f"got {props}",
+            )
+    return errors
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("action", choices=("generate", "validate"))
+    parser.add_argument("--region", help="AWS region to query")
+    parser.add_argument(
+        "--catalog",
+        type=Path,
+        default=CATALOG_FILE,
+        help="Path to the catalog",
+    )
+    args = parser.parse_args(argv)
+
+    ec2_client = boto3.client("ec2", region_name=args.region)
+    if args.action == "generate":
+        dump_catalog(generate_catalog(ec2_client), args.catalog)
+        return 0
+
+    errors = validate_catalog(load_catalog(args.catalog), ec2_client)
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Vendor and verify the Multus manifest.
+
+The ``eks-config`` module installs Multus from the manifest vendored at
+``modules/aws/eks-config/multus/``, rather than fetching it from GitHub on
+every plan.  The lock file ``multus.json`` records the manifest's version,
+the tag or commit of amazon-vpc-cni-k8s it was fetched from, its source URL,
+SHA-256 digest and the objects it contains.
+
+Usage::
+
+    python multus.py fetch [--version VERSION] [--ref TAG_OR_COMMIT]
+    python multus.py verify
+
+"""
+
+__all__ = (
+    "LOCK_FILE",
+    "MANIFEST_FILE",
+    "URL_TEMPLATE",
+    "fetch",
+    "load_lock",
+    "split_documents",
+    "validate_documents",
+    "verify",
+)
+
+import argparse
+import hashlib
+import json
+import sys
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+MULTUS_DIR = (
+    Path(__file__).parent.parent / "modules" / "aws" / "eks-config" / "multus"
+)
+LOCK_FILE = MULTUS_DIR / "multus.json"
+MANIFEST_FILE = MULTUS_DIR / "multus-daemonset-thick.yml"
+
+URL_TEMPLATE = (
+    "https://raw.githubusercontent.com/aws/amazon-vpc-cni-k8s/{ref}/config"
+    "/multus/{version}/multus-daemonset-thick.yml"
+)
+
+# Branches of amazon-vpc-cni-k8s, which must not be fetched from since the
+# manifest at these may change.
+_BRANCHES = ("main", "master")
+
+
+def split_documents(text: str) -> list[str]:
+    """
+    Split the manifest into documents, in the same way as the module.
+
+    This mirrors ``compact(split("---", ...))`` in Terraform, so each
+    document is exactly the key of a ``kubernetes_manifest`` resource.
+
+    """
+    return [doc for doc in text.split("---") if doc]
+
+
+def validate_documents(text: str) -> list[str]:
+    """
+    Check each document of the manifest is a Kubernetes object.
+
+    :param text:
+        The manifest.
+
+    :raises ValueError:
+        If a document is not a Kubernetes object (including if it is empty,
+        which would fail to decode in Terraform).
+
+    :returns:
+        The objects in the manifest, as '<kind>/<name>'.
+
+    """
+    objects = []
+    for i, doc in enumerate(split_documents(text)):
+        try:
+            obj = yaml.safe_load(doc)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Document {i} is not valid YAML: {e}") from e
+        if not isinstance(obj, dict):
+            raise ValueError(f"Document {i} is not a mapping: {obj!r}")
+        name = (obj.get("metadata") or {}).get("name")
+        if not obj.get("apiVersion") or not obj.get("kind") or not name:
+            raise ValueError(
+                f"Document {i} is missing apiVersion, kind or metadata.name",
+            )
+        objects.append(f"{obj['kind']}/{name}")
+    return objects
+
+
+def load_lock(path: Path = LOCK_FILE) -> dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+def fetch(
+    version: str | None = None,
+    ref: str | None = None,
+    *,
+    lock_file: Path = LOCK_FILE,
+    manifest_file: Path = MANIFEST_FILE,
+) -> dict[str, Any]:
+    """
+    Download and vendor the manifest, updating the lock file.
+
+    :param version:
+        Multus version to vendor, defaulting to the version in the lock file.
+
+    :param ref:
+        Tag or commit of amazon-vpc-cni-k8s to fetch the manifest from,
+        defaulting to the ref in the lock file.
+
+    :raises ValueError:
+        If no ref is given or locked, or the ref is a branch.
+        If the downloaded manifest is not valid.
+
+    :returns:
+        The updated lock.
+
+    """
+    lock = load_lock(lock_file)
+    if ref in _BRANCHES:
+        raise ValueError(f"Ref must be a tag or commit, not branch {ref!r}")
+    if version is not None or ref is not None or not lock.get("url"):
+        lock["version"] = version or lock["version"]
+        lock["ref"] = ref or lock.get("ref")
+        if not lock["ref"]:
+            raise ValueError(
+                "A tag or commit of amazon-vpc-cni-k8s to fetch from must be "
+                "given",
+            )
+        lock["url"] = URL_TEMPLATE.format(
+            ref=lock["ref"],
+            version=lock["version"],
+        )
+
+    with urllib.request.urlopen(lock["url"], timeout=60) as resp:
+        content = resp.read()
+
+    # Validate before writing anything, so a bad download is not vendored.
+    objects = validate_documents(content.decode())
+    lock["sha256"] = hashlib.sha256(content).hexdigest()
+    lock["documents"] = objects
+
+    manifest_file.write_bytes(content)
+    lock_file.write_text(json.dumps(lock, indent=2) + "\n")
+    return lock
+
+
+def verify(
+    *,
+    lock_file: Path = LOCK_FILE,
+    manifest_file: Path = MANIFEST_FILE,
+) -> list[str]:
+    """
+    Check the vendored manifest against the lock file.
+
+    :returns:
+        A description of each problem found.
+
+    """
+    lock = load_lock(lock_file)
+    if not lock.get("sha256") or not manifest_file.exists():
+        return [f"{manifest_file.name} has not been vendored"]
+
+    content = manifest_file.read_bytes()
+    errors = []
+    digest = hashlib.sha256(content).hexdigest()
+    if digest != lock["sha256"]:
+        errors.append(f"Expected digest {lock['sha256']}, got {digest}")
+    try:
+        objects = validate_documents(content.decode())
+    except ValueError as e:
+        errors.append(str(e))
+    else:
+        if objects != lock["documents"]:
+            errors.append(
+                f"Expected documents {lock['documents']}, got {objects}",
+            )
+    return errors
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    fetch_parser = subparsers.add_parser("fetch", help="Vendor the manifest")
+    fetch_parser.add_argument("--version", help="Multus version to vendor")
+    fetch_parser.add_argument(
+        "--ref",
+        help="Tag or commit of amazon-vpc-cni-k8s to fetch from",
+    )
+    subparsers.add_parser("verify", help="Verify the vendored manifest")
+    args = parser.parse_args(argv)
+
+    if args.action == "fetch":
+        lock = fetch(args.version, args.ref)
+        print(f"Vendored Multus {lock['version']} ({lock['sha256']})")
+        return 0
+
+    errors = verify()
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
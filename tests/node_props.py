@@ -0,0 +1,242 @@
+"""
+Reference implementation of the ``modules/aws/node-props`` Terraform module.
+
+This mirrors the logic in ``modules/aws/node-props/main.tf`` exactly,
+including Terraform's handling of numbers and null values, so that the
+properties for every instance type in a catalog can be checked at once
+rather than with one Terraform run per instance type.
+
+Any change to the Terraform module must be reflected here; the tests in
+``ut/test_node_props.py`` cross-check the two.
+
+"""
+
+__all__ = (
+    "NodeProps",
+    "node_props",
+    "node_props_table",
+)
+
+import math
+from typing import Any, Iterable, Mapping
+
+from attrs import frozen
+
+# Refer to `local.constants`.
+CONSTANTS = {
+    "cloud-router": {
+        "m5.2xlarge": {"cpuset": "2-3", "hugepages_gb": 6},
+        "m5n.2xlarge": {"cpuset": "2-3", "hugepages_gb": 6},
+        "m5.12xlarge": {"cpuset": "7-23", "hugepages_gb": 6},
+        "m5n.12xlarge": {"cpuset": "7-23", "hugepages_gb": 6},
+        "m5.24xlarge": {"cpuset": "7-23", "hugepages_gb": 6},
+        "m5n.24xlarge": {"cpuset": "7-23", "hugepages_gb": 6},
+        "m6in.16xlarge": {"cpuset": "15-31", "hugepages_gb": 6},
+        "m6in.24xlarge": {"cpuset": "7-23", "hugepages_gb": 6},
+        "m6in.32xlarge": {"cpuset": "15-31", "hugepages_gb": 6},
+    },
+}
+
+# Refer to `local.multi_numa_instance_types`.
+MULTI_NUMA_INSTANCE_TYPES = {
+    "m5": ["m5.16xlarge", "m5.24xlarge"],
+    "m5n": ["m5n.16xlarge", "m5n.24xlarge"],
+    "m5zn": ["m5zn.12xlarge"],
+    "m6in": ["m6in.24xlarge", "m6in.32xlarge"],
+    "m6a": ["m6a.32xlarge", "m6a.48xlarge"],
+    "m7i": ["m7i.48xlarge"],
+}
+
+# Refer to `local.cpus_to_cp_num_cpus` and `local.max_cp_num_cpus`.
+CPUS_TO_CP_NUM_CPUS = {0: 0, 1: 0, 2: 0, 3: 1, 4: 2, 5: 2, 6: 2, 7: 3}
+MAX_CP_NUM_CPUS = 4
+
+MINIMAL_HUGEPAGES_GB = 6
+MAXIMAL_HUGEPAGES_GB = 6
+
+USE_CASES = ("cloud-router", "minimal", "maximal")
+
+Number = int | float
+
+
+def _to_string(n: Number) -> str:
+    """Convert a number to a string as Terraform does."""
+    if isinstance(n, float) and n.is_integer():
+        n = int(n)
+    return str(n)
+
+
+def _to_number(s: str) -> Number:
+    """Convert a string to a number as Terraform does."""
+    n = float(s)
+    return int(n) if n.is_integer() else n
+
+
+def _range(start: Number, limit: Number) -> list[Number]:
+    """Terraform's ``range`` function, with a step of 1."""
+    return [start + i for i in range(max(0, math.ceil(limit - start)))]
+
+
+def _is_multi_numa(instance_type: str) -> bool | None:
+    """
+    Is the given instance type multi NUMA?
+
+    This is None if we cannot recognize the instance type.
+
+    """
+    family = instance_type.split(".")[0]
+    if family not in MULTI_NUMA_INSTANCE_TYPES:
+        return None
+    return instance_type in MULTI_NUMA_INSTANCE_TYPES[family]
+
+
+def _split_range(s: str) -> tuple[Number, Number]:
+    start, end = s.split("-")[:2]
+    return _to_number(start), _to_number(end)
+
+
+@frozen
+class NodeProps:
+    """
+    Outputs of the ``node-props`` module for one instance type.
+
+    Refer to ``modules/aws/node-props/outputs.tf``.
+
+    """
+
+    cp_num_cpus: int
+    cpuset: str | None
+    hugepages_gb: int
+    isolated_cores: str | None
+    isolated_cores_list: list[Number] | None
+
+
+def node_props(
+    instance_type: str,
+    default_cores: int | None,
+    use_case: str = "maximal",
+) -> NodeProps:
+    """
+    Compute the ``node-props`` module outputs for an instance type.
+
+    :param instance_type:
+        The instance type.
+
+    :param default_cores:
+        The default number of cores for the instance type, as output by the
+        ``instance-type`` module.
+        This may be None if not reported, which Terraform treats as 0.
+
+    :param use_case:
+        One of "cloud-router", "minimal", or "maximal".
+
+    :raises ValueError:
+        If the use case is not valid.
+
+    """
+    if use_case not in USE_CASES:
+        raise ValueError(f"Must be one of: {', '.join(USE_CASES)}")
+
+    default_cores = default_cores or 0
+    constants = CONSTANTS.get(use_case, {}).get(instance_type)
+
+    minimal_cpuset = None if default_cores < 4 else "2-3"
+
+    is_multi_numa = _is_multi_numa(instance_type)
+
+    if minimal_cpuset is None or is_multi_numa is None:
+        maximal_cpuset = None
+    elif is_multi_numa:
+        maximal_cpuset = f"2-{_to_string(default_cores / 2 - 1)}"
+    else:
+        maximal_cpuset = f"2-{_to_string(default_cores - 1)}"
+
+    if constants:
+        cpuset = constants["cpuset"]
+    elif use_case == "minimal":
+        cpuset = minimal_cpuset
+    else:
+        cpuset = maximal_cpuset
+
+    cpuset_list = None
+    if cpuset is not None:
+        start, end = _split_range(cpuset)
+        cpuset_list = _range(start, end + 1)
+
+    if cpuset_list is None:
+        cp_num_cpus = MAX_CP_NUM_CPUS
+    else:
+        cp_num_cpus = CPUS_TO_CP_NUM_CPUS.get(
+            len(cpuset_list),
+            MAX_CP_NUM_CPUS,
+        )
+
+    isolated_cores_list = None
+    if cpuset_list:
+        isolated_cores_list = _range(
+            cpuset_list[0] + cp_num_cpus,
+            cpuset_list[-1] + 1,
+        )
+
+    isolated_cores = None
+    if isolated_cores_list:
+        isolated_cores = (
+            f"{_to_string(isolated_cores_list[0])}"
+            f"-{_to_string(isolated_cores_list[-1])}"
+        )
+
+    if constants:
+        hugepages_gb = constants["hugepages_gb"]
+    elif use_case == "minimal":
+        hugepages_gb = MINIMAL_HUGEPAGES_GB
+    else:
+        hugepages_gb = MAXIMAL_HUGEPAGES_GB
+
+    return NodeProps(
+        cp_num_cpus=cp_num_cpus,
+        cpuset=cpuset,
+        hugepages_gb=hugepages_gb,
+        isolated_cores=isolated_cores,
+        isolated_cores_list=isolated_cores_list,
+    )
+
+
+def node_props_table(
+    catalog: Mapping[str, Mapping[str, Any]],
+    use_cases: Iterable[str] = USE_CASES,
+) -> dict[tuple[str, str], NodeProps]:
+    """
+    Compute the ``node-props`` module outputs for a catalog of instance types.
+
+    The outputs depend only on the use case, the default number of cores, and
+    the per-instance-type tables, so instance types which agree on all of
+    these share a single computation.
+
+    :param catalog:
+        Mapping of instance type to its properties, as in the
+        ``instance_types`` of a catalog from `instance_types.load_catalog` or
+        `instance_types.generate_catalog`.
+
+    :param use_cases:
+        The use cases to compute the outputs for.
+
+    :returns:
+        Mapping of (instance type, use case) to the module outputs.
+
+    """
+    cache: dict[tuple, NodeProps] = {}
+    table = {}
+    for use_case in use_cases:
+        for instance_type, props in catalog.items():
+            default_cores = props["default_cores"]
+            has_constants = instance_type in CONSTANTS.get(use_case, {})
+            key = (
+                use_case,
+                default_cores or 0,
+                _is_multi_numa(instance_type),
+                instance_type if has_constants else None,
+            )
+            if key not in cache:
+                cache[key] = node_props(instance_type, default_cores, use_case)
+            table[(instance_type, use_case)] = cache[key]
+    return table
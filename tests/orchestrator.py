@@ -0,0 +1,278 @@
+"""
+Bring up and tear down multi-stage Terraform deployments concurrently.
+
+A deployment is made up of Terraform stages (e.g. the bootstrap, infra and
+workload configurations of an example), plus any other tasks the stages
+depend on (e.g. finding or building an AMI).  Dependencies between stages are
+read from their local ``terraform_remote_state`` data sources, so each stage
+starts as soon as the stages whose state it reads have been applied.
+
+"""
+
+__all__ = (
+    "Deployment",
+    "Stage",
+    "Task",
+)
+
+import asyncio
+import logging
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from attrs import define, field
+
+from terraform import AsyncTerraform
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class Stage:
+    """
+    A Terraform configuration to apply as part of a deployment.
+
+    ..attribute:: name
+        Unique name of the stage.
+
+    ..attribute:: tf
+        The Terraform configuration.
+
+    ..attribute:: vars
+        Variables to apply and destroy the configuration with.
+
+    ..attribute:: after
+        Names of stages or tasks that must complete before this stage is
+        applied, in addition to those found from its remote state.
+
+    """
+
+    name: str
+    tf: AsyncTerraform
+    vars: dict[str, Any] | None = None
+    after: tuple[str, ...] = ()
+
+    @property
+    def state_path(self) -> Path:
+        """Path to the stage's local state."""
+        return (
+            self.tf.state_file or self.tf.working_dir / "terraform.tfstate"
+        ).resolve()
+
+    def remote_state_paths(self) -> set[Path]:
+        """Get the paths of the local remote states the stage reads."""
+        return {
+            path.resolve() for path in self.tf.remote_state_paths().values()
+        }
+
+
+@define
+class Task:
+    """
+    A non-Terraform step of a deployment, run when bringing it up.
+
+    ..attribute:: name
+        Unique name of the task.
+
+    ..attribute:: func
+        Coroutine function to run the task.
+
+    """
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+
+
+@define
+class Deployment:
+    """
+    A set of stages and tasks, and the dependencies between them.
+
+    ..attribute:: stages
+        The Terraform stages.
+
+    ..attribute:: tasks
+        Other tasks the stages depend on.
+
+    """
+
+    stages: list[Stage]
+    tasks: list[Task] = field(factory=list)
+
+    def dependencies(self) -> dict[str, set[str]]:
+        """
+        Get the dependencies of each stage and task.
+
+        :raises ValueError:
+            If a stage depends on an unknown stage or task, or the
+            dependencies are cyclic.
+
+        """
+        by_state = {stage.state_path: stage.name for stage in self.stages}
+        names = {s.name for s in self.stages} | {t.name for t in self.tasks}
+
+        deps: dict[str, set[str]] = {task.name: set() for task in self.tasks}
+        for stage in self.stages:
+            deps[stage.name] = set(stage.after)
+            for path in stage.remote_state_paths():
+                if path in by_state:
+                    deps[stage.name].add(by_state[path])
+            if unknown := deps[stage.name] - names:
+                raise ValueError(
+                    f"Stage {stage.name} depends on unknown {unknown}",
+                )
+
+        # Check for cycles, using the order that would be needed to apply.
+        self._order(deps)
+        return deps
+
+    @staticmethod
+    def _order(deps: dict[str, set[str]]) -> list[str]:
+        order = []
+        remaining = {name: set(d) for name, d in deps.items()}
+        while remaining:
+            ready = sorted(n for n, d in remaining.items() if not d)
+            if not ready:
+                raise ValueError(
+                    f"Cyclic dependencies between {sorted(remaining)}",
+                )
+            for name in ready:
+                del remaining[name]
+                for d in remaining.values():
+                    d.discard(name)
+            order.extend(ready)
+        return order
+
+    async def init(self, *, upgrade: bool = False) -> None:
+        """Initialize all stages concurrently."""
+        results = await asyncio.gather(
+            *(stage.tf.init(upgrade=upgrade) for stage in self.stages),
+            return_exceptions=True,
+        )
+        if excs := [r for r in results if isinstance(r, BaseException)]:
+            raise ExceptionGroup("Failed to initialize stages", excs)
+
+    async def _run_graph(
+        self,
+        deps: dict[str, set[str]],
+        funcs: dict[str, Callable[[], Awaitable[Any]]],
+        action: str,
+    ) -> None:
+        """
+        Run each step once all of its dependencies have completed.
+
+        If a step fails then the steps which depend on it are not run, but
+        all independent steps run to completion.
+
+        """
+        done = {name: asyncio.Event() for name in deps}
+        failed: set[str] = set()
+
+        async def run(name: str) -> None:
+            for dep in deps[name]:
+                await done[dep].wait()
+            try:
+                if skipped := deps[name] & failed:
+                    logger.info(
+                        "Not running %s of %s: %s failed",
+                        action,
+                        name,
+                        ", ".join(sorted(skipped)),
+                    )
+                    failed.add(name)
+                    return
+                logger.info("Starting %s of %s", action, name)
+                try:
+                    await funcs[name]()
+                except Exception:
+                    failed.add(name)
+                    raise
+                logger.info("Completed %s of %s", action, name)
+            finally:
+                done[name].set()
+
+        results = await asyncio.gather(
+            *(run(name) for name in deps),
+            return_exceptions=True,
+        )
+        if excs := [r for r in results if isinstance(r, BaseException)]:
+            raise ExceptionGroup(f"Failed to {action} deployment", excs)
+
+    @staticmethod
+    async def _apply_stage(
+        stage: Stage,
+        *,
+        fast: bool,
+        destroy_failed: bool,
+    ) -> None:
+        try:
+            await stage.tf.apply(vars=stage.vars, fast=fast)
+        except Exception:
+            if destroy_failed:
+                logger.error("Apply of %s failed, destroying it", stage.name)
+                try:
+                    await stage.tf.destroy(vars=stage.vars)
+                except Exception:
+                    logger.exception("Failed to destroy %s", stage.name)
+            raise
+
+    async def apply(
+        self,
+        *,
+        fast: bool = False,
+        destroy_failed: bool = False,
+    ) -> None:
+        """
+        Run the tasks and apply the stages, as concurrently as possible.
+
+        :param fast:
+            Skip or speed up applying unchanged stages.  Refer to
+            `AsyncTerraform.apply`.
+
+        :param destroy_failed:
+            Destroy each stage which fails to apply.  Stages which have been
+            applied are left in place, so that the deployment can be resumed.
+
+        :raises ExceptionGroup:
+            If any task or stage fails.
+
+        """
+        funcs: dict[str, Callable[[], Awaitable[Any]]] = {
+            task.name: task.func for task in self.tasks
+        }
+        for stage in self.stages:
+            funcs[stage.name] = partial(
+                self._apply_stage,
+                stage,
+                fast=fast,
+                destroy_failed=destroy_failed,
+            )
+        await self._run_graph(self.dependencies(), funcs, "apply")
+
+    async def destroy(self) -> None:
+        """
+        Destroy the stages, as concurrently as possible.
+
+        Each stage is destroyed only once every stage that depends on it has
+        been destroyed.
+
+        :raises ExceptionGroup:
+            If any stage fails to be destroyed.
+
+        """
+        stage_names = {stage.name for stage in self.stages}
+        reverse_deps: dict[str, set[str]] = {
+            name: set() for name in stage_names
+        }
+        for name, deps in self.dependencies().items():
+            if name not in stage_names:
+                continue
+            for dep in deps & stage_names:
+                reverse_deps[dep].add(name)
+
+        funcs: dict[str, Callable[[], Awaitable[Any]]] = {
+            stage.name: partial(stage.tf.destroy, vars=stage.vars)
+            for stage in self.stages
+        }
+        await self._run_graph(reverse_deps, funcs, "destroy")
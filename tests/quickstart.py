@@ -0,0 +1,213 @@
+"""
+Bring up or tear down the overlay example, running steps concurrently.
+
+This is the implementation of ``aws-quickstart --parallel``.  Unlike the
+default serial pipeline, all Terraform configurations are initialized at
+once, and finding (or building) the AMI overlaps with applying the bootstrap
+configuration.
+
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+from orchestrator import Deployment, Stage, Task
+from terraform import AsyncTerraform
+from utils import run_cmd_async
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+KUBERNETES_VERSIONS = (
+    "1.26",
+    "1.27",
+    "1.28",
+    "1.29",
+    "1.30",
+    "1.31",
+    "1.32",
+    "1.33",
+)
+
+
+async def _run_packer(kubernetes_version: str) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        packer_dir = Path(tmpdir) / "xrd-packer"
+        await run_cmd_async(
+            [
+                "git",
+                "clone",
+                "https://github.com/ios-xr/xrd-packer",
+                str(packer_dir),
+            ],
+        )
+        await run_cmd_async(["packer", "init", "."], cwd=packer_dir)
+        await run_cmd_async(
+            [
+                "packer",
+                "build",
+                "-var",
+                f"kubernetes_version={kubernetes_version}",
+                "amazon-ebs.pkr.hcl",
+            ],
+            cwd=packer_dir,
+        )
+
+
+async def ensure_ami_exists(kubernetes_version: str) -> None:
+    """Build an XRd AMI for the Kubernetes version, if there is not one."""
+    p = await run_cmd_async(
+        [
+            "aws",
+            "ec2",
+            "describe-images",
+            "--filters",
+            "Name=tag:Generated_By,Values=xrd-packer",
+            f"Name=tag:Kubernetes_Version,Values={kubernetes_version}",
+            "--query",
+            "Images[*].[ImageId]",
+            "--output",
+            "text",
+        ],
+    )
+    if p.stdout.strip():
+        logger.info("Found AMI %s", p.stdout.split()[0])
+        return
+    logger.info("No AMI found, building one with Packer")
+    await _run_packer(kubernetes_version)
+
+
+def deployment(args: argparse.Namespace) -> Deployment:
+    examples_dir = ROOT_DIR / "examples"
+    if args.bastion_remote_access_cidr_blocks in (None, "null"):
+        bastion_cidr_blocks = None
+    else:
+        bastion_cidr_blocks = args.bastion_remote_access_cidr_blocks.split(",")
+
+    bootstrap_vars = {"bastion_remote_access_cidr_blocks": bastion_cidr_blocks}
+    if not args.destroy:
+        bootstrap_vars["cluster_version"] = args.kubernetes_version
+
+    stages = [
+        Stage(
+            "bootstrap",
+            AsyncTerraform(examples_dir / "bootstrap"),
+            vars=bootstrap_vars,
+        ),
+        Stage(
+            "infra",
+            AsyncTerraform(examples_dir / "overlay" / "infra"),
+            vars={"node_ami": args.ami} if args.ami else None,
+            after=() if args.ami else ("ami",),
+        ),
+        Stage(
+            "workload",
+            AsyncTerraform(examples_dir / "overlay" / "workload"),
+            # The XR credentials are not needed to destroy the workload, but
+            # the variables are not nullable.
+            vars={
+                "xr_root_user": "" if args.destroy else args.username,
+                "xr_root_password": "" if args.destroy else args.password,
+            },
+        ),
+    ]
+    tasks = []
+    if not args.ami:
+        tasks.append(
+            Task("ami", lambda: ensure_ami_exists(args.kubernetes_version)),
+        )
+    return Deployment(stages, tasks)
+
+
+async def apply(d: Deployment, fast: bool = False) -> None:
+    """
+    Bring up the deployment.
+
+    As with the serial pipeline, only the stages that fail are destroyed, so
+    rerunning resumes from them.
+
+    """
+    await d.init()
+    await d.apply(fast=fast, destroy_failed=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-u", "--username", help="XR username")
+    parser.add_argument("-p", "--password", help="XR password")
+    parser.add_argument(
+        "-b",
+        "--bastion-remote-access-cidr-blocks",
+        help="IPv4 CIDR blocks to allow SSH access to the Bastion instance",
+    )
+    parser.add_argument(
+        "-a",
+        "--ami",
+        help="AMI ID of an image used to launch the EKS worker nodes",
+    )
+    parser.add_argument(
+        "-d",
+        "--destroy",
+        action="store_true",
+        help="Destroy the workload and infrastructure",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help=(
+            "Skip stages which are unchanged since they were last applied, "
+            "and apply changed stages without refreshing existing resources"
+        ),
+    )
+    parser.add_argument(
+        "--kubernetes-version",
+        choices=KUBERNETES_VERSIONS,
+        default="1.33",
+        help="Kubernetes version to use",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Show the output of each Terraform command",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.destroy:
+        for arg in (
+            "username",
+            "password",
+            "bastion_remote_access_cidr_blocks",
+        ):
+            if not getattr(args, arg):
+                parser.error(f"--{arg.replace('_', '-')} must be specified")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(message)s",
+    )
+
+    d = deployment(args)
+    if args.destroy:
+        asyncio.run(d.destroy())
+        print("Destroy complete!")
+        return 0
+
+    asyncio.run(apply(d, args.fast))
+    print("Apply complete!")
+    outputs = asyncio.run(d.stages[-1].tf.outputs())
+    cluster_name = outputs["cluster_name"]["value"]
+    print(
+        f"Run 'aws eks update-kubeconfig --name {cluster_name}' to configure "
+        f"kubectl so that you can connect to the cluster.",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,171 @@
 __all__ = (
+    "AsyncTerraform",
     "Terraform",
     "TerraformOutputs",
+    "UNKNOWN",
+    "VarFile",
+    "read_state_outputs",
+    "run_concurrently",
 )
 
+import asyncio
+import copy
+import fcntl
+import hashlib
 import json
 import logging
 import os
+import re
 import subprocess
-from functools import partial
+from contextlib import contextmanager
+from functools import cache, partial
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import Any, Mapping
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    TypeVar,
+)
 
 import cattrs
-from attrs import NOTHING, define, fields
+from attrs import NOTHING, define, field, fields
 from cattrs.errors import ForbiddenExtraKeysError
 
-from utils import run_cmd
+from timings import CommandTimer, default_timings_file
+from utils import run_cmd, run_cmd_async
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+# Matches local module sources, e.g. `source = "../../modules/aws/node"`.
+_LOCAL_MODULE_SOURCE_RE = re.compile(
+    r'^\s*source\s*=\s*"(\.{1,2}/[^"]*)"',
+    re.MULTILINE,
+)
+
+
+# Matches local remote state data sources, e.g.
+#   data "terraform_remote_state" "infra" {
+#     backend = "local"
+#     config = {
+#       path = "${path.root}/../infra/terraform.tfstate"
+#     }
+#   }
+_REMOTE_STATE_RE = re.compile(
+    r'data\s+"terraform_remote_state"\s+"(?P<name>[^"]+)"\s*\{\s*'
+    r'backend\s*=\s*"local"\s*'
+    r"config\s*=\s*\{\s*"
+    r'path\s*=\s*"\$\{path\.(?:root|module)\}/(?P<path>[^"]*)"',
+)
+
+# Matches the serial and lineage in the header of a state file.
+_STATE_SERIAL_RE = re.compile(rb'"serial":\s*(\d+)')
+_STATE_LINEAGE_RE = re.compile(rb'"lineage":\s*"([^"]+)"')
+
+
+def read_state_outputs(state_file: Path) -> dict[str, Any]:
+    """
+    Read the outputs from a local state file.
+
+    :param state_file:
+        Path to the state file.
+
+    :raises ValueError:
+        If the state file has an unsupported format.
+
+    :returns:
+        The outputs, in the format of ``terraform output -json``.
+
+    """
+    state = json.loads(state_file.read_text())
+    if state.get("version") != 4:
+        raise ValueError(
+            f"Unsupported state version {state.get('version')!r}",
+        )
+    return {
+        name: {
+            "sensitive": output.get("sensitive", False),
+            "type": output["type"],
+            "value": output["value"],
+        }
+        for name, output in state.get("outputs", {}).items()
+    }
+
+
+def _hash_files(paths: Iterable[Path]) -> str:
+    """Hash the paths and contents of files."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(str(path).encode())
+        h.update(b"\0")
+        h.update(path.read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _read_state_version(state_file: Path) -> tuple[str, int] | None:
+    """
+    Get the lineage and serial of a state file, from its header.
+
+    Terraform writes these before the (potentially large) outputs and
+    resources, so only the start of the file is read.
+
+    """
+    with open(state_file, "rb") as f:
+        header = f.read(1024)
+    serial = _STATE_SERIAL_RE.search(header)
+    lineage = _STATE_LINEAGE_RE.search(header)
+    if not serial or not lineage:
+        return None
+    return lineage[1].decode(), int(serial[1])
+
+
+def _default_plugin_cache_dir() -> Path:
+    """
+    Get the default shared provider plugin cache directory.
+
+    This respects the ``TF_PLUGIN_CACHE_DIR`` environment variable, falling
+    back to a directory alongside this file so that it is shared by all
+    Terraform configurations under test.
+
+    """
+    if d := os.environ.get("TF_PLUGIN_CACHE_DIR"):
+        return Path(d)
+    return Path(__file__).parent / ".terraform.d" / "plugin-cache"
+
+
+@define(frozen=True)
+class VarFile:
+    """
+    A var file, as written by `_TerraformBase.var_file`.
+
+    ..attribute:: path
+        Path to the var file.
+
+    ..attribute:: digest
+        SHA-256 digest of the var file, which identifies its contents.
+
+    """
+
+    path: Path
+    digest: str
+
+    @property
+    def args(self) -> list[str]:
+        """Arguments to pass to Terraform to use the var file."""
+        return [f"-var-file={self.path.absolute()}"]
+
 
 @define
-class Terraform:
+class _TerraformBase:
     """
-    Wrapper for the Terraform CLI.
+    Functionality common to `Terraform` and `AsyncTerraform`.
 
     ..attribute:: working_dir
         Terraform working directory.
@@ -36,11 +177,528 @@ class Terraform:
         Terraform data directory.
         Refer to https://developer.hashicorp.com/terraform/cli/config/environment-variables#tf_data_dir.
 
+    ..attribute:: state_file
+        Path to the local state file, if not the default.
+        This allows several copies of the same configuration to be applied
+        concurrently.
+
+    ..attribute:: plugin_cache_dir
+        Provider plugin cache directory, shared between configurations.
+        Refer to https://developer.hashicorp.com/terraform/cli/config/config-file#provider-plugin-cache.
+
+    ..attribute:: timings_file
+        JSON-lines file to append a timing record to for each Terraform
+        command run.  Refer to the `timings` module.
+
     """
 
     working_dir: Path
     vars: dict[str, str] | None = None
     data_dir: Path | None = None
+    state_file: Path | None = None
+    plugin_cache_dir: Path | None = field(factory=_default_plugin_cache_dir)
+    timings_file: Path | None = field(factory=default_timings_file)
+    _outputs_cache: tuple[tuple[str, int], dict[str, Any]] | None = field(
+        default=None,
+        init=False,
+        repr=False,
+        eq=False,
+    )
+
+    @property
+    def _data_path(self) -> Path:
+        """The effective Terraform data directory."""
+        return self.data_dir or self.working_dir / ".terraform"
+
+    @property
+    def _init_fingerprint_file(self) -> Path:
+        return self._data_path / "init.fingerprint"
+
+    @property
+    def _state_args(self) -> list[str]:
+        return [f"-state={self.state_file}"] if self.state_file else []
+
+    def _module_dirs(self) -> list[Path]:
+        """
+        Get the root module directory, plus the directories of any local
+        modules it (transitively) calls.
+
+        """
+        module_dirs = []
+        to_visit = [self.working_dir.resolve()]
+        while to_visit:
+            module_dir = to_visit.pop()
+            if module_dir in module_dirs or not module_dir.is_dir():
+                continue
+            module_dirs.append(module_dir)
+            for tf_file in sorted(module_dir.glob("*.tf")):
+                for source in _LOCAL_MODULE_SOURCE_RE.findall(
+                    tf_file.read_text(),
+                ):
+                    to_visit.append((module_dir / source).resolve())
+        return module_dirs
+
+    def _lock_files(self) -> list[Path]:
+        lock_file = self.working_dir / ".terraform.lock.hcl"
+        return [lock_file] if lock_file.exists() else []
+
+    def _config_files(self) -> list[Path]:
+        """
+        Get the files which determine the result of ``terraform init``.
+
+        This is the lock file and ``.tf`` files of the root module, plus the
+        ``.tf`` files of any local modules it (transitively) calls.
+
+        """
+        return self._lock_files() + [
+            tf_file
+            for module_dir in self._module_dirs()
+            for tf_file in sorted(module_dir.glob("*.tf"))
+        ]
+
+    def _apply_config_files(self) -> list[Path]:
+        """
+        Get the files which may affect the result of ``terraform apply``.
+
+        As well as the files for `_config_files`, this includes any other
+        files in the modules, e.g. templates and scripts.  Hidden files and
+        state files are excluded.
+
+        """
+        files = self._lock_files()
+        for module_dir in self._module_dirs():
+            files.extend(
+                path
+                for path in sorted(module_dir.rglob("*"))
+                if path.is_file()
+                and not any(
+                    part.startswith(".")
+                    for part in path.relative_to(module_dir).parts
+                )
+                and ".tfstate" not in path.name
+            )
+        return files
+
+    def _init_fingerprint(self) -> str:
+        """
+        Compute a fingerprint of the inputs to ``terraform init``.
+
+        """
+        return _hash_files(self._config_files())
+
+    @property
+    def _apply_fingerprint_file(self) -> Path | None:
+        if not (state_file := self._local_state_file):
+            return None
+        # Several state files may share the data directory.
+        key = hashlib.sha256(str(state_file.resolve()).encode()).hexdigest()
+        return self._data_path / f"apply-{key[:16]}.fingerprint"
+
+    def _apply_fingerprint(self, vars: dict[str, Any] | None) -> str | None:
+        """
+        Compute a fingerprint of the inputs to ``terraform apply``.
+
+        This covers the configuration, the variables, and the versions of
+        the state and of any local remote states the configuration reads.
+
+        :returns:
+            The fingerprint, or None if the state is not stored locally or
+            does not exist.
+
+        """
+        if not (state_file := self._local_state_file) or not (
+            state_file.exists()
+        ):
+            return None
+        state_files = [state_file, *self.remote_state_paths().values()]
+
+        h = hashlib.sha256()
+        h.update(_hash_files(self._apply_config_files()).encode())
+        h.update(b"\0")
+        h.update((self.vars_digest(vars) or "").encode())
+        h.update(b"\0")
+        for path in state_files:
+            version = _read_state_version(path) if path.exists() else None
+            h.update(json.dumps([str(path), version]).encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _apply_up_to_date(self, vars: dict[str, Any] | None) -> bool:
+        """
+        Check whether the configuration was last applied with the same
+        inputs, and the state has not changed since.
+
+        """
+        fingerprint_file = self._apply_fingerprint_file
+        if (
+            fingerprint_file
+            and fingerprint_file.exists()
+            and fingerprint_file.read_text() == self._apply_fingerprint(vars)
+        ):
+            logger.info(
+                "Skipping apply of unchanged Terraform configuration %s",
+                self.working_dir,
+            )
+            return True
+        return False
+
+    def _clear_apply(self) -> None:
+        if fingerprint_file := self._apply_fingerprint_file:
+            fingerprint_file.unlink(missing_ok=True)
+
+    def _record_apply(self, vars: dict[str, Any] | None) -> None:
+        # The state is updated by apply, so compute the fingerprint after.
+        if (fingerprint_file := self._apply_fingerprint_file) and (
+            fingerprint := self._apply_fingerprint(vars)
+        ):
+            fingerprint_file.parent.mkdir(parents=True, exist_ok=True)
+            fingerprint_file.write_text(fingerprint)
+
+    def _terraform_cmd(self, cmd: list[str]) -> list[str]:
+        return ["terraform", f"-chdir={self.working_dir}", *cmd]
+
+    def _env(self) -> dict[str, str]:
+        env = os.environ.copy()
+        if self.data_dir:
+            env["TF_DATA_DIR"] = str(self.data_dir)
+        if self.plugin_cache_dir:
+            self.plugin_cache_dir.mkdir(parents=True, exist_ok=True)
+            env["TF_PLUGIN_CACHE_DIR"] = str(self.plugin_cache_dir)
+        return env
+
+    @contextmanager
+    def _timed(
+        self,
+        cmd: list[str],
+        kwargs: dict[str, Any],
+    ) -> Iterator[CommandTimer]:
+        """
+        Time a Terraform subcommand, if a timings file is configured.
+
+        :param cmd:
+            The subcommand being run.
+
+        :param kwargs:
+            Arguments to `run_cmd`, which are updated to pass the command's
+            output to the timer.
+
+        :returns:
+            The timer, whose ``returncode`` should be set if the command
+            completes without raising an exception.
+
+        """
+        timer = CommandTimer(self.working_dir, cmd)
+        if not self.timings_file:
+            yield timer
+            return
+
+        if on_line := kwargs.get("on_line"):
+
+            def chained_on_line(name: str, line: str) -> None:
+                timer.on_line(name, line)
+                on_line(name, line)
+
+            kwargs["on_line"] = chained_on_line
+        else:
+            kwargs["on_line"] = timer.on_line
+        kwargs["on_start"] = timer.on_start
+
+        try:
+            yield timer
+        except subprocess.CalledProcessError as e:
+            timer.returncode = e.returncode
+            raise
+        finally:
+            timer.write(self.timings_file)
+
+    @staticmethod
+    def _init_cmd(upgrade: bool) -> list[str]:
+        cmd = ["init", "-no-color"]
+        if upgrade:
+            cmd.append("-upgrade")
+        return cmd
+
+    def _init_required(self, force: bool) -> bool:
+        """
+        Check whether ``terraform init`` needs to be run.
+
+        :param force:
+            If true, init is always required.
+
+        """
+        if (
+            not force
+            and self._init_fingerprint_file.exists()
+            and self._init_fingerprint_file.read_text()
+            == self._init_fingerprint()
+        ):
+            logger.info(
+                "Skipping init of unchanged Terraform configuration %s",
+                self.working_dir,
+            )
+            return False
+        return True
+
+    @property
+    def _init_lock_file(self) -> Path:
+        # Several processes may share the working directory (and hence the
+        # lock file), so initialization must be serialized using this file.
+        return self.working_dir / ".terraform-init.lock"
+
+    def _record_init(self) -> None:
+        # The lock file may have been created or updated by init, so compute
+        # the fingerprint afterwards.
+        self._init_fingerprint_file.write_text(self._init_fingerprint())
+
+    def _merge_vars(self, vars: dict[str, Any] | None) -> dict[str, Any]:
+        return (self.vars or dict()) | (vars or dict())
+
+    def _encode_vars(
+        self,
+        vars: dict[str, Any] | None,
+    ) -> tuple[bytes, str] | None:
+        vars = self._merge_vars(vars)
+        if not vars:
+            return None
+        content = json.dumps(vars, sort_keys=True, indent=2).encode()
+        return content, hashlib.sha256(content).hexdigest()
+
+    def vars_digest(self, vars: dict[str, Any] | None = None) -> str | None:
+        """
+        Get the digest of a set of variables, as for `var_file`.
+
+        This does not write the variables anywhere, so can be used to
+        cheaply tell whether the variables have changed.
+
+        :param vars:
+            Variables to use, in addition to `vars`.
+
+        :returns:
+            The digest, or None if there are no variables.
+
+        """
+        encoded = self._encode_vars(vars)
+        return encoded[1] if encoded else None
+
+    @contextmanager
+    def var_file(
+        self,
+        vars: dict[str, Any] | None = None,
+    ) -> Iterator[VarFile | None]:
+        """
+        Write a set of variables to a var file, for the duration of a
+        command.
+
+        The variables are written in a canonical form, so identical sets of
+        variables have the same digest.  Variables may be sensitive, so the
+        file may only be read by its owner, and is deleted afterwards.
+
+        :param vars:
+            Variables to use, in addition to `vars`.
+
+        :returns:
+            The var file, or None if there are no variables.
+
+        """
+        if not (encoded := self._encode_vars(vars)):
+            yield None
+            return
+        content, digest = encoded
+        with NamedTemporaryFile(suffix=".tfvars.json") as f:
+            f.write(content)
+            f.flush()
+            yield VarFile(Path(f.name), digest)
+
+    @contextmanager
+    def _change_cmd(
+        self,
+        subcommand: str,
+        vars: dict[str, Any] | None,
+        auto_approve: bool,
+        refresh: bool = True,
+    ) -> Iterator[list[str]]:
+        """Get the arguments for ``terraform apply`` or ``destroy``."""
+        action = {"apply": "Applying", "destroy": "Destroying"}[subcommand]
+        self._log_change(action, self._merge_vars(vars))
+        with self.var_file(vars) as var_file:
+            cmd = [subcommand, "-no-color", *self._state_args]
+            if var_file:
+                cmd.extend(var_file.args)
+            if not refresh:
+                cmd.append("-refresh=false")
+            if auto_approve:
+                cmd.append("-auto-approve")
+            yield cmd
+
+    def _log_change(self, action: str, vars: dict[str, Any]) -> None:
+        logger.info(
+            "%s Terraform configuration %s%s",
+            action,
+            self.working_dir,
+            f" with vars {vars}" if vars else "",
+        )
+
+    @contextmanager
+    def _plan_cmd(
+        self,
+        vars: dict[str, Any] | None,
+        out: Path | None,
+    ) -> Iterator[list[str]]:
+        self._log_change("Planning", self._merge_vars(vars))
+        with self.var_file(vars) as var_file:
+            cmd = ["plan", "-no-color", "-input=false", *self._state_args]
+            if var_file:
+                cmd.extend(var_file.args)
+            if out:
+                cmd.append(f"-out={out.absolute()}")
+            yield cmd
+
+    @staticmethod
+    def _show_cmd(plan_file: Path) -> list[str]:
+        return ["show", "-json", "-no-color", str(plan_file.absolute())]
+
+    @staticmethod
+    def _graph_cmd(plan_file: Path | None) -> list[str]:
+        if plan_file:
+            return ["graph", f"-plan={plan_file.absolute()}"]
+        return ["graph", "-type=plan"]
+
+    def _output_cmd(self) -> list[str]:
+        return ["output", "-json", *self._state_args]
+
+    @property
+    def _local_state_file(self) -> Path | None:
+        """
+        The state file, if the state is stored locally.
+
+        This is None if a remote backend or a non-default workspace is used,
+        in which case the state can only be read via Terraform.
+
+        """
+        if self.state_file:
+            return self.state_file
+
+        workspace_file = self._data_path / "environment"
+        workspace = os.environ.get("TF_WORKSPACE") or (
+            workspace_file.read_text().strip()
+            if workspace_file.exists()
+            else "default"
+        )
+        if workspace != "default":
+            return None
+
+        # Terraform records the configured backend in the data directory.
+        try:
+            backend = json.loads(
+                (self._data_path / "terraform.tfstate").read_text(),
+            ).get("backend")
+        except FileNotFoundError:
+            backend = None
+        except ValueError:
+            return None
+        if not backend:
+            return self.working_dir / "terraform.tfstate"
+        if backend.get("type") != "local":
+            return None
+        path = (backend.get("config") or {}).get("path") or "terraform.tfstate"
+        return self.working_dir / path
+
+    def _local_outputs(self) -> dict[str, Any] | None:
+        """
+        Read the outputs from the local state file.
+
+        The outputs are cached against the lineage and serial of the state.
+        Terraform increments the serial whenever it writes a new state, so
+        repeated reads without an intervening change only read the header of
+        the state file.
+
+        :returns:
+            The outputs, in the format of ``terraform output -json``, or None
+            if they must be read via Terraform.
+
+        """
+        if not (state_file := self._local_state_file):
+            return None
+        if not state_file.exists():
+            return {}
+
+        state_version = _read_state_version(state_file)
+        if (
+            state_version is not None
+            and self._outputs_cache is not None
+            and self._outputs_cache[0] == state_version
+        ):
+            logger.debug(
+                "Using cached outputs of Terraform configuration %s",
+                self.working_dir,
+            )
+        else:
+            try:
+                outputs = read_state_outputs(state_file)
+            except ValueError as e:
+                logger.debug("Cannot read state file %s: %s", state_file, e)
+                return None
+            if state_version is None:
+                return outputs
+            self._outputs_cache = (state_version, outputs)
+
+        # Callers may modify the outputs, so don't hand out the cached copy.
+        return copy.deepcopy(self._outputs_cache[1])
+
+    def remote_state_paths(self) -> dict[str, Path]:
+        """
+        Get the paths of the local remote states the configuration reads.
+
+        :returns:
+            The path of each local ``terraform_remote_state`` data source, by
+            data source name.
+
+        """
+        paths = {}
+        for tf_file in sorted(self.working_dir.glob("*.tf")):
+            for match in _REMOTE_STATE_RE.finditer(tf_file.read_text()):
+                paths[match["name"]] = self.working_dir / match["path"]
+        return paths
+
+    def _remote_state_file(self, name: str) -> Path:
+        try:
+            return self.remote_state_paths()[name]
+        except KeyError:
+            raise KeyError(
+                f"No local terraform_remote_state {name!r} in "
+                f"{self.working_dir}",
+            ) from None
+
+    def remote_state_outputs(self, name: str) -> dict[str, Any]:
+        """
+        Read the outputs of a stage this configuration depends on.
+
+        This reads the state file of a local ``terraform_remote_state`` data
+        source directly, without running Terraform in either configuration.
+
+        :param name:
+            Name of the ``terraform_remote_state`` data source.
+
+        :raises KeyError:
+            If there is no such data source with a local backend.
+
+        :returns:
+            The output values, as for the data source's ``outputs``
+            attribute.
+
+        """
+        outputs = read_state_outputs(self._remote_state_file(name))
+        return {k: v["value"] for k, v in outputs.items()}
+
+
+@define
+class Terraform(_TerraformBase):
+    """
+    Wrapper for the Terraform CLI.
+
+    Refer to `_TerraformBase` for the attributes.
+
+    """
 
     def _run_terraform_cmd(
         self,
@@ -57,84 +715,359 @@ class Terraform:
             Passed to `run_cmd`.
 
         """
-        cmd = ["terraform", f"-chdir={self.working_dir}", *cmd]
-        env = os.environ.copy()
-        if self.data_dir:
-            env["TF_DATA_DIR"] = self.data_dir
-        return run_cmd(cmd, env=env, **kwargs)
+        with self._timed(cmd, kwargs) as timer:
+            p = run_cmd(self._terraform_cmd(cmd), env=self._env(), **kwargs)
+            timer.returncode = p.returncode
+        return p
 
     def init(
         self,
         *,
         upgrade: bool = False,
+        force: bool = False,
     ) -> subprocess.CompletedProcess[str]:
-        cmd = ["init", "-no-color"]
-        if upgrade:
-            cmd.append("-upgrade")
-        return self._run_terraform_cmd(cmd)
+        """
+        Initialize the Terraform working directory.
+
+        This is skipped if the configuration, lock file, and local module
+        sources are unchanged since the last successful init.
+
+        :param upgrade:
+            Upgrade modules and providers to the latest allowed versions.
+
+        :param force:
+            Run ``terraform init`` even if the configuration is unchanged.
+
+        """
+        cmd = self._init_cmd(upgrade)
+        if not self._init_required(force):
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        with open(self._init_lock_file, "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            # Another process may have initialized while waiting for the lock.
+            if not self._init_required(force):
+                return subprocess.CompletedProcess(cmd, 0, "", "")
+            p = self._run_terraform_cmd(cmd)
+            self._record_init()
+
+        return p
 
     def apply(
         self,
         vars: dict[str, str] | None = None,
         auto_approve: bool = True,
+        *,
+        fast: bool = False,
     ) -> subprocess.CompletedProcess:
-        cmd = ["apply", "-no-color"]
+        """
+        Apply the configuration.
 
-        vars = (self.vars or dict()) | (vars or dict())
-        if vars:
-            var_file = NamedTemporaryFile(mode="w", suffix=".json")
-            json.dump(vars, var_file)
-            var_file.flush()
-            cmd.append(f"-var-file={var_file.name}")
+        :param vars:
+            Variables to pass, in addition to `vars`.
 
-        if auto_approve:
-            cmd.append("-auto-approve")
+        :param fast:
+            Skip the apply if the configuration, variables and state are
+            unchanged since the last successful apply, and otherwise apply
+            without refreshing existing resources.  This is much faster for
+            large configurations, but does not detect changes made outside
+            of Terraform.
 
-        logger.info(
-            "Applying Terraform configuration %s%s",
-            self.working_dir,
-            f" with vars {vars}" if vars else "",
+        """
+        if fast and self._apply_up_to_date(vars):
+            return subprocess.CompletedProcess(["apply"], 0, "", "")
+
+        self._clear_apply()
+        with self._change_cmd(
+            "apply",
+            vars,
+            auto_approve,
+            refresh=not fast,
+        ) as cmd:
+            p = self._run_terraform_cmd(cmd)
+        self._record_apply(vars)
+        return p
+
+    def destroy(
+        self,
+        vars: dict[str, str] | None = None,
+        auto_approve: bool = True,
+    ) -> subprocess.CompletedProcess:
+        self._clear_apply()
+        with self._change_cmd("destroy", vars, auto_approve) as cmd:
+            return self._run_terraform_cmd(cmd)
+
+    def plan(
+        self,
+        vars: dict[str, str] | None = None,
+        out: Path | None = None,
+    ) -> subprocess.CompletedProcess:
+        """
+        Create an execution plan.
+
+        :param vars:
+            Variables to pass, in addition to `vars`.
+
+        :param out:
+            Path to save the plan to, for use with `show`.
+
+        """
+        with self._plan_cmd(vars, out) as cmd:
+            return self._run_terraform_cmd(cmd)
+
+    def show(self, plan_file: Path) -> dict[str, Any]:
+        """
+        Get the JSON representation of a saved plan.
+
+        Refer to https://developer.hashicorp.com/terraform/internals/json-format#plan-representation.
+
+        :param plan_file:
+            The plan, as saved by `plan`.
+
+        """
+        p = self._run_terraform_cmd(
+            self._show_cmd(plan_file),
+            log_output=False,
         )
+        return json.loads(p.stdout)
 
-        p = self._run_terraform_cmd(cmd)
+    def graph(self, plan_file: Path | None = None) -> str:
+        """
+        Get the dependency graph of the configuration, in DOT format.
+
+        :param plan_file:
+            If given, get the graph for applying this plan, as saved by
+            `plan`.  Otherwise, get the graph for planning.
+
+        """
+        p = self._run_terraform_cmd(
+            self._graph_cmd(plan_file),
+            log_output=False,
+        )
+        return p.stdout
+
+    def output(self) -> subprocess.CompletedProcess:
+        return self._run_terraform_cmd(self._output_cmd())
+
+    def outputs(self) -> dict[str, Any]:
+        """
+        Get the outputs, as returned by ``terraform output -json``.
+
+        If the state is stored locally, the outputs are read directly from
+        the state file, and Terraform is only run for remote backends.
 
-        if vars:
-            var_file.close()
+        """
+        if (outputs := self._local_outputs()) is not None:
+            return outputs
+        return json.loads(self.output().stdout)
+
+
+@define
+class AsyncTerraform(_TerraformBase):
+    """
+    Asynchronous wrapper for the Terraform CLI.
 
+    This has the same interface as `Terraform`, except that the methods which
+    run Terraform are coroutines.  This allows several independent
+    configurations to be driven concurrently, e.g. using `run_concurrently`.
+
+    Refer to `_TerraformBase` for the attributes.
+
+    """
+
+    async def _run_terraform_cmd(
+        self,
+        cmd: list[str],
+        **kwargs,
+    ) -> subprocess.CompletedProcess[str]:
+        """
+        Run a Terraform subcommand.
+
+        :param cmd:
+            The subcommand to run (i.e. arguments to pass to ``terraform``).
+
+        :param kwargs:
+            Passed to `run_cmd_async`.
+
+        """
+        with self._timed(cmd, kwargs) as timer:
+            p = await run_cmd_async(
+                self._terraform_cmd(cmd),
+                env=self._env(),
+                **kwargs,
+            )
+            timer.returncode = p.returncode
         return p
 
-    def destroy(
+    async def init(
+        self,
+        *,
+        upgrade: bool = False,
+        force: bool = False,
+    ) -> subprocess.CompletedProcess[str]:
+        """Refer to `Terraform.init`."""
+        cmd = self._init_cmd(upgrade)
+        if not self._init_required(force):
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        with open(self._init_lock_file, "w") as f:
+            # Don't block the event loop while waiting for the lock.
+            await asyncio.to_thread(fcntl.flock, f, fcntl.LOCK_EX)
+            if not self._init_required(force):
+                return subprocess.CompletedProcess(cmd, 0, "", "")
+            p = await self._run_terraform_cmd(cmd)
+            self._record_init()
+
+        return p
+
+    async def apply(
         self,
         vars: dict[str, str] | None = None,
         auto_approve: bool = True,
+        *,
+        fast: bool = False,
     ) -> subprocess.CompletedProcess:
-        cmd = ["destroy", "-no-color"]
+        """Refer to `Terraform.apply`."""
+        if fast and self._apply_up_to_date(vars):
+            return subprocess.CompletedProcess(["apply"], 0, "", "")
 
-        vars = (self.vars or dict()) | (vars or dict())
-        if vars:
-            var_file = NamedTemporaryFile(mode="w", suffix=".json")
-            json.dump(vars, var_file)
-            var_file.flush()
-            cmd.append(f"-var-file={var_file.name}")
+        self._clear_apply()
+        with self._change_cmd(
+            "apply",
+            vars,
+            auto_approve,
+            refresh=not fast,
+        ) as cmd:
+            p = await self._run_terraform_cmd(cmd)
+        self._record_apply(vars)
+        return p
 
-        if auto_approve:
-            cmd.append("-auto-approve")
+    async def destroy(
+        self,
+        vars: dict[str, str] | None = None,
+        auto_approve: bool = True,
+    ) -> subprocess.CompletedProcess:
+        self._clear_apply()
+        with self._change_cmd("destroy", vars, auto_approve) as cmd:
+            return await self._run_terraform_cmd(cmd)
 
-        logger.info(
-            "Destroying Terraform configuration %s%s",
-            self.working_dir,
-            f" with vars {vars}" if vars else "",
+    async def plan(
+        self,
+        vars: dict[str, str] | None = None,
+        out: Path | None = None,
+    ) -> subprocess.CompletedProcess:
+        """Refer to `Terraform.plan`."""
+        with self._plan_cmd(vars, out) as cmd:
+            return await self._run_terraform_cmd(cmd)
+
+    async def show(self, plan_file: Path) -> dict[str, Any]:
+        """Refer to `Terraform.show`."""
+        p = await self._run_terraform_cmd(
+            self._show_cmd(plan_file),
+            log_output=False,
         )
+        return json.loads(p.stdout)
 
-        p = self._run_terraform_cmd(cmd)
+    async def graph(self, plan_file: Path | None = None) -> str:
+        """Refer to `Terraform.graph`."""
+        p = await self._run_terraform_cmd(
+            self._graph_cmd(plan_file),
+            log_output=False,
+        )
+        return p.stdout
 
-        if vars:
-            var_file.close()
+    async def output(self) -> subprocess.CompletedProcess:
+        return await self._run_terraform_cmd(self._output_cmd())
 
-        return p
+    async def outputs(self) -> dict[str, Any]:
+        """Refer to `Terraform.outputs`."""
+        if (outputs := self._local_outputs()) is not None:
+            return outputs
+        return json.loads((await self.output()).stdout)
 
-    def output(self) -> subprocess.CompletedProcess:
-        return self._run_terraform_cmd(["output", "-json"])
+
+async def run_concurrently(
+    tfs: Iterable[AsyncTerraform],
+    func: Callable[[AsyncTerraform], Awaitable[T]],
+    *,
+    limit: int = 4,
+) -> list[T]:
+    """
+    Run an operation on several Terraform configurations concurrently.
+
+    Example usage::
+
+        tfs = [AsyncTerraform(d) for d in dirs]
+        await run_concurrently(tfs, lambda tf: tf.init())
+        await run_concurrently(tfs, lambda tf: tf.apply(), limit=2)
+
+    All operations are run to completion, even if some fail, so that no
+    configuration is left part-way through being applied.
+
+    :param tfs:
+        The Terraform configurations.
+
+    :param func:
+        The operation to run on each configuration.
+
+    :param limit:
+        The maximum number of operations to run at once.
+
+    :returns:
+        The result of the operation for each configuration, in order.
+
+    :raises ExceptionGroup:
+        If any of the operations fail.
+
+    """
+    sem = asyncio.Semaphore(limit)
+
+    async def run(tf: AsyncTerraform) -> T:
+        async with sem:
+            return await func(tf)
+
+    results = await asyncio.gather(
+        *(run(tf) for tf in tfs),
+        return_exceptions=True,
+    )
+    excs = [r for r in results if isinstance(r, BaseException)]
+    if excs:
+        raise ExceptionGroup("Terraform operations failed", excs)
+    return results
+
+
+class _Unknown:
+    """Type of `UNKNOWN`."""
+
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+
+UNKNOWN = _Unknown()
+"""Value of an output which is not known until the configuration is applied."""
+
+
+def _contains_unknown(after_unknown: Any) -> bool:
+    """
+    Check whether any part of a planned value is unknown.
+
+    :param after_unknown:
+        The corresponding "after_unknown" value from the JSON plan.
+
+    """
+    if isinstance(after_unknown, dict):
+        return any(_contains_unknown(v) for v in after_unknown.values())
+    if isinstance(after_unknown, list):
+        return any(_contains_unknown(v) for v in after_unknown)
+    return after_unknown is True
+
+
+@cache
+def _converter(cls: type["TerraformOutputs"]) -> cattrs.Converter:
+    """Get the converter for a `TerraformOutputs` subclass."""
+    converter = cattrs.Converter()
+    converter.register_structure_hook(cls, partial(cls.structure, converter))
+    return converter
 
 
 class TerraformOutputs:
@@ -153,7 +1086,8 @@ class TerraformOutputs:
         print(outputs.bar)
 
     This class provides the `from_terraform` helper to parse the output of
-    ``terraform output`.
+    ``terraform output`, and the `from_plan` helper to get the output values
+    which are known at plan time, without applying the configuration.
 
     """
 
@@ -167,7 +1101,10 @@ class TerraformOutputs:
         for a in fields(t):
             try:
                 value = d.pop(a.name)
-                conv_obj[a.name] = c.structure(value, a.type)
+                if value is UNKNOWN:
+                    conv_obj[a.name] = UNKNOWN
+                else:
+                    conv_obj[a.name] = c.structure(value, a.type)
             except KeyError:
                 if a is NOTHING:
                     raise
@@ -175,6 +1112,10 @@ class TerraformOutputs:
             raise ForbiddenExtraKeysError("", t, set(d.keys()))
         return t(**conv_obj)
 
+    @classmethod
+    def _from_dict(cls, d: dict[str, Any]):
+        return _converter(cls).structure(d, cls)
+
     @classmethod
     def from_terraform(cls, tf: Terraform):
         """
@@ -193,11 +1134,44 @@ class TerraformOutputs:
             in the dataclass.
 
         """
-        out = tf.output().stdout
-        d = json.loads(out)["module"]["value"]
-        converter = cattrs.Converter()
-        converter.register_structure_hook(
-            cls,
-            partial(cls.structure, converter),
-        )
-        return converter.structure(d, cls)
+        d = tf.outputs()["module"]["value"]
+        return cls._from_dict(d)
+
+    @classmethod
+    def from_plan(cls, tf: Terraform, vars: dict[str, str] | None = None):
+        """
+        Create `TerraformOutputs` from a plan of a Terraform configuration.
+
+        This does not apply the configuration, so is much faster than
+        `from_terraform` for checking values that are computed from the
+        inputs and data sources alone.
+
+        Any attribute whose value (or any part of whose value) is not known
+        until apply is set to `UNKNOWN`.
+
+        :param vars:
+            Variables to pass to `Terraform.plan`.
+
+        :raises KeyError:
+            As for `from_terraform`.
+
+        :raises ForbiddenExtraKeysError:
+            As for `from_terraform`.
+
+        :raises ValueError:
+            If the "module" output is entirely unknown at plan time.
+
+        """
+        with TemporaryDirectory() as tmpdir:
+            plan_file = Path(tmpdir) / "tfplan"
+            tf.plan(vars, out=plan_file)
+            plan = tf.show(plan_file)
+
+        change = plan["output_changes"]["module"]
+        if change["after_unknown"] is True:
+            raise ValueError("Output 'module' is not known until apply")
+        d = change["after"]
+        for k, v in change["after_unknown"].items():
+            if _contains_unknown(v):
+                d[k] = UNKNOWN
+        return cls._from_dict(d)
@@ -0,0 +1,333 @@
+"""
+Timing instrumentation for Terraform commands.
+
+Each Terraform command run by `terraform.Terraform` is recorded as a line of
+JSON in the timings file, if one is configured (by default, the
+``XRD_TERRAFORM_TIMINGS_FILE`` environment variable, which the test
+``conftest.py`` points at the ``logs/`` directory).
+
+To summarize a timings file::
+
+    python timings.py logs/xrd_terraform_timings.jsonl.<timestamp>
+
+"""
+
+__all__ = (
+    "TIMINGS_FILE_ENV_VAR",
+    "CommandTimer",
+    "default_timings_file",
+    "read_timings",
+    "summarize",
+)
+
+import argparse
+import datetime as dt
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable
+
+TIMINGS_FILE_ENV_VAR = "XRD_TERRAFORM_TIMINGS_FILE"
+
+# E.g. "module.node.aws_instance.this: Creating..."
+_START_RE = re.compile(
+    r"^(?P<address>.+?): "
+    r"(?P<action>Creating|Destroying|Modifying|Reading)\.\.\.",
+)
+
+# E.g. "module.node.aws_instance.this: Creation complete after 12s [id=...]"
+_COMPLETE_RE = re.compile(
+    r"^(?P<address>.+?): "
+    r"(?P<action>Creation|Destruction|Modifications|Read) complete after ",
+)
+
+# E.g. "Apply complete! Resources: 3 added, 0 changed, 0 destroyed."
+_SUMMARY_RE = re.compile(r"^(?:Apply|Destroy) complete! Resources: (.*)\.$")
+_SUMMARY_COUNT_RE = re.compile(r"(\d+) (\w+)")
+
+_ACTIONS = {
+    "Creating": "create",
+    "Creation": "create",
+    "Destroying": "destroy",
+    "Destruction": "destroy",
+    "Modifying": "update",
+    "Modifications": "update",
+    "Reading": "read",
+    "Read": "read",
+}
+
+# Matches instance keys in resource addresses, e.g. `[0]` or `["alpha"]`.
+_INDEX_RE = re.compile(r"\[[^\]]*\]")
+
+# Interval at which to sample memory use, in seconds.
+_MEMORY_SAMPLE_INTERVAL = 0.05
+
+
+def default_timings_file() -> Path | None:
+    if f := os.environ.get(TIMINGS_FILE_ENV_VAR):
+        return Path(f)
+    return None
+
+
+def _proc_status_kb(pid: int, field: str) -> int | None:
+    """
+    Read a memory field, in kilobytes, from ``/proc/<pid>/status``.
+
+    This is None if the process no longer exists, or has exited.
+
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1])
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return None
+
+
+def _children(pid: int) -> list[int]:
+    children = []
+    try:
+        for task in os.scandir(f"/proc/{pid}/task"):
+            with open(f"{task.path}/children") as f:
+                children.extend(int(c) for c in f.read().split())
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return children
+
+
+class _MemorySampler(threading.Thread):
+    """
+    Samples the memory use of a process and its descendants.
+
+    The resource usage reported by ``wait4()`` is not used for this, since a
+    child's peak memory includes that of the (large) Python process it was
+    forked from.
+
+    """
+
+    def __init__(self, pid: int):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak_kb: int | None = None
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            root_hwm = _proc_status_kb(self.pid, "VmHWM")
+            if root_hwm is None:
+                break
+            # Include provider plugins, which run as child processes.
+            total = 0
+            to_visit = [self.pid]
+            while to_visit:
+                pid = to_visit.pop()
+                total += _proc_status_kb(pid, "VmRSS") or 0
+                to_visit.extend(_children(pid))
+            self.peak_kb = max(self.peak_kb or 0, root_hwm, total)
+            self._stopped.wait(_MEMORY_SAMPLE_INTERVAL)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class CommandTimer:
+    """
+    Collects timings for a single Terraform command from its output.
+
+    Per-resource durations are measured from when the start and completion
+    lines are read, rather than parsed from Terraform's output, since
+    Terraform only reports these to the nearest second.
+
+    Peak memory use of the command (including any provider plugins it runs)
+    is sampled on Linux.
+
+    """
+
+    def __init__(self, working_dir: Path, cmd: list[str]):
+        self.working_dir = working_dir
+        self.subcommand = cmd[0]
+        self.returncode: int | None = None
+        self.resources: dict[str, int] | None = None
+        self._memory_sampler: _MemorySampler | None = None
+        self._start = time.monotonic()
+        self._timestamp = dt.datetime.now(dt.timezone.utc)
+        self._in_progress: dict[tuple[str, str], float] = {}
+        self._resource_timings: list[dict[str, Any]] = []
+
+    def on_line(self, name: str, line: str) -> None:
+        """Handle a line of output, for use as a `run_cmd` callback."""
+        if name != "stdout":
+            return
+        line = line.rstrip()
+        if m := _START_RE.match(line):
+            key = (m["address"], _ACTIONS[m["action"]])
+            self._in_progress[key] = time.monotonic()
+        elif m := _COMPLETE_RE.match(line):
+            key = (m["address"], _ACTIONS[m["action"]])
+            if (start := self._in_progress.pop(key, None)) is not None:
+                self._add_resource_timing(*key, time.monotonic() - start)
+        elif m := _SUMMARY_RE.match(line):
+            self.resources = {
+                kind: int(count)
+                for count, kind in _SUMMARY_COUNT_RE.findall(m[1])
+            }
+
+    def on_start(self, pid: int) -> None:
+        """Handle the command starting, for use as a `run_cmd` callback."""
+        if os.path.exists("/proc/self/status"):
+            self._memory_sampler = _MemorySampler(pid)
+            self._memory_sampler.start()
+
+    def _add_resource_timing(
+        self,
+        address: str,
+        action: str,
+        duration: float | None,
+    ) -> None:
+        self._resource_timings.append(
+            {
+                "address": address,
+                "action": action,
+                "duration": (
+                    round(duration, 3) if duration is not None else None
+                ),
+            },
+        )
+
+    def record(self) -> dict[str, Any]:
+        """
+        Get the timing record for the command.
+
+        Any resource operations that were started but did not complete (e.g.
+        because the command failed) are included with a null duration.
+
+        """
+        for address, action in self._in_progress:
+            self._add_resource_timing(address, action, None)
+        self._in_progress.clear()
+        max_rss_kb = None
+        if self._memory_sampler:
+            self._memory_sampler.stop()
+            max_rss_kb = self._memory_sampler.peak_kb
+        return {
+            "timestamp": self._timestamp.isoformat(),
+            "working_dir": str(self.working_dir),
+            "command": self.subcommand,
+            "wall_time": round(time.monotonic() - self._start, 3),
+            "returncode": self.returncode,
+            "resources": self.resources,
+            "max_rss_kb": max_rss_kb,
+            "resource_timings": self._resource_timings,
+        }
+
+    def write(self, path: Path) -> None:
+        """
+        Append the timing record for the command to a JSON-lines file.
+
+        The record is written with a single append, so several processes
+        (e.g. pytest-xdist workers) can safely share the file.
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = (json.dumps(self.record()) + "\n").encode()
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+
+def read_timings(path: Path) -> list[dict[str, Any]]:
+    """Read the records from a timings file."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _resource_group(address: str) -> tuple[str, str]:
+    """
+    Get the module path and resource type for a resource address.
+
+    Instance keys are removed, so that e.g. all nodes created using
+    ``count`` are grouped together.
+
+    """
+    parts = _INDEX_RE.sub("", address).split(".")
+    if "data" in parts:
+        i = parts.index("data")
+        return ".".join(parts[:i]), ".".join(parts[i : i + 2])
+    return ".".join(parts[:-2]), parts[-2]
+
+
+def summarize(
+    records: Iterable[dict[str, Any]],
+) -> list[tuple[str, str, str, int, float, float]]:
+    """
+    Summarize per-resource timings.
+
+    :returns:
+        Tuples of (module, resource type, action, count, total duration, max
+        duration), sorted by total duration, longest first.
+
+    """
+    durations: dict[tuple[str, str, str], list[float]] = defaultdict(list)
+    for record in records:
+        for timing in record["resource_timings"]:
+            if timing["duration"] is None:
+                continue
+            module, resource_type = _resource_group(timing["address"])
+            durations[(module, resource_type, timing["action"])].append(
+                timing["duration"],
+            )
+
+    rows = [(*key, len(ds), sum(ds), max(ds)) for key, ds in durations.items()]
+    return sorted(rows, key=lambda row: row[4], reverse=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Summarize Terraform command timings",
+    )
+    parser.add_argument("timings_file", type=Path)
+    parser.add_argument(
+        "-n",
+        "--top",
+        type=int,
+        default=20,
+        help="Number of resource groups to show",
+    )
+    args = parser.parse_args(argv)
+
+    records = read_timings(args.timings_file)
+
+    by_command: dict[str, list[float]] = defaultdict(list)
+    for record in records:
+        by_command[record["command"]].append(record["wall_time"])
+    print(f"{'command':<10} {'count':>6} {'total (s)':>10} {'max (s)':>8}")
+    for command, ts in sorted(by_command.items()):
+        print(f"{command:<10} {len(ts):>6} {sum(ts):>10.1f} {max(ts):>8.1f}")
+
+    print()
+    print(
+        f"{'module':<30} {'resource':<30} {'action':<8} "
+        f"{'count':>6} {'total (s)':>10} {'max (s)':>8}",
+    )
+    for module, resource_type, action, count, total, max_ in summarize(
+        records,
+    )[: args.top]:
+        print(
+            f"{module or '(root)':<30} {resource_type:<30} {action:<8} "
+            f"{count:>6} {total:>10.1f} {max_:>8.1f}",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
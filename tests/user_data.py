@@ -0,0 +1,420 @@
+"""
+Reference renderer for the user data of the ``modules/aws/node`` module.
+
+The node's user data is rendered from ``templates/user-data.tftpl``, and as
+the instance sets ``user_data_replace_on_change``, any change to the rendered
+text replaces the instance.  This renders the template exactly as Terraform
+does, so that it is possible to see which inputs would change the rendered
+document, and hence replace a node, without a Terraform run::
+
+    python user_data.py diff OLD NEW
+
+where OLD and NEW are JSON files holding the ``UserDataInputs`` fields.
+
+Any change to how the module renders the template must be reflected here; the
+tests in ``ut/test_node.py`` cross-check the two.
+
+"""
+
+__all__ = (
+    "TEMPLATE_FILE",
+    "UserDataInputs",
+    "changed_inputs",
+    "diff",
+    "normalize_kubelet_args",
+    "render",
+    "render_template",
+)
+
+import argparse
+import difflib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Mapping
+
+import attrs
+import cattrs
+from attrs import define, field
+
+TEMPLATE_FILE = (
+    Path(__file__).parent.parent
+    / "modules"
+    / "aws"
+    / "node"
+    / "templates"
+    / "user-data.tftpl"
+)
+
+# Refer to `local.required_labels`.
+NAME_LABEL = "ios-xr.cisco.com/name"
+
+# A template interpolation or directive, e.g. `${name}` or `%{~ endfor ~}`.
+_TEMPLATE_SEQUENCE_RE = re.compile(
+    r"(?<![$%])(?P<kind>[$%])\{(?P<strip_before>~?)\s*(?P<body>.*?)\s*"
+    r"(?P<strip_after>~?)\}",
+    re.DOTALL,
+)
+
+# A kubelet argument which includes its value, e.g. `--max-pods=110`.
+_KUBELET_FLAG_ARG_RE = re.compile(r"--?[^=]+=")
+
+
+@define
+class UserDataInputs:
+    """
+    Inputs to the node's user data.
+
+    Refer to the ``user_data`` argument of ``aws_instance.this`` in
+    ``modules/aws/node/main.tf``.
+
+    ..attribute:: cluster_name
+        Name of the EKS cluster.
+
+    ..attribute:: api_endpoint
+        Endpoint of the EKS cluster's API server.
+
+    ..attribute:: certificate_authority
+        Base64-encoded certificate authority data of the EKS cluster.
+
+    ..attribute:: cidr
+        Service IPv4 CIDR block of the EKS cluster.
+
+    ..attribute:: name
+        Name of the node, as passed to the module.
+
+    ..attribute:: labels
+        Node labels, as passed to the module.
+
+    ..attribute:: kubelet_extra_args
+        Extra kubelet arguments, as passed to the module.
+
+    ..attribute:: hugepages_gb
+        Number of 1GiB hugepages, as calculated by the module.
+
+    ..attribute:: isolated_cores
+        CPU cores to isolate, as calculated by the module.
+
+    ..attribute:: user_data
+        Additional user data, as passed to the module.
+
+    ..attribute:: xrd_bootstrap
+        Whether the AMI is an XRd AMI, as calculated by the module.
+
+    """
+
+    cluster_name: str
+    api_endpoint: str
+    certificate_authority: str
+    cidr: str
+    name: str
+    labels: dict[str, str] | None = None
+    kubelet_extra_args: list[str] = field(factory=list)
+    hugepages_gb: int | None = None
+    isolated_cores: str | None = None
+    user_data: str = ""
+    xrd_bootstrap: bool = False
+
+
+def _to_string(value: Any) -> str:
+    """Convert a primitive value to a string as Terraform does."""
+    if value is None:
+        raise ValueError("Cannot interpolate a null value")
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _tokenize(text: str) -> list[tuple[str, Any]]:
+    """
+    Split a template into literal chunks and template sequences.
+
+    As in HCL, each literal chunk ends at a newline (inclusive), so a strip
+    marker only strips whitespace up to the nearest newline.
+
+    """
+    tokens: list[tuple[str, Any]] = []
+
+    def add_literal(s: str) -> None:
+        s = s.replace("$${", "${").replace("%%{", "%{")
+        tokens.extend(("literal", line) for line in s.splitlines(True))
+
+    pos = 0
+    for m in _TEMPLATE_SEQUENCE_RE.finditer(text):
+        add_literal(text[pos : m.start()])
+        tokens.append(
+            (
+                "interpolation" if m["kind"] == "$" else "directive",
+                (m["body"], bool(m["strip_before"]), bool(m["strip_after"])),
+            ),
+        )
+        pos = m.end()
+    add_literal(text[pos:])
+
+    # Apply the strip markers to the adjacent literal chunks.
+    for i, (kind, value) in enumerate(tokens):
+        if kind == "literal":
+            continue
+        _, strip_before, strip_after = value
+        if strip_before and i > 0 and tokens[i - 1][0] == "literal":
+            tokens[i - 1] = ("literal", tokens[i - 1][1].rstrip())
+        if (
+            strip_after
+            and i + 1 < len(tokens)
+            and tokens[i + 1][0] == "literal"
+        ):
+            tokens[i + 1] = ("literal", tokens[i + 1][1].lstrip())
+
+    return tokens
+
+
+def _lookup(expr: str, vars: Mapping[str, Any]) -> Any:
+    if not expr.isidentifier():
+        raise ValueError(f"Unsupported template expression: {expr!r}")
+    if expr not in vars:
+        raise ValueError(f"Unknown template variable: {expr!r}")
+    return vars[expr]
+
+
+def _block_end(tokens: list[tuple[str, Any]], start: int) -> int:
+    """
+    Find the end of a block.
+
+    :returns:
+        The index of the `endfor`, `endif` or `else` directive that ends the
+        block starting at the given index.
+
+    :raises ValueError:
+        If the block is not terminated.
+
+    """
+    depth = 0
+    for i in range(start, len(tokens)):
+        kind, value = tokens[i]
+        if kind != "directive":
+            continue
+        keyword = value[0].split()[0]
+        if keyword in ("for", "if"):
+            depth += 1
+        elif keyword in ("endfor", "endif") and depth > 0:
+            depth -= 1
+        elif keyword in ("endfor", "endif", "else") and depth == 0:
+            return i
+    raise ValueError("Unterminated template directive")
+
+
+def _render_tokens(
+    tokens: list[tuple[str, Any]],
+    vars: Mapping[str, Any],
+) -> str:
+    out = []
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == "literal":
+            out.append(value)
+        elif kind == "interpolation":
+            out.append(_to_string(_lookup(value[0], vars)))
+        else:
+            words = value[0].split()
+            if words[0] == "for" and len(words) == 4 and words[2] == "in":
+                end = _block_end(tokens, i + 1)
+                for item in _lookup(words[3], vars):
+                    out.append(
+                        _render_tokens(
+                            tokens[i + 1 : end],
+                            {**vars, words[1]: item},
+                        ),
+                    )
+            elif words[0] == "if" and len(words) == 2:
+                end = _block_end(tokens, i + 1)
+                then_tokens = tokens[i + 1 : end]
+                else_tokens = []
+                if tokens[end][1][0] == "else":
+                    else_end = _block_end(tokens, end + 1)
+                    else_tokens = tokens[end + 1 : else_end]
+                    end = else_end
+                out.append(
+                    _render_tokens(
+                        then_tokens
+                        if _lookup(words[1], vars)
+                        else else_tokens,
+                        vars,
+                    ),
+                )
+            else:
+                raise ValueError(
+                    f"Unsupported template directive: {value[0]!r}",
+                )
+            i = end
+        i += 1
+    return "".join(out)
+
+
+def render_template(text: str, vars: Mapping[str, Any]) -> str:
+    """
+    Render a template as Terraform's ``templatefile`` function does.
+
+    Only the subset of the template language used by the node's user data
+    template is supported: interpolation of variables, ``for`` and ``if``
+    directives, and strip markers.
+
+    :raises ValueError:
+        If the template uses unsupported syntax or unknown variables.
+
+    """
+    return _render_tokens(_tokenize(text), vars)
+
+
+def normalize_kubelet_args(args: list[str]) -> list[str]:
+    """
+    Put kubelet arguments into a canonical order.
+
+    The module renders the arguments in the order given, so reordering them
+    replaces the node.  Arguments which are the same once normalized have
+    the same effect on the kubelet.
+
+    Arguments are grouped by flag name, in lexicographic order, keeping the
+    relative order of repeated flags (as the last one takes effect).  The
+    order is kept as given if any argument is not of the form
+    ``--flag=value``, since a flag may then be separate from its value.
+
+    """
+    if not all(_KUBELET_FLAG_ARG_RE.match(arg) for arg in args):
+        return list(args)
+    by_flag: dict[str, list[str]] = {}
+    for arg in args:
+        by_flag.setdefault(arg.split("=")[0], []).append(arg)
+    return [arg for flag in sorted(by_flag) for arg in by_flag[flag]]
+
+
+def _template_vars(inputs: UserDataInputs) -> dict[str, Any]:
+    """Get the variables the module renders the template with."""
+    labels = {**(inputs.labels or {}), NAME_LABEL: inputs.name}
+    node_labels_arg = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return {
+        "name": inputs.cluster_name,
+        "api_endpoint": inputs.api_endpoint,
+        "certificate_authority": inputs.certificate_authority,
+        "cidr": inputs.cidr,
+        "kubelet_flags": [
+            f"--node-labels={node_labels_arg}",
+            *inputs.kubelet_extra_args,
+        ],
+        "hugepages_gb": inputs.hugepages_gb,
+        "isolated_cores": inputs.isolated_cores,
+        "additional_user_data": inputs.user_data,
+        "xrd_bootstrap": inputs.xrd_bootstrap,
+    }
+
+
+def render(inputs: UserDataInputs, template: str | None = None) -> str:
+    """
+    Render the node's user data.
+
+    :param template:
+        The template text; by default this is read from ``TEMPLATE_FILE``.
+
+    """
+    if template is None:
+        template = TEMPLATE_FILE.read_text()
+    return render_template(template, _template_vars(inputs))
+
+
+def changed_inputs(old: UserDataInputs, new: UserDataInputs) -> list[str]:
+    """
+    Find which inputs change the rendered user data.
+
+    An input is reported if reverting just that input to its old value would
+    change the new rendered user data.  Inputs that differ without affecting
+    the rendered text (e.g. reordered labels, or hugepages on a non-XRd AMI)
+    are not reported, since they do not replace the node.
+
+    :returns:
+        Names of the inputs, in field order.
+
+    """
+    template = TEMPLATE_FILE.read_text()
+    rendered = render(new, template)
+    changed = []
+    for a in attrs.fields(UserDataInputs):
+        old_value = getattr(old, a.name)
+        if old_value == getattr(new, a.name):
+            continue
+        reverted = attrs.evolve(new, **{a.name: old_value})
+        try:
+            reverted_rendered = render(reverted, template)
+        except ValueError:
+            # The old value is not valid with the other new values (e.g. null
+            # hugepages on an XRd AMI), so this input must be changed too.
+            reverted_rendered = None
+        if reverted_rendered != rendered:
+            changed.append(a.name)
+    return changed
+
+
+def diff(old: UserDataInputs, new: UserDataInputs) -> str:
+    """Get a unified diff of the old and new rendered user data."""
+    template = TEMPLATE_FILE.read_text()
+    return "".join(
+        difflib.unified_diff(
+            render(old, template).splitlines(True),
+            render(new, template).splitlines(True),
+            "old",
+            "new",
+        ),
+    )
+
+
+def _load_inputs(path: Path) -> UserDataInputs:
+    return cattrs.structure(json.loads(path.read_text()), UserDataInputs)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Render and compare node user data",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render_parser = subparsers.add_parser(
+        "render",
+        help="Render the user data",
+    )
+    render_parser.add_argument("inputs", type=Path)
+
+    diff_parser = subparsers.add_parser(
+        "diff",
+        help="Show which inputs change the user data, and so replace the node",
+    )
+    diff_parser.add_argument("old", type=Path)
+    diff_parser.add_argument("new", type=Path)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "render":
+        print(render(_load_inputs(args.inputs)), end="")
+        return 0
+
+    old = _load_inputs(args.old)
+    new = _load_inputs(args.new)
+    changed = changed_inputs(old, new)
+    if not changed:
+        print("User data is unchanged")
+        return 0
+    print(f"User data changed by: {', '.join(changed)}")
+    if "kubelet_extra_args" in changed and normalize_kubelet_args(
+        old.kubelet_extra_args,
+    ) == normalize_kubelet_args(new.kubelet_extra_args):
+        print(
+            "The kubelet arguments have only been reordered; pass them in "
+            "the old order to keep the node",
+        )
+    print(diff(old, new), end="")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import datetime as dt
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from mypy_boto3_ec2 import EC2ServiceResource
+from mypy_boto3_eks import EKSClient
+from mypy_boto3_iam import IAMServiceResource
+
+from benchmarks import BenchmarkResult, save_results
+from terraform import Terraform
+
+from ..moto_server import MotoServer
+from .prereqs import Prerequisites, create_prerequisites
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config,
+    items: list[pytest.Item],
+) -> None:
+    if config.getoption("bench"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks are only run with --bench")
+    for item in items:
+        if item.get_closest_marker("bench"):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def bench_results(
+    request: pytest.FixtureRequest,
+    worker_id: str,
+) -> list[BenchmarkResult]:
+    """Results of the benchmarks run, written out at the end of the run."""
+    results = []
+    yield results
+    if not results:
+        return
+
+    path = request.config.getoption("bench_output")
+    if path is None:
+        timestamp = dt.datetime.now().strftime(r"%Y%m%d_%H%M%S")
+        path = Path("logs") / f"bench_results.json.{timestamp}"
+    if worker_id != "master":
+        # Each pytest-xdist worker writes its own results.
+        path = path.with_name(f"{path.name}.{worker_id}")
+    save_results(results, path)
+
+
+@pytest.fixture
+def benchmark(
+    bench_results: list[BenchmarkResult],
+    moto_server: MotoServer,
+) -> Callable[..., BenchmarkResult]:
+    """
+    Benchmark each step of bringing up and tearing down a configuration.
+
+    Returns a function to run the benchmark, with the following arguments:
+
+    :param tf:
+        The configuration to benchmark.
+
+    :param name:
+        Unique name of the benchmark.
+
+    :param vars:
+        Variables to plan, apply, and destroy with.
+
+    :param series:
+        Scaling series the benchmark belongs to, if any.
+
+    :param scale:
+        Size of the configuration within its series.
+
+    """
+    tfs = []
+
+    def run(
+        tf: Terraform,
+        name: str,
+        vars: dict[str, Any],
+        *,
+        series: str | None = None,
+        scale: int | None = None,
+    ) -> BenchmarkResult:
+        tfs.append(tf)
+        result = BenchmarkResult(name, series=series, scale=scale)
+        steps = {
+            "init": lambda: tf.init(force=True),
+            "plan": lambda: tf.plan(vars=vars),
+            "apply": lambda: tf.apply(vars=vars),
+            "destroy": lambda: tf.destroy(vars=vars),
+        }
+        for step, func in steps.items():
+            start = time.monotonic()
+            func()
+            result.timings[step] = round(time.monotonic() - start, 3)
+        bench_results.append(result)
+        return result
+
+    yield run
+
+    moto_server.reset()
+    for tf in tfs:
+        tf.state_file.unlink(missing_ok=True)
+
+
+@pytest.fixture
+def prereqs(
+    ec2: EC2ServiceResource,
+    iam: IAMServiceResource,
+    eks_client: EKSClient,
+) -> Prerequisites:
+    return create_prerequisites(ec2, iam, eks_client)
@@ -0,0 +1,105 @@
+__all__ = (
+    "Prerequisites",
+    "create_prerequisites",
+)
+
+import json
+import uuid
+
+from attrs import define
+from mypy_boto3_ec2 import EC2ServiceResource
+from mypy_boto3_eks import EKSClient
+from mypy_boto3_iam import IAMServiceResource
+
+
+@define
+class Prerequisites:
+    """
+    AWS resources which the benchmarked configurations depend on.
+
+    These correspond to the resources created by the ``bootstrap`` example.
+
+    """
+
+    vpc_id: str
+    subnet_ids: list[str]
+    security_group_id: str
+    key_name: str
+    iam_instance_profile: str
+    iam_policy_arn: str
+    cluster_name: str
+
+
+def create_prerequisites(
+    ec2: EC2ServiceResource,
+    iam: IAMServiceResource,
+    eks_client: EKSClient,
+) -> Prerequisites:
+    """Create the prerequisite resources in the given account."""
+    vpc = ec2.create_vpc(CidrBlock="10.0.0.0/16")
+    subnets = [
+        vpc.create_subnet(
+            AvailabilityZone="eu-west-1a",
+            CidrBlock=f"10.0.{i}.0/24",
+        )
+        for i in range(2)
+    ]
+    sg = ec2.create_security_group(
+        GroupName="bench",
+        Description="bench",
+        VpcId=vpc.vpc_id,
+    )
+    key_pair = ec2.create_key_pair(KeyName=str(uuid.uuid4()))
+
+    assume_role_policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Action": "sts:AssumeRole",
+                "Effect": "Allow",
+                "Principal": {"Service": "ec2.amazonaws.com"},
+            },
+        ],
+    }
+    role = iam.create_role(
+        RoleName=str(uuid.uuid4()),
+        AssumeRolePolicyDocument=json.dumps(assume_role_policy),
+    )
+    instance_profile = iam.create_instance_profile(
+        InstanceProfileName=str(uuid.uuid4()),
+    )
+    instance_profile.add_role(RoleName=role.name)
+    policy = iam.create_policy(
+        PolicyName=str(uuid.uuid4()),
+        PolicyDocument=json.dumps(
+            {
+                "Version": "2012-10-17",
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Action": "s3:ListBucket",
+                        "Resource": "*",
+                    },
+                ],
+            },
+        ),
+    )
+
+    cluster = eks_client.create_cluster(
+        name=str(uuid.uuid4()),
+        roleArn=role.arn,
+        resourcesVpcConfig={
+            "subnetIds": [s.id for s in subnets],
+            "securityGroupIds": [sg.id],
+        },
+    )
+
+    return Prerequisites(
+        vpc_id=vpc.vpc_id,
+        subnet_ids=[s.id for s in subnets],
+        security_group_id=sg.id,
+        key_name=key_pair.key_name,
+        iam_instance_profile=instance_profile.name,
+        iam_policy_arn=policy.arn,
+        cluster_name=cluster["cluster"]["name"],
+    )
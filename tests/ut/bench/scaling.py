@@ -0,0 +1,307 @@
+"""
+Scaling harness for the ``dev/flex`` topology.
+
+This brings up the flex test configuration (which mirrors the AWS resources
+of ``dev/flex``) against a local Moto server at a range of node and interface
+counts, reporting for each:
+
+ - the number of resources created,
+ - the size of the apply graph,
+ - the wall time and peak memory use of Terraform for each step.
+
+Run from the ``tests`` directory::
+
+    python -m ut.bench.scaling --node-counts 10,50,100,150 \\
+        --interface-counts 0,4
+
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import boto3
+import cattrs
+from attrs import define, field
+from moto.server import ThreadedMotoServer
+
+from terraform import Terraform
+from timings import read_timings
+
+from ..moto_server import MotoServer
+from .prereqs import create_prerequisites
+
+logger = logging.getLogger(__name__)
+
+_THIS_DIR = Path(__file__).parent
+
+# This AMI should exist in the Moto server.
+# Refer to https://github.com/getmoto/moto/blob/master/moto/ec2/resources/amis.json.
+_NODE_AMI = "ami-03cf127a"
+
+# Node IPs are allocated from a /24, starting at .11.
+_MAX_NODE_COUNT = 243
+
+# Data subnets are allocated from 10.0.10.0/24 upwards.
+_MAX_INTERFACE_COUNT = 15
+
+
+@define
+class StepResult:
+    """
+    ..attribute:: wall_time
+        Wall time in seconds.
+
+    ..attribute:: max_rss_kb
+        Peak resident memory of the Terraform process, in kilobytes.
+
+    """
+
+    wall_time: float
+    max_rss_kb: int | None
+
+
+@define
+class ScalingResult:
+    """
+    ..attribute:: resources
+        Number of resources the plan creates.
+
+    ..attribute:: graph_nodes
+        Number of nodes in the apply graph.
+
+    ..attribute:: graph_edges
+        Number of edges in the apply graph.
+
+    ..attribute:: steps
+        Result of each step.
+
+    ..attribute:: error
+        The step which failed, if any.
+
+    """
+
+    node_count: int
+    interface_count: int
+    resources: int | None = None
+    graph_nodes: int | None = None
+    graph_edges: int | None = None
+    steps: dict[str, StepResult] = field(factory=dict)
+    error: str | None = None
+
+
+def _graph_size(dot: str) -> tuple[int, int]:
+    """Count the nodes and edges in a DOT graph output by Terraform."""
+    nodes = edges = 0
+    for line in dot.splitlines():
+        if " -> " in line:
+            edges += 1
+        elif "[label=" in line:
+            nodes += 1
+    return nodes, edges
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def _run(
+    moto_server: MotoServer,
+    tf: Terraform,
+    node_count: int,
+    interface_count: int,
+) -> ScalingResult:
+    """Bring up and tear down the topology at the given size."""
+    result = ScalingResult(node_count, interface_count)
+
+    moto_server.reset()
+    prereqs = create_prerequisites(
+        boto3.resource("ec2", endpoint_url=moto_server.endpoint),
+        boto3.resource("iam", endpoint_url=moto_server.endpoint),
+        boto3.client("eks", endpoint_url=moto_server.endpoint),
+    )
+    vars = {
+        "name_prefix": str(uuid.uuid4()),
+        "vpc_id": prereqs.vpc_id,
+        "cluster_subnet_id": prereqs.subnet_ids[0],
+        "cluster_name": prereqs.cluster_name,
+        "iam_instance_profile": prereqs.iam_instance_profile,
+        "key_name": prereqs.key_name,
+        "ami": _NODE_AMI,
+        "node_count": node_count,
+        "interface_count": interface_count,
+    }
+
+    def record(step: str) -> None:
+        timing = read_timings(tf.timings_file)[-1]
+        result.steps[step] = StepResult(
+            timing["wall_time"],
+            timing["max_rss_kb"],
+        )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plan_file = Path(tmpdir) / "tfplan"
+        step = "plan"
+        try:
+            tf.plan(vars=vars, out=plan_file)
+            record(step)
+
+            step = "show"
+            plan = tf.show(plan_file)
+            result.resources = sum(
+                1
+                for rc in plan.get("resource_changes", [])
+                if "create" in rc["change"]["actions"]
+            )
+
+            step = "graph"
+            result.graph_nodes, result.graph_edges = _graph_size(
+                tf.graph(plan_file),
+            )
+            record(step)
+
+            step = "apply"
+            tf.apply(vars=vars)
+            record(step)
+
+            step = "destroy"
+            tf.destroy(vars=vars)
+            record(step)
+        except Exception:
+            logger.exception(
+                "Failed to %s with %d nodes and %d interfaces",
+                step,
+                node_count,
+                interface_count,
+            )
+            result.error = step
+        finally:
+            tf.state_file.unlink(missing_ok=True)
+
+    return result
+
+
+def _print_results(results: list[ScalingResult]) -> None:
+    steps = ("plan", "graph", "apply", "destroy")
+    header = f"{'nodes':>6} {'ifs':>4} {'resources':>9} {'graph':>13}"
+    for step in steps:
+        header += f" {step + ' (s)':>12} {step + ' (MB)':>12}"
+    print(header)
+
+    for r in results:
+        graph = (
+            f"{r.graph_nodes}/{r.graph_edges}"
+            if r.graph_nodes is not None
+            else "-"
+        )
+        line = (
+            f"{r.node_count:>6} {r.interface_count:>4} "
+            f"{r.resources if r.resources is not None else '-':>9} "
+            f"{graph:>13}"
+        )
+        for step in steps:
+            s = r.steps.get(step)
+            wall_time = f"{s.wall_time:.1f}" if s else "-"
+            rss = f"{s.max_rss_kb / 1024:.0f}" if s and s.max_rss_kb else "-"
+            line += f" {wall_time:>12} {rss:>12}"
+        if r.error:
+            line += f"  FAILED: {r.error}"
+        print(line)
+
+
+def _int_list(s: str) -> list[int]:
+    return [int(x) for x in s.split(",")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure how the dev/flex topology scales",
+    )
+    parser.add_argument(
+        "--node-counts",
+        type=_int_list,
+        default=[10, 25, 50, 100],
+        help="Comma-separated node counts",
+    )
+    parser.add_argument(
+        "--interface-counts",
+        type=_int_list,
+        default=[0, 4],
+        help="Comma-separated interface counts",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="File to write the results to, as JSON",
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="Continue to larger node counts after a failure",
+    )
+    args = parser.parse_args(argv)
+
+    if max(args.node_counts) > _MAX_NODE_COUNT:
+        parser.error(f"Node count must be at most {_MAX_NODE_COUNT}")
+    if max(args.interface_counts) > _MAX_INTERFACE_COUNT:
+        parser.error(f"Interface count must be at most {_MAX_INTERFACE_COUNT}")
+
+    logging.basicConfig(level=logging.INFO)
+    for name in ("boto3", "botocore", "urllib3", "werkzeug"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    # Refer to http://docs.getmoto.org/en/latest/docs/getting_started.html#example-on-usage
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+    moto_server = MotoServer(ThreadedMotoServer(port=_free_port()))
+    moto_server.start()
+
+    work_dir = _THIS_DIR.parent / ".workers" / "scaling"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".jsonl") as timings_file:
+            tf = Terraform(
+                _THIS_DIR.parent / "terraform" / "flex",
+                vars={"aws_endpoint": moto_server.endpoint},
+                data_dir=work_dir / "flex",
+                state_file=work_dir / "flex.tfstate",
+                timings_file=Path(timings_file.name),
+            )
+            tf.init()
+            for interface_count in args.interface_counts:
+                for node_count in sorted(args.node_counts):
+                    result = _run(
+                        moto_server,
+                        tf,
+                        node_count,
+                        interface_count,
+                    )
+                    results.append(result)
+                    if result.error and not args.keep_going:
+                        break
+    finally:
+        moto_server.stop()
+
+    _print_results(results)
+    if args.output:
+        args.output.write_text(
+            json.dumps(cattrs.unstructure(results), indent=2) + "\n",
+        )
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import uuid
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from benchmarks import BenchmarkResult
+from terraform import Terraform
+
+from ..moto_server import MotoServer
+from .prereqs import Prerequisites
+
+pytestmark = pytest.mark.bench
+
+# This AMI should exist in the Moto server.
+# Refer to https://github.com/getmoto/moto/blob/master/moto/ec2/resources/amis.json.
+_NODE_AMI = "ami-03cf127a"
+
+
+@pytest.fixture(scope="module")
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server: MotoServer,
+) -> Terraform:
+    return Terraform(
+        this_dir / "terraform" / "flex",
+        vars={"aws_endpoint": moto_server.endpoint},
+        data_dir=worker_dir / "bench-flex",
+        state_file=worker_dir / "bench-flex.tfstate",
+    )
+
+
+@pytest.mark.parametrize("node_count", [1, 4, 16, 32])
+@pytest.mark.parametrize("interface_count", [0, 4])
+def test_flex(
+    tf: Terraform,
+    prereqs: Prerequisites,
+    benchmark: Callable[..., BenchmarkResult],
+    node_count: int,
+    interface_count: int,
+):
+    """
+    Benchmark the `dev/flex` topology at increasing node counts.
+
+    The benchmarks for each interface count form a scaling series, which
+    `benchmarks.py compare` checks for superlinear growth.
+
+    """
+    vars = {
+        "name_prefix": str(uuid.uuid4()),
+        "vpc_id": prereqs.vpc_id,
+        "cluster_subnet_id": prereqs.subnet_ids[0],
+        "cluster_name": prereqs.cluster_name,
+        "iam_instance_profile": prereqs.iam_instance_profile,
+        "key_name": prereqs.key_name,
+        "ami": _NODE_AMI,
+        "node_count": node_count,
+        "interface_count": interface_count,
+    }
+    series = f"flex[interface_count={interface_count}]"
+    benchmark(
+        tf,
+        f"{series}[node_count={node_count}]",
+        vars,
+        series=series,
+        scale=node_count,
+    )
@@ -0,0 +1,132 @@
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from benchmarks import BenchmarkResult
+from terraform import Terraform
+
+from ..moto_server import MotoServer
+from .prereqs import Prerequisites
+
+pytestmark = pytest.mark.bench
+
+# These AMIs should exist in the Moto server.
+# Refer to https://github.com/getmoto/moto/blob/master/moto/ec2/resources/amis.json.
+_BASTION_AMI = "ami-12c6146b"
+_NODE_AMI = "ami-03cf127a"
+
+
+def _bastion_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {
+        "ami": _BASTION_AMI,
+        "key_name": p.key_name,
+        "name": str(uuid.uuid4()),
+        "subnet_id": p.subnet_ids[0],
+    }
+
+
+def _data_subnets_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {
+        "availability_zone": "eu-west-1a",
+        "name_prefix": str(uuid.uuid4()),
+        "subnet_count": 4,
+        "vpc_id": p.vpc_id,
+    }
+
+
+def _eks_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {
+        "cluster_version": "1.33",
+        "name": str(uuid.uuid4()),
+        "subnet_ids": p.subnet_ids,
+    }
+
+
+def _instance_type_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {"instance_type": "m5.24xlarge"}
+
+
+def _irsa_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {
+        "role_name": str(uuid.uuid4()),
+        "role_policies": [p.iam_policy_arn],
+        "oidc_issuer": f"https://{uuid.uuid4()}.org",
+        "oidc_provider": str(uuid.uuid4()),
+        "namespace": str(uuid.uuid4()),
+        "service_account": str(uuid.uuid4()),
+    }
+
+
+def _key_pair_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    key_name = str(uuid.uuid4())
+    return {
+        "key_name": key_name,
+        "filename": str(tmp_path / f"{key_name}.pem"),
+    }
+
+
+def _node_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {
+        "ami": _NODE_AMI,
+        "cluster_name": p.cluster_name,
+        "iam_instance_profile": p.iam_instance_profile,
+        "key_name": p.key_name,
+        "name": str(uuid.uuid4()),
+        "private_ip_address": "10.0.0.10",
+        "security_groups": [],
+        "subnet_id": p.subnet_ids[0],
+        "wait": False,
+    }
+
+
+def _node_props_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {"instance_type": "m5.24xlarge", "use_case": "maximal"}
+
+
+def _vpc_vars(p: Prerequisites, tmp_path: Path) -> dict[str, Any]:
+    return {
+        "name": str(uuid.uuid4()),
+        "azs": ["us-east-1a", "us-east-1b"],
+        "cidr": "10.1.0.0/16",
+        "enable_nat_gateway": True,
+        "private_subnets": ["10.1.0.0/24"],
+        "public_subnets": ["10.1.200.0/24"],
+    }
+
+
+# Modules with a test configuration in `ut/terraform`, and the variables to
+# benchmark them with.
+# The remaining modules in `modules/aws` need a Kubernetes cluster, so cannot
+# be benchmarked against Moto.
+_MODULE_VARS = {
+    "bastion": _bastion_vars,
+    "data-subnets": _data_subnets_vars,
+    "eks": _eks_vars,
+    "instance-type": _instance_type_vars,
+    "irsa": _irsa_vars,
+    "key-pair": _key_pair_vars,
+    "node": _node_vars,
+    "node-props": _node_props_vars,
+    "vpc": _vpc_vars,
+}
+
+
+@pytest.mark.parametrize("module", _MODULE_VARS)
+def test_module(
+    this_dir: Path,
+    worker_dir: Path,
+    tmp_path: Path,
+    moto_server: MotoServer,
+    prereqs: Prerequisites,
+    benchmark: Callable[..., BenchmarkResult],
+    module: str,
+):
+    tf = Terraform(
+        this_dir / "terraform" / module,
+        vars={"aws_endpoint": moto_server.endpoint},
+        data_dir=worker_dir / f"bench-{module}",
+        state_file=worker_dir / f"bench-{module}.tfstate",
+    )
+    benchmark(tf, f"modules/{module}", _MODULE_VARS[module](prereqs, tmp_path))
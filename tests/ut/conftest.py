@@ -1,6 +1,6 @@
 import logging
 import os
-import random
+import socket
 from pathlib import Path
 
 import boto3
@@ -10,8 +10,19 @@ from mypy_boto3_ec2 import EC2ServiceResource
 from mypy_boto3_eks import EKSClient
 from mypy_boto3_iam import IAMServiceResource
 
+from .ec2_snapshot import EC2Snapshot
 from .moto_server import MotoServer
 
+try:
+    from moto import mock_aws
+
+    _MOCKS = (mock_aws,)
+except ImportError:
+    # Moto < 5 has separate mocks for each service.
+    from moto import mock_ec2, mock_eks, mock_iam, mock_sts
+
+    _MOCKS = (mock_ec2, mock_eks, mock_iam, mock_sts)
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,8 +34,55 @@ def pytest_configure(config: pytest.Config) -> None:
     logging.getLogger("werkzeug").setLevel(logging.WARN)
 
 
+# Number of ports reserved for each pytest-xdist worker.
+_PORTS_PER_WORKER = 100
+_BASE_PORT = 50000
+
+
+def _worker_index(worker_id: str) -> int:
+    """Get the index of a pytest-xdist worker, e.g. 'gw3' -> 3."""
+    if worker_id.startswith("gw"):
+        return int(worker_id[2:])
+    return 0
+
+
+def _port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("0.0.0.0", port))
+        except OSError:
+            return False
+    return True
+
+
+@pytest.fixture(scope="session")
+def worker_id() -> str:
+    """
+    The pytest-xdist worker ID, or 'master' if not running in parallel.
+
+    This shadows the pytest-xdist fixture of the same name so that it is
+    available without pytest-xdist installed.
+
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+@pytest.fixture(scope="session")
+def worker_dir(this_dir: Path, worker_id: str) -> Path:
+    """
+    A directory private to this worker for Terraform data and state.
+
+    This is stable across test runs so that initialized Terraform data
+    directories can be reused.
+
+    """
+    d = this_dir / ".workers" / worker_id
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
 @pytest.fixture(scope="session", autouse=True)
-def moto_server() -> MotoServer:
+def moto_server(worker_id: str) -> MotoServer:
     # Refer to http://docs.getmoto.org/en/latest/docs/getting_started.html#example-on-usage
     os.environ["AWS_ACCESS_KEY_ID"] = "testing"
     os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
@@ -32,27 +90,64 @@ def moto_server() -> MotoServer:
     os.environ["AWS_SESSION_TOKEN"] = "testing"
     os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
 
-    for i, port in enumerate(random.sample(range(50000, 50500), 100)):
-        try:
-            server = MotoServer(ThreadedMotoServer(port=port))
-            server.start()
-            yield server
+    # Each worker allocates from its own port range, so workers never
+    # collide with each other.
+    start_port = _BASE_PORT + _worker_index(worker_id) * _PORTS_PER_WORKER
+    for port in range(start_port, start_port + _PORTS_PER_WORKER):
+        if _port_is_free(port):
             break
-        except Exception:
-            if i >= 10:
-                raise
-            raise
+    else:
+        raise RuntimeError(
+            f"No free port for Moto server in range {start_port}-{port}",
+        )
+
+    server = MotoServer(ThreadedMotoServer(port=port))
+    server.start()
+    yield server
     server.stop()
 
 
 @pytest.fixture(scope="session")
-def ec2(moto_server: MotoServer) -> EC2ServiceResource:
-    return boto3.resource("ec2", endpoint_url=moto_server.endpoint)
+def aws_endpoint(
+    request: pytest.FixtureRequest,
+    moto_server: MotoServer,
+) -> str | None:
+    """
+    Endpoint for boto3 clients created by fixtures.
+
+    If ``--moto-in-process`` is given this is None, and boto3 calls are
+    intercepted by Moto's mock and handled directly by the in-process
+    backends. The Moto server runs in a thread in this process, so it sees
+    the same state.
+
+    """
+    if not request.config.getoption("moto_in_process"):
+        yield moto_server.endpoint
+        return
+
+    mocks = [mock() for mock in _MOCKS]
+    for mock in mocks:
+        # Don't reset the backends, which are shared with the server.
+        mock.start(reset=False)
+    yield None
+    for mock in mocks:
+        mock.stop()
+
+
+@pytest.fixture(scope="session")
+def ec2(aws_endpoint: str | None) -> EC2ServiceResource:
+    return boto3.resource("ec2", endpoint_url=aws_endpoint)
+
+
+@pytest.fixture
+def ec2_snapshot(ec2: EC2ServiceResource) -> EC2Snapshot:
+    """Batched view of EC2 instances, cached for the duration of a test."""
+    return EC2Snapshot(ec2.meta.client)
 
 
 @pytest.fixture(scope="session")
-def iam(moto_server: MotoServer) -> IAMServiceResource:
-    return boto3.resource("iam", endpoint_url=moto_server.endpoint)
+def iam(aws_endpoint: str | None) -> IAMServiceResource:
+    return boto3.resource("iam", endpoint_url=aws_endpoint)
 
 
 @pytest.fixture(scope="session")
@@ -61,5 +156,5 @@ def this_dir() -> Path:
 
 
 @pytest.fixture(scope="module")
-def eks_client(moto_server: MotoServer) -> EKSClient:
-    return boto3.client("eks", endpoint_url=moto_server.endpoint)
+def eks_client(aws_endpoint: str | None) -> EKSClient:
+    return boto3.client("eks", endpoint_url=aws_endpoint)
@@ -0,0 +1,213 @@
+__all__ = (
+    "EC2Snapshot",
+    "InstanceSnapshot",
+)
+
+import base64
+from typing import Any, Callable, Iterable, Iterator
+
+from attrs import define, field
+from mypy_boto3_ec2 import EC2Client
+
+# Maximum number of values in a filter for EC2 describe calls.
+_MAX_FILTER_VALUES = 200
+
+
+def _chunks(items: list[str], size: int) -> Iterator[list[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+@define
+class InstanceSnapshot:
+    """
+    The state of an EC2 instance, as fetched by `EC2Snapshot`.
+
+    ..attribute:: data
+        The instance, as returned by ``DescribeInstances``.
+
+    ..attribute:: network_interfaces
+        The attached network interfaces, as returned by
+        ``DescribeNetworkInterfaces``, ordered by device index.
+
+    ..attribute:: security_groups
+        The security groups of the network interfaces, as returned by
+        ``DescribeSecurityGroups``, by ID.
+
+    """
+
+    data: dict[str, Any]
+    network_interfaces: list[dict[str, Any]]
+    security_groups: dict[str, dict[str, Any]]
+    _load_user_data: Callable[[], str | None] = field(repr=False)
+    _user_data: str | None = field(default=None, init=False, repr=False)
+    _user_data_loaded: bool = field(default=False, init=False, repr=False)
+
+    @property
+    def id(self) -> str:
+        return self.data["InstanceId"]
+
+    @property
+    def tags(self) -> dict[str, str]:
+        return {tag["Key"]: tag["Value"] for tag in self.data.get("Tags", [])}
+
+    @property
+    def key_name(self) -> str | None:
+        return self.data.get("KeyName")
+
+    @property
+    def private_ip_address(self) -> str | None:
+        return self.data.get("PrivateIpAddress")
+
+    @property
+    def public_ip_address(self) -> str | None:
+        return self.data.get("PublicIpAddress")
+
+    @property
+    def source_dest_check(self) -> bool | None:
+        return self.data.get("SourceDestCheck")
+
+    @property
+    def user_data(self) -> str | None:
+        """
+        The decoded user data.
+
+        There is no batched API for this, so it is only fetched (with one
+        call per instance) when first accessed.
+
+        """
+        if not self._user_data_loaded:
+            self._user_data = self._load_user_data()
+            self._user_data_loaded = True
+        return self._user_data
+
+    def network_interface(self, device_index: int) -> dict[str, Any]:
+        """
+        Get the network interface attached at the given device index.
+
+        :raises KeyError:
+            If there is no such network interface.
+
+        """
+        for eni in self.network_interfaces:
+            if eni["Attachment"]["DeviceIndex"] == device_index:
+                return eni
+        raise KeyError(device_index)
+
+    def assert_tag(self, tag_key: str, tag_value: str) -> None:
+        """
+        Assert an instance tag is as expected.
+
+        :param tag_key:
+            Expected tag key.
+
+        :param tag_value:
+            Expected tag value.
+
+        :raises AssertionError:
+            If the tag key does not exist, or the actual tag value does not
+            match the expected tag value.
+
+        """
+        tags = self.tags
+        if tag_key not in tags:
+            raise AssertionError(f"tag '{tag_key}' does not exist")
+        assert tags[tag_key] == tag_value
+
+
+@define
+class EC2Snapshot:
+    """
+    Batched, cached view of EC2 instances for test assertions.
+
+    Fetching any number of instances takes three describe calls: one each
+    for the instances, their network interfaces, and the security groups of
+    those interfaces.  Results are cached until `invalidate` is called, so
+    assertions do not each make a round trip to the server.
+
+    """
+
+    _client: EC2Client
+    _instances: dict[str, InstanceSnapshot] = field(factory=dict, init=False)
+
+    def invalidate(self) -> None:
+        """Drop all cached state, e.g. after applying a change."""
+        self._instances.clear()
+
+    def instance(self, instance_id: str) -> InstanceSnapshot:
+        return self.instances([instance_id])[instance_id]
+
+    def instances(
+        self,
+        instance_ids: Iterable[str],
+    ) -> dict[str, InstanceSnapshot]:
+        """
+        Get the state of the given instances, fetching any not cached.
+
+        :returns:
+            Mapping of instance ID to snapshot.
+
+        """
+        instance_ids = list(instance_ids)
+        if missing := [i for i in instance_ids if i not in self._instances]:
+            self._fetch(missing)
+        return {i: self._instances[i] for i in instance_ids}
+
+    def _fetch(self, instance_ids: list[str]) -> None:
+        instances = []
+        paginator = self._client.get_paginator("describe_instances")
+        for page in paginator.paginate(InstanceIds=instance_ids):
+            for reservation in page["Reservations"]:
+                instances.extend(reservation["Instances"])
+
+        enis_by_instance: dict[str, list[dict[str, Any]]] = {
+            i: [] for i in instance_ids
+        }
+        paginator = self._client.get_paginator("describe_network_interfaces")
+        for chunk in _chunks(instance_ids, _MAX_FILTER_VALUES):
+            for page in paginator.paginate(
+                Filters=[{"Name": "attachment.instance-id", "Values": chunk}],
+            ):
+                for eni in page["NetworkInterfaces"]:
+                    instance_id = eni["Attachment"]["InstanceId"]
+                    enis_by_instance[instance_id].append(eni)
+
+        group_ids = sorted(
+            {
+                group["GroupId"]
+                for enis in enis_by_instance.values()
+                for eni in enis
+                for group in eni["Groups"]
+            },
+        )
+        security_groups = {}
+        for chunk in _chunks(group_ids, _MAX_FILTER_VALUES):
+            for group in self._client.describe_security_groups(
+                GroupIds=chunk,
+            )["SecurityGroups"]:
+                security_groups[group["GroupId"]] = group
+
+        for instance in instances:
+            instance_id = instance["InstanceId"]
+            enis = sorted(
+                enis_by_instance[instance_id],
+                key=lambda eni: eni["Attachment"]["DeviceIndex"],
+            )
+            self._instances[instance_id] = InstanceSnapshot(
+                instance,
+                enis,
+                {
+                    group["GroupId"]: security_groups[group["GroupId"]]
+                    for eni in enis
+                    for group in eni["Groups"]
+                },
+                load_user_data=lambda i=instance_id: self._user_data(i),
+            )
+
+    def _user_data(self, instance_id: str) -> str | None:
+        attr = self._client.describe_instance_attribute(
+            InstanceId=instance_id,
+            Attribute="userData",
+        )
+        value = attr.get("UserData", {}).get("Value")
+        return base64.b64decode(value).decode() if value else None
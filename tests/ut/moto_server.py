@@ -1,11 +1,32 @@
-__all__ = ("MotoServer",)
+__all__ = (
+    "MotoServer",
+    "MotoSnapshot",
+)
 
 
+import copy
+from typing import Any
+
 import requests
 from attrs import define
+from moto.backends import get_backend
 from moto.server import ThreadedMotoServer
 
 
+@define
+class MotoSnapshot:
+    """
+    A snapshot of Moto backend state, created by `MotoServer.snapshot`.
+
+    ..attribute:: services
+        The services included in the snapshot.
+
+    """
+
+    services: tuple[str, ...]
+    _state: dict[tuple[str, str, str], dict[str, Any]]
+
+
 @define
 class MotoServer:
     """Wrapper around `ThreadedMotoServer`."""
@@ -28,3 +49,52 @@ class MotoServer:
 
     def reset(self):
         requests.post(f"{self.endpoint}/moto-api/reset")
+
+    def snapshot(
+        self,
+        services: tuple[str, ...] = ("ec2", "eks", "iam", "sts"),
+    ) -> MotoSnapshot:
+        """
+        Take a snapshot of the current state of the given services.
+
+        The server runs in a thread in this process, so this works directly on
+        the in-memory backends.  It must not be called while the server is
+        handling requests.
+
+        :param services:
+            The services to include in the snapshot.
+
+        """
+        state = {}
+        for service in services:
+            for account_id, account_backends in get_backend(service).items():
+                for region, backend in account_backends.items():
+                    state[(service, account_id, region)] = copy.deepcopy(
+                        backend.__dict__,
+                    )
+        return MotoSnapshot(services, state)
+
+    def restore(self, snapshot: MotoSnapshot) -> None:
+        """
+        Restore the state of services to a snapshot.
+
+        This is much cheaper than resetting the server and recreating the
+        resources in the snapshot.  Backends created since the snapshot was
+        taken are reset.
+
+        The snapshot may be restored any number of times.
+
+        :param snapshot:
+            The snapshot to restore.
+
+        """
+        for service in snapshot.services:
+            for account_id, account_backends in get_backend(service).items():
+                for region, backend in account_backends.items():
+                    try:
+                        state = snapshot._state[(service, account_id, region)]
+                    except KeyError:
+                        backend.reset()
+                        continue
+                    backend.__dict__.clear()
+                    backend.__dict__.update(copy.deepcopy(state))
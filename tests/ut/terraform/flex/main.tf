@@ -0,0 +1,84 @@
+# This mirrors the AWS resources of `dev/flex`, with the bootstrap
+# configuration's remote state replaced by variables, so that the scaling of
+# the topology can be measured against the Moto server.
+# Keep this in sync with `dev/flex/main.tf`.
+
+provider "aws" {
+  endpoints {
+    ec2 = var.aws_endpoint
+    eks = var.aws_endpoint
+    iam = var.aws_endpoint
+    sts = var.aws_endpoint
+  }
+}
+
+data "aws_subnet" "cluster" {
+  id = var.cluster_subnet_id
+}
+
+resource "aws_subnet" "data" {
+  count = var.interface_count
+
+  availability_zone = data.aws_subnet.cluster.availability_zone
+  cidr_block        = "10.0.${count.index + 10}.0/24"
+  vpc_id            = var.vpc_id
+}
+
+resource "aws_security_group" "data" {
+  name   = "${var.name_prefix}-data"
+  vpc_id = var.vpc_id
+  ingress {
+    from_port = 0
+    to_port   = 0
+    protocol  = -1
+    self      = true
+  }
+  egress {
+    from_port = 0
+    to_port   = 0
+    protocol  = -1
+    self      = true
+  }
+}
+
+locals {
+  nodes = {
+    for i in range(var.node_count) :
+    "node${i}" => {
+      private_ip_address = cidrhost(data.aws_subnet.cluster.cidr_block, i + 11)
+      network_interfaces = [
+        for j in range(var.interface_count) :
+        {
+          private_ips     = [cidrhost(aws_subnet.data[j].cidr_block, i + 11)]
+          security_groups = [aws_security_group.data.id]
+          subnet_id       = aws_subnet.data[j].id
+        }
+      ]
+    }
+  }
+}
+
+module "node" {
+  source   = "../../../../modules/aws/node"
+  for_each = local.nodes
+
+  name                 = "${var.name_prefix}-${each.key}"
+  ami                  = var.ami
+  cluster_name         = var.cluster_name
+  iam_instance_profile = var.iam_instance_profile
+  instance_type        = var.instance_type
+  key_name             = var.key_name
+  network_interfaces   = each.value.network_interfaces
+  private_ip_address   = each.value.private_ip_address
+  security_groups      = var.security_groups
+  subnet_id            = data.aws_subnet.cluster.id
+  wait                 = false
+
+  labels = {
+    name = each.key
+  }
+}
+
+output "nodes" {
+  value = { for name, node in module.node : name => node.id }
+}
@@ -0,0 +1,76 @@
+variable "aws_endpoint" {
+  description = "AWS endpoint URL"
+  type        = string
+  nullable    = false
+}
+
+variable "name_prefix" {
+  description = "Prefix for resource names"
+  type        = string
+  nullable    = false
+}
+
+variable "vpc_id" {
+  description = "VPC to create the data subnets in"
+  type        = string
+  nullable    = false
+}
+
+variable "cluster_subnet_id" {
+  description = "Subnet for the nodes' primary interfaces"
+  type        = string
+  nullable    = false
+}
+
+variable "cluster_name" {
+  description = "Name of the EKS cluster the nodes should join"
+  type        = string
+  nullable    = false
+}
+
+variable "iam_instance_profile" {
+  description = "IAM instance profile to apply to the nodes"
+  type        = string
+  nullable    = false
+}
+
+variable "key_name" {
+  description = "Key pair name to install on the nodes"
+  type        = string
+  nullable    = false
+}
+
+variable "ami" {
+  description = "AMI to launch the nodes with"
+  type        = string
+  nullable    = false
+}
+
+variable "instance_type" {
+  description = "Instance type for the nodes"
+  type        = string
+  default     = "m5.2xlarge"
+  nullable    = false
+}
+
+variable "security_groups" {
+  description = "Security groups for the nodes' primary interfaces"
+  type        = list(string)
+  default     = []
+  nullable    = false
+}
+
+variable "node_count" {
+  description = <<-EOT
+  Number of worker nodes to create.
+  Unlike `dev/flex` this is not limited, so that scaling can be measured.
+  EOT
+  type        = number
+  nullable    = false
+}
+
+variable "interface_count" {
+  description = "Number of interfaces to create on each worker node"
+  type        = number
+  nullable    = false
+}
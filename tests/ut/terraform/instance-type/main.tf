@@ -0,0 +1,17 @@
+provider "aws" {
+  endpoints {
+    ec2 = var.aws_endpoint
+    sts = var.aws_endpoint
+  }
+}
+
+module "instance_type" {
+  source = "../../../../modules/aws/instance-type"
+
+  instance_type = var.instance_type
+  use_catalog   = var.use_catalog
+}
+
+output "module" {
+  value = module.instance_type
+}
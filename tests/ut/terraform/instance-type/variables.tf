@@ -0,0 +1,21 @@
+variable "aws_endpoint" {
+  description = "AWS endpoint URL"
+  type        = string
+  nullable    = false
+}
+
+variable "instance_type" {
+  description = "Instance type"
+  type        = string
+  nullable    = false
+}
+
+variable "use_catalog" {
+  description = <<-EOT
+  Use the local instance type catalog, rather than the EC2 API, if it contains the instance type.
+  If false, or if the instance type is not in the catalog, the properties are looked up using the EC2 API.
+  EOT
+  type        = bool
+  default     = false
+  nullable    = false
+}
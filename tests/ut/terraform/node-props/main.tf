@@ -0,0 +1,18 @@
+provider "aws" {
+  endpoints {
+    ec2 = var.aws_endpoint
+    sts = var.aws_endpoint
+  }
+}
+
+module "node_props" {
+  source = "../../../../modules/aws/node-props"
+
+  instance_type = var.instance_type
+  use_catalog   = var.use_catalog
+  use_case      = var.use_case
+}
+
+output "module" {
+  value = module.node_props
+}
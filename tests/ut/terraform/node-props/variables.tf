@@ -0,0 +1,32 @@
+variable "aws_endpoint" {
+  description = "AWS endpoint URL"
+  type        = string
+  nullable    = false
+}
+
+variable "instance_type" {
+  description = "Instance type"
+  type        = string
+  nullable    = false
+}
+
+variable "use_case" {
+  description = "XRd use case"
+  type        = string
+  nullable    = false
+
+  validation {
+    condition     = contains(["cloud-router", "minimal", "maximal"], var.use_case)
+    error_message = "Must be one of: 'cloud-router', 'minimal', 'maximal'."
+  }
+}
+
+variable "use_catalog" {
+  description = <<-EOT
+  Read the properties of the instance type from the local catalog, rather than the EC2 API.
+  Refer to the 'instance-type' module.
+  EOT
+  type        = bool
+  default     = false
+  nullable    = false
+}
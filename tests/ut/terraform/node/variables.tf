@@ -124,6 +124,22 @@ variable "network_interfaces" {
   default = []
 }
 
+variable "network_interface_attachment" {
+  description = <<-EOT
+  How to attach the secondary network interfaces to the node.
+  "hot" attaches them once kubelet has started on the node.
+  "cold" creates them (and the primary interface) up front and attaches them when the node is launched, which is faster to bring up and tear down.
+  EOT
+  type        = string
+  default     = "hot"
+  nullable    = false
+
+  validation {
+    condition     = contains(["hot", "cold"], var.network_interface_attachment)
+    error_message = "Must be one of: hot, cold."
+  }
+}
+
 variable "placement_group" {
   description = <<-EOT
   Placement group to launch the node into.
@@ -135,6 +151,16 @@ variable "placement_group" {
   default     = null
 }
 
+variable "use_catalog" {
+  description = <<-EOT
+  Read the properties of the instance type from the local catalog, rather than the EC2 API.
+  Refer to the 'instance-type' module.
+  EOT
+  type        = bool
+  default     = false
+  nullable    = false
+}
+
 variable "user_data" {
   description = "Custom user data to append to the EC2 node's user data"
   type        = string
@@ -148,6 +174,40 @@ variable "wait" {
   nullable    = false
 }
 
+variable "wait_method" {
+  description = <<-EOT
+  How to wait for the instance to reach Ready status, if 'wait' is set.
+  "job" runs a Kubernetes Job on the node.
+  "watch" watches the node via the Kubernetes API, which is quicker, but requires python3 and the AWS CLI (to refresh the cluster token) on the machine running Terraform.
+  EOT
+  type        = string
+  default     = "job"
+  nullable    = false
+
+  validation {
+    condition     = contains(["job", "watch"], var.wait_method)
+    error_message = "Must be one of: job, watch."
+  }
+}
+
+variable "wait_aws_profile" {
+  description = <<-EOT
+  AWS CLI profile used to refresh the cluster token, if 'wait_method' is "watch".
+  This should match the profile used by the AWS provider; by default the AWS CLI's default credentials are used.
+  EOT
+  type        = string
+  default     = null
+}
+
+variable "wait_aws_role_arn" {
+  description = <<-EOT
+  ARN of a role to assume to refresh the cluster token, if 'wait_method' is "watch".
+  This should match the role assumed by the AWS provider, if any.
+  EOT
+  type        = string
+  default     = null
+}
+
 variable "xrd_vr_cpuset" {
   description = <<-EOT
   If this node is intended for an XRd vRouter workload, this is the intended CPU set provided for XRd vRouter use.
@@ -5,6 +5,8 @@ modules_dir="${this_dir}/../../../modules/aws"
 
 for dir in "$this_dir"/*/; do
     module=$(basename "$dir")
+    # Skip configurations which do not wrap a single module.
+    [ -f "${modules_dir}/${module}/variables.tf" ] || continue
     echo "" > "${dir}variables.tf"
     cat << EOF > "${dir}variables.tf"
 variable "aws_endpoint" {
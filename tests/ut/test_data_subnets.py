@@ -21,10 +21,16 @@ class Outputs(TerraformOutputs):
 
 
 @pytest.fixture(scope="module")
-def tf(this_dir: Path, moto_server) -> Terraform:
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server,
+) -> Terraform:
     tf = Terraform(
         this_dir / "terraform" / "data-subnets",
         vars={"aws_endpoint": f"http://localhost:{moto_server.port}"},
+        data_dir=worker_dir / "data-subnets",
+        state_file=worker_dir / "data-subnets.tfstate",
     )
     tf.init(upgrade=True)
     return tf
@@ -33,12 +39,12 @@ def tf(this_dir: Path, moto_server) -> Terraform:
 @pytest.fixture(autouse=True)
 def reset(
     moto_server: MotoServer,
-    this_dir: Path,
+    tf: Terraform,
     base_vars: dict[str, Any],
 ) -> None:
     yield
     moto_server.reset()
-    (this_dir / "terraform.tfstate").unlink(missing_ok=True)
+    tf.state_file.unlink(missing_ok=True)
 
 
 @pytest.fixture
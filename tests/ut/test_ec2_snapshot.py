@@ -0,0 +1,97 @@
+import pytest
+from mypy_boto3_ec2 import EC2ServiceResource
+
+from .ec2_snapshot import EC2Snapshot
+from .moto_server import MotoServer
+
+# This AMI should exist in the Moto server.
+# Refer to https://github.com/getmoto/moto/blob/master/moto/ec2/resources/amis.json.
+_AMI = "ami-03cf127a"
+
+
+@pytest.fixture(autouse=True)
+def reset(moto_server: MotoServer) -> None:
+    yield
+    moto_server.reset()
+
+
+@pytest.fixture
+def ec2_calls(ec2: EC2ServiceResource) -> list[str]:
+    """Names of the EC2 API calls made during the test."""
+    calls = []
+
+    def record_call(model, **_):
+        calls.append(model.name)
+
+    events = ec2.meta.client.meta.events
+    events.register("before-call.ec2.*", record_call)
+    yield calls
+    events.unregister("before-call.ec2.*", record_call)
+
+
+def test_batched(
+    ec2: EC2ServiceResource,
+    ec2_snapshot: EC2Snapshot,
+    ec2_calls: list[str],
+):
+    vpc = ec2.create_vpc(CidrBlock="10.0.0.0/16")
+    subnet = vpc.create_subnet(CidrBlock="10.0.0.0/24")
+    sg = ec2.create_security_group(
+        GroupName="test",
+        Description="test",
+        VpcId=vpc.id,
+    )
+    instances = ec2.create_instances(
+        ImageId=_AMI,
+        MinCount=3,
+        MaxCount=3,
+        SubnetId=subnet.id,
+        SecurityGroupIds=[sg.id],
+        UserData="my user data",
+        TagSpecifications=[
+            {
+                "ResourceType": "instance",
+                "Tags": [{"Key": "Name", "Value": "node"}],
+            },
+        ],
+    )
+    eni = ec2.create_network_interface(SubnetId=subnet.id, Groups=[sg.id])
+    eni.attach(InstanceId=instances[0].id, DeviceIndex=1)
+
+    ec2_calls.clear()
+    snapshots = ec2_snapshot.instances(i.id for i in instances)
+    assert ec2_calls == [
+        "DescribeInstances",
+        "DescribeNetworkInterfaces",
+        "DescribeSecurityGroups",
+    ]
+
+    snapshot = snapshots[instances[0].id]
+    assert snapshot.id == instances[0].id
+    assert snapshot.tags == {"Name": "node"}
+    snapshot.assert_tag("Name", "node")
+    with pytest.raises(AssertionError):
+        snapshot.assert_tag("Name", "other")
+    with pytest.raises(AssertionError):
+        snapshot.assert_tag("Other", "node")
+    assert [
+        eni["Attachment"]["DeviceIndex"] for eni in snapshot.network_interfaces
+    ] == [0, 1]
+    assert snapshot.network_interface(1)["NetworkInterfaceId"] == eni.id
+    assert list(snapshot.security_groups) == [sg.id]
+
+    # User data is fetched on first use only.
+    assert snapshot.user_data == "my user data"
+    assert snapshot.user_data == "my user data"
+    assert ec2_calls[3:] == ["DescribeInstanceAttribute"]
+
+    # Cached instances are not fetched again until invalidated.
+    ec2_snapshot.instance(instances[1].id)
+    assert len(ec2_calls) == 4
+    ec2_snapshot.invalidate()
+    ec2_snapshot.instance(instances[1].id)
+    assert ec2_calls[4:] == [
+        "DescribeInstances",
+        "DescribeNetworkInterfaces",
+        "DescribeSecurityGroups",
+    ]
@@ -46,19 +46,25 @@ class Cluster:
 
 
 @pytest.fixture(scope="module")
-def tf(this_dir: Path, moto_server) -> Terraform:
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server,
+) -> Terraform:
     tf = Terraform(
         this_dir / "terraform" / "eks",
         vars={"aws_endpoint": f"http://localhost:{moto_server.port}"},
+        data_dir=worker_dir / "eks",
+        state_file=worker_dir / "eks.tfstate",
     )
     tf.init(upgrade=True)
     return tf
 
 
 @pytest.fixture(autouse=True)
-def reset(moto_server: MotoServer, this_dir, tf) -> None:
+def reset(moto_server: MotoServer, tf: Terraform) -> None:
     moto_server.reset()
-    (this_dir / "terraform.tfstate").unlink(missing_ok=True)
+    tf.state_file.unlink(missing_ok=True)
 
 
 @pytest.fixture
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import pytest
+from attrs import define
+from mypy_boto3_ec2 import EC2ServiceResource
+
+from instance_types import load_catalog, validate_catalog
+from terraform import Terraform, TerraformOutputs
+
+from .moto_server import MotoServer
+
+
+@define
+class Outputs(TerraformOutputs):
+    default_cores: int
+    default_threads_per_core: int
+    default_vcpus: int
+    ipv4_addresses_per_interface: int
+    maximum_network_interfaces: int
+    from_catalog: bool
+
+
+@pytest.fixture(scope="module")
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server: MotoServer,
+) -> Terraform:
+    tf = Terraform(
+        this_dir / "terraform" / "instance-type",
+        vars={"aws_endpoint": f"http://localhost:{moto_server.port}"},
+        data_dir=worker_dir / "instance-type",
+        state_file=worker_dir / "instance-type.tfstate",
+    )
+    tf.init(upgrade=True)
+    return tf
+
+
+# Properties of instance types used by this repository, taken from the EC2
+# instance type documentation rather than from any EC2 API (real or mocked),
+# so that they are an independent check on the catalog.
+# Refer to https://docs.aws.amazon.com/ec2/latest/instancetypes/.
+_KNOWN_INSTANCE_TYPES = {
+    "c5n.18xlarge": (36, 2, 72, 50, 15),
+    "m5.24xlarge": (48, 2, 96, 50, 15),
+    "m5.2xlarge": (4, 2, 8, 15, 4),
+    "m5.4xlarge": (8, 2, 16, 30, 8),
+    "m5.large": (1, 2, 2, 10, 3),
+    "m5.xlarge": (2, 2, 4, 15, 4),
+    "m5n.24xlarge": (48, 2, 96, 50, 15),
+    "t3.medium": (1, 2, 2, 6, 3),
+    "t3.nano": (1, 2, 2, 2, 2),
+}
+
+
+def test_catalog_valid(ec2: EC2ServiceResource):
+    """
+    Check the catalog against the Moto server.
+
+    Note Moto's instance type data is itself a snapshot of the EC2 API, so
+    this only checks the catalog is consistent with it; refer to
+    `test_catalog_known` for an independent check.
+
+    """
+    assert validate_catalog(load_catalog(), ec2.meta.client) == []
+
+
+@pytest.mark.parametrize("instance_type", sorted(_KNOWN_INSTANCE_TYPES))
+def test_catalog_known(instance_type: str):
+    props = load_catalog()["instance_types"][instance_type]
+    assert (
+        props["default_cores"],
+        props["default_threads_per_core"],
+        props["default_vcpus"],
+        props["ipv4_addresses_per_interface"],
+        props["maximum_network_interfaces"],
+    ) == _KNOWN_INSTANCE_TYPES[instance_type]
+
+
+def test_catalog_source():
+    """The catalog must record where it was generated from."""
+    assert load_catalog()["source"] in ("ec2", "moto")
+
+
+@pytest.mark.parametrize(
+    "instance_type",
+    ["m5.2xlarge", "m5.24xlarge", "m6in.32xlarge"],
+)
+def test_catalog(tf: Terraform, instance_type: str):
+    catalog = load_catalog()["instance_types"]
+    outputs = Outputs.from_plan(
+        tf,
+        vars={"instance_type": instance_type, "use_catalog": True},
+    )
+    assert outputs.from_catalog
+    assert outputs.default_cores == catalog[instance_type]["default_cores"]
+    assert (
+        outputs.maximum_network_interfaces
+        == catalog[instance_type]["maximum_network_interfaces"]
+    )
+
+    # The catalog must agree with the EC2 API.
+    ec2_outputs = Outputs.from_plan(tf, vars={"instance_type": instance_type})
+    assert not ec2_outputs.from_catalog
+    assert ec2_outputs == Outputs(
+        default_cores=outputs.default_cores,
+        default_threads_per_core=outputs.default_threads_per_core,
+        default_vcpus=outputs.default_vcpus,
+        ipv4_addresses_per_interface=outputs.ipv4_addresses_per_interface,
+        maximum_network_interfaces=outputs.maximum_network_interfaces,
+        from_catalog=False,
+    )
@@ -13,10 +13,16 @@ from .moto_server import MotoServer
 
 
 @pytest.fixture(scope="module")
-def tf(this_dir: Path, moto_server) -> Terraform:
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server,
+) -> Terraform:
     tf = Terraform(
         this_dir / "terraform" / "key-pair",
         vars={"aws_endpoint": f"http://localhost:{moto_server.port}"},
+        data_dir=worker_dir / "key-pair",
+        state_file=worker_dir / "key-pair.tfstate",
     )
     tf.init(upgrade=True)
     return tf
@@ -25,12 +31,12 @@ def tf(this_dir: Path, moto_server) -> Terraform:
 @pytest.fixture(autouse=True)
 def reset(
     moto_server: MotoServer,
-    this_dir: Path,
+    tf: Terraform,
     base_vars: dict[str, Any],
 ) -> None:
     yield
     moto_server.reset()
-    (this_dir / "terraform.tfstate").unlink(missing_ok=True)
+    tf.state_file.unlink(missing_ok=True)
     Path(base_vars["filename"]).unlink(missing_ok=True)
 
 
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import multus
+
+MANIFEST = b"""\
+---
+apiVersion: v1
+kind: ServiceAccount
+metadata:
+  name: multus
+  namespace: kube-system
+---
+apiVersion: apps/v1
+kind: DaemonSet
+metadata:
+  name: kube-multus-ds
+  namespace: kube-system
+"""
+
+
+@pytest.fixture
+def manifest_url() -> str:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(MANIFEST)
+
+    httpd = ThreadingHTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.start()
+    yield f"http://localhost:{httpd.server_address[1]}/multus.yml"
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def lock_file(tmp_path: Path, manifest_url: str) -> Path:
+    path = tmp_path / "multus.json"
+    path.write_text(
+        json.dumps(
+            {
+                "version": "v1",
+                "ref": "v1.0.0",
+                "url": manifest_url,
+                "sha256": None,
+                "documents": None,
+            },
+        ),
+    )
+    return path
+
+
+def test_split_documents():
+    assert multus.split_documents("---\na: 1\n---\nb: 2\n") == [
+        "\na: 1\n",
+        "\nb: 2\n",
+    ]
+    assert multus.split_documents("a: 1---") == ["a: 1"]
+
+
+def test_validate_documents():
+    assert multus.validate_documents(MANIFEST.decode()) == [
+        "ServiceAccount/multus",
+        "DaemonSet/kube-multus-ds",
+    ]
+
+    # Whitespace between separators would fail to decode in Terraform.
+    with pytest.raises(ValueError, match="Document 2 is not a mapping"):
+        multus.validate_documents(MANIFEST.decode() + "---\n")
+
+    with pytest.raises(ValueError, match="Document 0 is missing"):
+        multus.validate_documents("apiVersion: v1\nkind: ConfigMap\n")
+
+
+def test_fetch_and_verify(tmp_path: Path, lock_file: Path):
+    manifest_file = tmp_path / "multus.yml"
+    assert multus.verify(lock_file=lock_file, manifest_file=manifest_file)
+
+    lock = multus.fetch(lock_file=lock_file, manifest_file=manifest_file)
+    assert manifest_file.read_bytes() == MANIFEST
+    assert lock["sha256"] == hashlib.sha256(MANIFEST).hexdigest()
+    assert lock["documents"] == [
+        "ServiceAccount/multus",
+        "DaemonSet/kube-multus-ds",
+    ]
+    assert json.loads(lock_file.read_text()) == lock
+    assert not multus.verify(lock_file=lock_file, manifest_file=manifest_file)
+
+    manifest_file.write_bytes(MANIFEST.replace(b"multus\n", b"other\n"))
+    errors = multus.verify(lock_file=lock_file, manifest_file=manifest_file)
+    assert len(errors) == 2
+    assert "Expected digest" in errors[0]
+    assert "Expected documents" in errors[1]
+
+
+def test_fetch_ref(lock_file: Path):
+    lock = json.loads(lock_file.read_text())
+    lock["ref"] = lock["url"] = None
+    lock_file.write_text(json.dumps(lock))
+    with pytest.raises(ValueError, match="must be given"):
+        multus.fetch(lock_file=lock_file)
+    with pytest.raises(ValueError, match="not branch 'master'"):
+        multus.fetch(ref="master", lock_file=lock_file)
+
+
+def test_lock():
+    # The module cannot be planned unless the manifest has been vendored.
+    lock = multus.load_lock()
+    assert lock["ref"] not in multus._BRANCHES
+    assert lock["url"] == multus.URL_TEMPLATE.format(
+        ref=lock["ref"],
+        version=lock["version"],
+    )
+    assert multus.verify() == []
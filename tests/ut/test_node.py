@@ -1,4 +1,3 @@
-import base64
 import json
 import subprocess
 import textwrap
@@ -9,20 +8,16 @@ from typing import Any
 import pytest
 from attrs import define
 from mypy_boto3_ec2 import EC2ServiceResource
-from mypy_boto3_ec2.service_resource import (
-    Instance,
-    KeyPair,
-    SecurityGroup,
-    Subnet,
-    Vpc,
-)
+from mypy_boto3_ec2.service_resource import KeyPair, SecurityGroup, Subnet, Vpc
 from mypy_boto3_eks import EKSClient
 from mypy_boto3_iam import IAMServiceResource
 from mypy_boto3_iam.service_resource import InstanceProfile
 
-from terraform import Terraform, TerraformOutputs
+from terraform import UNKNOWN, Terraform, TerraformOutputs
+from user_data import UserDataInputs, render
 
-from .moto_server import MotoServer
+from .ec2_snapshot import EC2Snapshot
+from .moto_server import MotoServer, MotoSnapshot
 
 
 @define
@@ -39,28 +34,27 @@ class Outputs(TerraformOutputs):
 
 
 @pytest.fixture(scope="module")
-def tf(this_dir: Path, moto_server: MotoServer) -> Terraform:
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server: MotoServer,
+) -> Terraform:
     tf = Terraform(
         this_dir / "terraform" / "node",
         vars={"aws_endpoint": f"http://localhost:{moto_server.port}"},
+        data_dir=worker_dir / "node",
+        state_file=worker_dir / "node.tfstate",
     )
     tf.init(upgrade=True)
     return tf
 
 
-@pytest.fixture(autouse=True)
-def reset(moto_server: MotoServer, this_dir: Path) -> None:
-    yield
-    moto_server.reset()
-    (this_dir / "terraform.tfstate").unlink(missing_ok=True)
-
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def vpc(ec2: EC2ServiceResource) -> Vpc:
     return ec2.create_vpc(CidrBlock="10.0.0.0/16")
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def subnet(vpc: Vpc) -> Subnet:
     return vpc.create_subnet(
         AvailabilityZone="eu-west-1a",
@@ -68,7 +62,7 @@ def subnet(vpc: Vpc) -> Subnet:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def other_subnet(vpc: Vpc) -> Subnet:
     return vpc.create_subnet(
         AvailabilityZone="eu-west-1a",
@@ -76,12 +70,12 @@ def other_subnet(vpc: Vpc) -> Subnet:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def key_pair(ec2: EC2ServiceResource) -> KeyPair:
     return ec2.create_key_pair(KeyName=str(uuid.uuid4()))
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def iam_instance_profile(iam: IAMServiceResource) -> InstanceProfile:
     assume_role_policy = {
         "Version": "2012-10-17",
@@ -111,7 +105,7 @@ def iam_instance_profile(iam: IAMServiceResource) -> InstanceProfile:
     return ret
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def security_group(ec2: EC2ServiceResource, vpc: Vpc) -> SecurityGroup:
     sg = ec2.create_security_group(
         GroupName="ssh",
@@ -127,7 +121,7 @@ def security_group(ec2: EC2ServiceResource, vpc: Vpc) -> SecurityGroup:
     return sg
 
 
-@pytest.fixture()
+@pytest.fixture(scope="module")
 def eks_cluster(
     eks_client: EKSClient,
     iam_instance_profile: InstanceProfile,
@@ -149,6 +143,34 @@ def eks_cluster(
     )
 
 
+@pytest.fixture(scope="module")
+def baseline(
+    moto_server: MotoServer,
+    key_pair: KeyPair,
+    eks_cluster: dict[str, Any],
+) -> MotoSnapshot:
+    """
+    Snapshot of the Moto state containing the resources common to all tests.
+
+    Each test rolls back to this snapshot, rather than recreating these
+    resources from scratch.
+
+    """
+    yield moto_server.snapshot()
+    moto_server.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset(
+    moto_server: MotoServer,
+    tf: Terraform,
+    baseline: MotoSnapshot,
+) -> None:
+    yield
+    moto_server.restore(baseline)
+    tf.state_file.unlink(missing_ok=True)
+
+
 @pytest.fixture
 def base_vars(
     subnet: Subnet,
@@ -173,54 +195,27 @@ def base_vars(
     }
 
 
-def _assert_tag(instance: Instance, tag_key: str, tag_value: str) -> None:
-    """
-    Assert an instance tag is as expected.
-
-    :param tag_key:
-        Expected tag key.
-
-    :param tag_value:
-        Expected tag value.
-
-    :raises AssertionError:
-        If the tag key does not exist, or the actual tag value does not match
-        the expected tag value.
-
-    """
-    for tag in instance.tags:
-        if tag["Key"] == tag_key:
-            assert tag["Value"] == tag_value
-            break
-    else:
-        raise AssertionError(f"tag '{tag_key}' does not exist")
-
-
 def test_defaults(
-    ec2,
+    ec2_snapshot: EC2Snapshot,
     tf: Terraform,
     base_vars: dict[str, Any],
     eks_cluster: dict[str, Any],
 ):
     tf.apply(vars=base_vars)
     outputs = Outputs.from_terraform(tf)
-    instance = ec2.Instance(outputs.id)
+    instance = ec2_snapshot.instance(outputs.id)
 
     assert instance.key_name == base_vars["key_name"]
     assert instance.private_ip_address == base_vars["private_ip_address"]
-    _assert_tag(
-        instance,
+    instance.assert_tag(
         f"kubernetes.io/cluster/{base_vars['cluster_name']}",
         "owned",
     )
-    _assert_tag(instance, "Name", base_vars["name"])
+    instance.assert_tag("Name", base_vars["name"])
 
     # The default user data should call `bootstrap.sh` with the cluster name
     # as an argument.
-    user_data = instance.describe_attribute(Attribute="userData")["UserData"][
-        "Value"
-    ]
-    user_data = base64.b64decode(user_data).decode()
+    user_data = instance.user_data
     expected_node_config = textwrap.dedent(
         f"""\
         ---
@@ -246,16 +241,11 @@ def test_defaults(
     assert not instance.source_dest_check
 
     # There should be exactly one ENI attached - the primary ENI.
-    assert len(instance.network_interfaces_attribute)
-    assert (
-        instance.network_interfaces_attribute[0]["PrivateIpAddress"]
-        == base_vars["private_ip_address"]
-    )
-    assert not instance.network_interfaces_attribute[0]["SourceDestCheck"]
-    assert (
-        instance.network_interfaces_attribute[0]["SubnetId"]
-        == base_vars["subnet_id"]
-    )
+    assert len(instance.network_interfaces) == 1
+    primary = instance.network_interface(0)
+    assert primary["PrivateIpAddress"] == base_vars["private_ip_address"]
+    assert not primary["SourceDestCheck"]
+    assert primary["SubnetId"] == base_vars["subnet_id"]
 
 
 @pytest.mark.parametrize(
@@ -272,7 +262,6 @@ def test_defaults(
     ],
 )
 def test_instance_types(
-    ec2,
     tf: Terraform,
     base_vars: dict[str, Any],
     instance_type: str,
@@ -283,12 +272,13 @@ def test_instance_types(
     Check that CPU set and isolated cores are correctly retrieved for various
     known instance types.
 
+    These are known at plan time, so there is no need to create the instance.
+
     """
     vars = base_vars | {"instance_type": instance_type, "is_xrd_ami": True}
-    tf.apply(vars=vars)
-    outputs = Outputs.from_terraform(tf)
-    instance = ec2.Instance(outputs.id)
-    assert instance.instance_type == instance_type
+    outputs = Outputs.from_plan(tf, vars=vars)
+    assert outputs.id is UNKNOWN
+    assert outputs.instance_type == instance_type
     assert outputs.isolated_cores == expected_isolated_cores
 
 
@@ -304,16 +294,17 @@ def test_unknown_instance_type(ec2, tf: Terraform, base_vars: dict[str, Any]):
         assert "Isolated cores was not provided" in str(excinfo.value)
 
 
-def test_kubelet_extra_args(ec2, tf: Terraform, base_vars: dict[str, Any]):
+def test_kubelet_extra_args(
+    ec2_snapshot: EC2Snapshot,
+    tf: Terraform,
+    base_vars: dict[str, Any],
+):
     vars = base_vars | {"kubelet_extra_args": ["foo", "bar"]}
     tf.apply(vars=vars)
     outputs = Outputs.from_terraform(tf)
-    instance = ec2.Instance(outputs.id)
+    instance = ec2_snapshot.instance(outputs.id)
 
-    user_data = instance.describe_attribute(Attribute="userData")["UserData"][
-        "Value"
-    ]
-    user_data = base64.b64decode(user_data).decode()
+    user_data = instance.user_data
     assert (
         "    flags:\n"
         f"    - --node-labels=ios-xr.cisco.com/name={vars['name']}\n"
@@ -323,7 +314,7 @@ def test_kubelet_extra_args(ec2, tf: Terraform, base_vars: dict[str, Any]):
 
 
 def test_security_groups(
-    ec2,
+    ec2_snapshot: EC2Snapshot,
     tf: Terraform,
     base_vars: dict[str, Any],
     security_group: SecurityGroup,
@@ -331,24 +322,157 @@ def test_security_groups(
     vars = base_vars | {"security_groups": [security_group.id]}
     tf.apply(vars=vars)
     outputs = Outputs.from_terraform(tf)
-    instance = ec2.Instance(outputs.id)
+    instance = ec2_snapshot.instance(outputs.id)
+
+    assert len(instance.network_interfaces) == 1
+    assert list(instance.security_groups) == [security_group.id]
+
+
+@pytest.mark.parametrize("attachment", ["hot", "cold"])
+def test_network_interfaces(
+    ec2,
+    ec2_snapshot: EC2Snapshot,
+    tf: Terraform,
+    base_vars: dict[str, Any],
+    other_subnet: Subnet,
+    security_group: SecurityGroup,
+    attachment: str,
+):
+    """Hot- and cold-attached network interfaces should be equivalent."""
+    vars = base_vars | {
+        "network_interface_attachment": attachment,
+        "secondary_private_ips": ["10.0.0.20"],
+        "security_groups": [security_group.id],
+        "network_interfaces": [
+            {
+                "subnet_id": other_subnet.id,
+                "private_ips": ["10.0.1.10"],
+                "security_groups": [security_group.id],
+            },
+        ],
+    }
+    tf.apply(vars=vars)
+    outputs = Outputs.from_terraform(tf)
+    instance = ec2_snapshot.instance(outputs.id)
+
+    enis = instance.network_interfaces
+    assert [eni["Attachment"]["DeviceIndex"] for eni in enis] == [0, 1]
+
+    primary, secondary = enis
+    assert primary["SubnetId"] == base_vars["subnet_id"]
+    assert primary["PrivateIpAddress"] == base_vars["private_ip_address"]
+    assert {
+        ip["PrivateIpAddress"] for ip in primary["PrivateIpAddresses"]
+    } == {
+        base_vars["private_ip_address"],
+        "10.0.0.20",
+    }
+    assert not primary["SourceDestCheck"]
+    assert [g["GroupId"] for g in primary["Groups"]] == [security_group.id]
 
-    assert len(instance.network_interfaces_attribute) == 1
-    assert len(instance.network_interfaces_attribute[0]["Groups"]) == 1
+    assert secondary["SubnetId"] == other_subnet.id
+    assert secondary["PrivateIpAddress"] == "10.0.1.10"
+    assert not secondary["SourceDestCheck"]
+    assert [g["GroupId"] for g in secondary["Groups"]] == [security_group.id]
     assert (
-        instance.network_interfaces_attribute[0]["Groups"][0]["GroupId"]
-        == security_group.id
+        outputs.network_interface["0"]["id"] == secondary["NetworkInterfaceId"]
+    )
+    secondary_tags = {tag["Key"]: tag["Value"] for tag in secondary["TagSet"]}
+    assert secondary_tags["node.k8s.amazonaws.com/no_manage"] == "true"
+
+    tf.destroy(vars=vars)
+    assert not list(
+        ec2.network_interfaces.filter(
+            Filters=[
+                {
+                    "Name": "network-interface-id",
+                    "Values": [eni["NetworkInterfaceId"] for eni in enis],
+                },
+            ],
+        ),
     )
 
 
-def test_user_data(ec2, tf: Terraform, base_vars: dict[str, Any]):
+def test_user_data(
+    ec2_snapshot: EC2Snapshot,
+    tf: Terraform,
+    base_vars: dict[str, Any],
+):
     vars = base_vars | {"user_data": "this is my user data"}
     tf.apply(vars=vars)
     outputs = Outputs.from_terraform(tf)
-    instance = ec2.Instance(outputs.id)
+    instance = ec2_snapshot.instance(outputs.id)
 
-    user_data = instance.describe_attribute(Attribute="userData")["UserData"][
-        "Value"
-    ]
-    user_data = base64.b64decode(user_data).decode()
+    user_data = instance.user_data
     assert "this is my user data" in user_data
+
+
+def test_user_data_reference(
+    ec2_snapshot: EC2Snapshot,
+    tf: Terraform,
+    base_vars: dict[str, Any],
+    eks_cluster: dict[str, Any],
+):
+    vars = base_vars | {
+        "is_xrd_ami": True,
+        "hugepages_gb": 4,
+        "isolated_cores": "2-3",
+        "labels": {"foo": "bar", "baz": "qux"},
+        "kubelet_extra_args": ["--v=2", "--max-pods=110", "--cpu-cfs-quota=0"],
+        "user_data": "this is my user data",
+    }
+    tf.apply(vars=vars)
+    outputs = Outputs.from_terraform(tf)
+    instance = ec2_snapshot.instance(outputs.id)
+
+    user_data = instance.user_data
+
+    cluster = eks_cluster["cluster"]
+    inputs = UserDataInputs(
+        cluster_name=cluster["name"],
+        api_endpoint=cluster["endpoint"],
+        certificate_authority=cluster["certificateAuthority"]["data"],
+        cidr=cluster["kubernetesNetworkConfig"]["serviceIpv4Cidr"],
+        name=vars["name"],
+        labels=vars["labels"],
+        kubelet_extra_args=vars["kubelet_extra_args"],
+        hugepages_gb=vars["hugepages_gb"],
+        isolated_cores=vars["isolated_cores"],
+        user_data=vars["user_data"],
+        xrd_bootstrap=True,
+    )
+    assert user_data == render(inputs)
+
+
+def test_user_data_order(
+    tf: Terraform,
+    base_vars: dict[str, Any],
+    tmp_path: Path,
+):
+    vars = base_vars | {
+        "labels": {"foo": "bar", "baz": "qux"},
+        "kubelet_extra_args": ["--v=2", "--max-pods=110", "--max-pods=50"],
+    }
+    tf.apply(vars=vars)
+
+    def instance_actions(vars: dict[str, Any]) -> list[str]:
+        tf.plan(vars=vars, out=tmp_path / "tfplan")
+        plan = tf.show(tmp_path / "tfplan")
+        (instance_change,) = (
+            rc
+            for rc in plan["resource_changes"]
+            if rc["address"] == "module.node.aws_instance.this"
+        )
+        return instance_change["change"]["actions"]
+
+    # Reordering labels should not change the user data and so replace the
+    # instance.
+    vars |= {"labels": {"baz": "qux", "foo": "bar"}}
+    assert instance_actions(vars) == ["no-op"]
+
+    # Kubelet arguments are rendered in the order given, so reordering them
+    # replaces the instance.
+    vars |= {
+        "kubelet_extra_args": ["--max-pods=110", "--max-pods=50", "--v=2"],
+    }
+    assert instance_actions(vars) == ["delete", "create"]
@@ -0,0 +1,167 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from attrs import define
+from mypy_boto3_ec2 import EC2ServiceResource
+
+from instance_types import generate_catalog
+from node_props import USE_CASES, NodeProps, node_props, node_props_table
+from terraform import Terraform, TerraformOutputs
+
+from .moto_server import MotoServer
+
+
+@define
+class Outputs(TerraformOutputs):
+    cp_num_cpus: int
+    cpuset: str | None
+    hugepages_gb: int
+    isolated_cores: str | None
+    isolated_cores_list: list[int] | None
+
+
+@pytest.fixture(scope="module")
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server: MotoServer,
+) -> Terraform:
+    tf = Terraform(
+        this_dir / "terraform" / "node-props",
+        vars={"aws_endpoint": f"http://localhost:{moto_server.port}"},
+        data_dir=worker_dir / "node-props",
+        state_file=worker_dir / "node-props.tfstate",
+    )
+    tf.init(upgrade=True)
+    return tf
+
+
+@pytest.fixture(scope="module")
+def catalog(ec2: EC2ServiceResource) -> dict[str, dict[str, Any]]:
+    return generate_catalog(ec2.meta.client)["instance_types"]
+
+
+@pytest.mark.parametrize(
+    ["instance_type", "default_cores", "use_case", "expected"],
+    [
+        (
+            "m5.2xlarge",
+            4,
+            "maximal",
+            NodeProps(0, "2-3", 6, "2-3", [2, 3]),
+        ),
+        (
+            "m5.4xlarge",
+            8,
+            "maximal",
+            NodeProps(2, "2-7", 6, "4-7", [4, 5, 6, 7]),
+        ),
+        (
+            "m5.16xlarge",
+            32,
+            "maximal",
+            NodeProps(4, "2-15", 6, "6-15", list(range(6, 16))),
+        ),
+        (
+            "m5.24xlarge",
+            48,
+            "maximal",
+            NodeProps(4, "2-23", 6, "6-23", list(range(6, 24))),
+        ),
+        (
+            "m5.24xlarge",
+            48,
+            "cloud-router",
+            NodeProps(4, "7-23", 6, "11-23", list(range(11, 24))),
+        ),
+        (
+            "m5.24xlarge",
+            48,
+            "minimal",
+            NodeProps(0, "2-3", 6, "2-3", [2, 3]),
+        ),
+        (
+            "m5.large",
+            1,
+            "maximal",
+            NodeProps(4, None, 6, None, None),
+        ),
+        (
+            "c5.4xlarge",
+            8,
+            "maximal",
+            NodeProps(4, None, 6, None, None),
+        ),
+    ],
+)
+def test_reference(
+    instance_type: str,
+    default_cores: int,
+    use_case: str,
+    expected: NodeProps,
+):
+    assert node_props(instance_type, default_cores, use_case) == expected
+
+
+def test_reference_catalog(catalog: dict[str, dict[str, Any]]):
+    """
+    Check invariants of the node properties for every known instance type.
+
+    """
+    table = node_props_table(catalog)
+    assert len(table) == len(catalog) * len(USE_CASES)
+
+    for (instance_type, _), props in table.items():
+        assert props.hugepages_gb > 0
+        if props.cpuset is None:
+            assert props.isolated_cores is None
+            continue
+
+        start, end = (int(x) for x in props.cpuset.split("-"))
+        # CPUs 0 and 1 are always reserved for the host.
+        assert start >= 2
+        assert end < (catalog[instance_type]["default_cores"] or 0)
+        assert props.isolated_cores_list
+        assert props.isolated_cores_list[0] == start + props.cp_num_cpus
+        assert props.isolated_cores_list[-1] == end
+
+
+@pytest.mark.parametrize("use_case", USE_CASES)
+@pytest.mark.parametrize(
+    "instance_type",
+    [
+        "m5.large",
+        "m5.2xlarge",
+        "m5.12xlarge",
+        "m5.24xlarge",
+        "m5zn.12xlarge",
+        "m6in.16xlarge",
+        "m6a.48xlarge",
+        "c5.4xlarge",
+    ],
+)
+def test_terraform_matches_reference(
+    tf: Terraform,
+    catalog: dict[str, dict[str, Any]],
+    instance_type: str,
+    use_case: str,
+):
+    """
+    Cross-check the reference implementation against the Terraform module.
+
+    """
+    outputs = Outputs.from_plan(
+        tf,
+        vars={"instance_type": instance_type, "use_case": use_case},
+    )
+    expected = node_props(
+        instance_type,
+        catalog[instance_type]["default_cores"],
+        use_case,
+    )
+    assert outputs.cp_num_cpus == expected.cp_num_cpus
+    assert outputs.cpuset == expected.cpuset
+    assert outputs.hugepages_gb == expected.hugepages_gb
+    assert outputs.isolated_cores == expected.isolated_cores
+    assert outputs.isolated_cores_list == expected.isolated_cores_list
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+import pytest
+from attrs import define, field
+
+import quickstart
+from orchestrator import Deployment, Stage, Task
+from terraform import AsyncTerraform
+
+
+def _args(**kwargs) -> argparse.Namespace:
+    defaults = {
+        "username": None,
+        "password": None,
+        "bastion_remote_access_cidr_blocks": None,
+        "ami": "ami-123",
+        "destroy": False,
+        "kubernetes_version": "1.33",
+    }
+    return argparse.Namespace(**(defaults | kwargs))
+
+
+def _stage_vars(args: argparse.Namespace) -> dict[str, dict]:
+    d = quickstart.deployment(args)
+    return {stage.name: stage.vars for stage in d.stages}
+
+
+def test_deployment_apply():
+    stage_vars = _stage_vars(
+        _args(
+            username="user",
+            password="pass",
+            bastion_remote_access_cidr_blocks="10.0.0.0/8,192.168.0.0/16",
+        ),
+    )
+    assert stage_vars == {
+        "bootstrap": {
+            "bastion_remote_access_cidr_blocks": [
+                "10.0.0.0/8",
+                "192.168.0.0/16",
+            ],
+            "cluster_version": "1.33",
+        },
+        "infra": {"node_ami": "ami-123"},
+        "workload": {"xr_root_user": "user", "xr_root_password": "pass"},
+    }
+
+
+def test_deployment_destroy():
+    """The XR credentials are not required to destroy, but must be set."""
+    stage_vars = _stage_vars(_args(destroy=True))
+    assert stage_vars["workload"] == {
+        "xr_root_user": "",
+        "xr_root_password": "",
+    }
+    assert stage_vars["bootstrap"] == {
+        "bastion_remote_access_cidr_blocks": None,
+    }
+
+
+@define
+class FakeTerraform:
+    working_dir: Path
+    fail: bool = False
+    state_file: Path | None = None
+    calls: list[str] = field(factory=list)
+
+    async def apply(self, *, vars=None, fast=False) -> None:
+        self.calls.append("apply")
+        if self.fail:
+            raise RuntimeError("apply failed")
+
+    async def destroy(self, *, vars=None) -> None:
+        self.calls.append("destroy")
+
+    def remote_state_paths(self) -> dict[str, Path]:
+        return {}
+
+
+def test_apply_failed(tmp_path: Path):
+    """Only the stages that fail are destroyed."""
+    tfs = {}
+    for name in ("bootstrap", "infra", "workload"):
+        (tmp_path / name).mkdir()
+        tfs[name] = FakeTerraform(tmp_path / name, fail=name == "infra")
+    d = Deployment(
+        [
+            Stage("bootstrap", tfs["bootstrap"]),
+            Stage("infra", tfs["infra"], after=("bootstrap",)),
+            Stage("workload", tfs["workload"], after=("infra",)),
+        ],
+    )
+
+    with pytest.raises(ExceptionGroup) as exc_info:
+        asyncio.run(d.apply(destroy_failed=True))
+    assert [str(e) for e in exc_info.value.exceptions] == ["apply failed"]
+    assert {name: tf.calls for name, tf in tfs.items()} == {
+        "bootstrap": ["apply"],
+        "infra": ["apply", "destroy"],
+        "workload": [],
+    }
+
+
+def test_dependencies(tmp_path: Path):
+    """Dependencies are found from local remote state data sources."""
+    for name in ("bootstrap", "infra"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "infra" / "bootstrap.tf").write_text(
+        """\
+data "terraform_remote_state" "bootstrap" {
+  backend = "local"
+  config = {
+    path = "${path.root}/../bootstrap/terraform.tfstate"
+  }
+}
+""",
+    )
+    d = Deployment(
+        [
+            Stage("bootstrap", AsyncTerraform(tmp_path / "bootstrap")),
+            Stage(
+                "infra",
+                AsyncTerraform(tmp_path / "infra"),
+                after=("ami",),
+            ),
+        ],
+        [Task("ami", lambda: asyncio.sleep(0))],
+    )
+    assert d.dependencies() == {
+        "ami": set(),
+        "bootstrap": set(),
+        "infra": {"ami", "bootstrap"},
+    }
@@ -0,0 +1,404 @@
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from attrs import define
+
+import terraform
+from terraform import AsyncTerraform, Terraform, TerraformOutputs
+
+# Stand-in for the Terraform CLI, which records its arguments, prints the
+# outputs from 'outputs.json' in the working directory, writes a new state on
+# apply, and creates the data directory on init (slowly, so that concurrent
+# inits overlap).
+_FAKE_TERRAFORM = f"""\
+#!{sys.executable}
+import json, os, pathlib, sys, time
+
+working_dir = pathlib.Path(sys.argv[1].removeprefix("-chdir="))
+with open(working_dir / "calls.jsonl", "a") as f:
+    f.write(json.dumps(sys.argv[2:]) + "\\n")
+if sys.argv[2] == "init":
+    time.sleep(0.5)
+    data_dir = os.environ.get("TF_DATA_DIR", working_dir / ".terraform")
+    pathlib.Path(data_dir).mkdir(exist_ok=True)
+elif sys.argv[2] == "output":
+    print((working_dir / "outputs.json").read_text())
+elif sys.argv[2] == "apply":
+    state_file = working_dir / "terraform.tfstate"
+    state = dict(version=4, serial=0, lineage="abc", outputs=dict())
+    if state_file.exists():
+        state = json.loads(state_file.read_text())
+    state["serial"] += 1
+    state_file.write_text(json.dumps(state))
+"""
+
+
+@define
+class Outputs(TerraformOutputs):
+    name: str
+
+
+@pytest.fixture
+def tf(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Terraform:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "terraform"
+    fake.write_text(_FAKE_TERRAFORM)
+    fake.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir), prepend=":")
+
+    working_dir = tmp_path / "root"
+    working_dir.mkdir()
+    return Terraform(working_dir, plugin_cache_dir=None, timings_file=None)
+
+
+def _calls(tf: Terraform) -> list[list[str]]:
+    calls_file = tf.working_dir / "calls.jsonl"
+    if not calls_file.exists():
+        return []
+    return [json.loads(line) for line in calls_file.read_text().splitlines()]
+
+
+def _write_state(
+    tf: Terraform,
+    serial: int,
+    name: str,
+    lineage: str = "abc",
+) -> None:
+    outputs = {"module": {"value": {"name": name}, "type": "object"}}
+    (tf.working_dir / "terraform.tfstate").write_text(
+        json.dumps(
+            {
+                "version": 4,
+                "serial": serial,
+                "lineage": lineage,
+                "outputs": outputs,
+                "resources": [],
+            },
+        ),
+    )
+    (tf.working_dir / "outputs.json").write_text(json.dumps(outputs))
+
+
+def test_outputs_from_state(tf: Terraform):
+    _write_state(tf, 1, "foo")
+    assert Outputs.from_terraform(tf) == Outputs("foo")
+    assert tf.outputs()["module"] == {
+        "sensitive": False,
+        "type": "object",
+        "value": {"name": "foo"},
+    }
+
+    # A new state (e.g. after apply) invalidates the cache.
+    _write_state(tf, 2, "bar")
+    assert Outputs.from_terraform(tf) == Outputs("bar")
+    _write_state(tf, 2, "baz", lineage="def")
+    assert Outputs.from_terraform(tf) == Outputs("baz")
+    assert _calls(tf) == []
+
+
+def test_outputs_cached(tf: Terraform):
+    _write_state(tf, 1, "foo")
+    outputs = tf.outputs()
+    outputs["module"]["value"]["name"] = "modified"
+
+    # The state is not read again unless its serial changes.
+    state_file = tf.working_dir / "terraform.tfstate"
+    state_file.write_text(state_file.read_text().replace("foo", "bar"))
+    assert Outputs.from_terraform(tf) == Outputs("foo")
+
+
+def test_outputs_no_state(tf: Terraform):
+    assert tf.outputs() == {}
+    assert _calls(tf) == []
+
+
+@pytest.mark.parametrize("backend", ["s3", "workspace"])
+def test_outputs_not_local(tf: Terraform, backend: str):
+    _write_state(tf, 1, "foo")
+    data_dir = tf.working_dir / ".terraform"
+    data_dir.mkdir()
+    if backend == "workspace":
+        (data_dir / "environment").write_text("other")
+    else:
+        (data_dir / "terraform.tfstate").write_text(
+            json.dumps({"version": 3, "backend": {"type": backend}}),
+        )
+
+    assert Outputs.from_terraform(tf) == Outputs("foo")
+    assert _calls(tf) == [["output", "-json"]]
+
+
+def test_outputs_local_backend(tf: Terraform):
+    _write_state(tf, 1, "foo")
+    state_dir = tf.working_dir / "state"
+    state_dir.mkdir()
+    (tf.working_dir / "terraform.tfstate").rename(state_dir / "x.tfstate")
+    data_dir = tf.working_dir / ".terraform"
+    data_dir.mkdir()
+    (data_dir / "terraform.tfstate").write_text(
+        json.dumps(
+            {
+                "version": 3,
+                "backend": {
+                    "type": "local",
+                    "config": {"path": "state/x.tfstate"},
+                },
+            },
+        ),
+    )
+
+    assert Outputs.from_terraform(tf) == Outputs("foo")
+    assert _calls(tf) == []
+
+
+def test_remote_state_outputs(tf: Terraform):
+    bootstrap = Terraform(
+        tf.working_dir.parent / "bootstrap",
+        plugin_cache_dir=None,
+        timings_file=None,
+    )
+    bootstrap.working_dir.mkdir()
+    _write_state(bootstrap, 1, "foo")
+    (tf.working_dir / "bootstrap.tf").write_text(
+        """\
+data "terraform_remote_state" "bootstrap" {
+  backend = "local"
+  config = {
+    path = "${path.root}/../bootstrap/terraform.tfstate"
+  }
+}
+""",
+    )
+
+    assert tf.remote_state_outputs("bootstrap") == {
+        "module": {"name": "foo"},
+    }
+    with pytest.raises(KeyError):
+        tf.remote_state_outputs("infra")
+    assert _calls(tf) == []
+
+
+def test_converter_per_class():
+    @define
+    class OtherOutputs(TerraformOutputs):
+        name: int
+
+    assert terraform._converter(Outputs) is terraform._converter(Outputs)
+    assert OtherOutputs._from_dict({"name": "1"}) == OtherOutputs(1)
+    assert Outputs._from_dict({"name": "1"}) == Outputs("1")
+
+
+def test_var_file(tf: Terraform):
+    assert tf.vars_digest() is None
+    with tf.var_file() as var_file:
+        assert var_file is None
+
+    tf.vars = {"a": "1"}
+    with tf.var_file({"b": ["2"]}) as var_file:
+        assert json.loads(var_file.path.read_text()) == {"a": "1", "b": ["2"]}
+        assert var_file.path.stat().st_mode & 0o777 == 0o600
+    assert not var_file.path.exists()
+
+    # Identical variables have the same digest, regardless of order.
+    tf.vars = {"b": ["2"]}
+    assert tf.vars_digest({"a": "1"}) == var_file.digest
+    assert tf.vars_digest({"a": "2"}) != var_file.digest
+
+
+def test_var_file_args(tf: Terraform):
+    tf.vars = {"a": "1"}
+    tf.apply()
+    tf.destroy({"b": "2"})
+    tf.plan()
+
+    calls = _calls(tf)
+    assert [call[0] for call in calls] == ["apply", "destroy", "plan"]
+    var_files = []
+    for call in calls:
+        args = [arg for arg in call if arg.startswith("-var-file=")]
+        assert len(args) == 1
+        var_files.append(Path(args[0].removeprefix("-var-file=")))
+    assert not any(path.exists() for path in var_files)
+    assert calls[0] == [
+        "apply",
+        "-no-color",
+        f"-var-file={var_files[0]}",
+        "-auto-approve",
+    ]
+
+
+def test_fast_apply(tf: Terraform):
+    (tf.working_dir / "main.tf").write_text("# v1")
+    tf.vars = {"a": "1"}
+    tf.apply(fast=True)
+    tf.apply(fast=True)
+    assert len(_calls(tf)) == 1
+    assert "-refresh=false" in _calls(tf)[0]
+
+    # Any change to the configuration, vars or state requires an apply.
+    (tf.working_dir / "main.tf").write_text("# v2")
+    tf.apply(fast=True)
+    tf.apply({"a": "2"}, fast=True)
+    _write_state(tf, 10, "foo")
+    tf.apply({"a": "2"}, fast=True)
+    assert len(_calls(tf)) == 4
+
+    # A full apply also records the fingerprint.
+    tf.apply()
+    tf.apply(fast=True)
+    assert len(_calls(tf)) == 5
+    assert "-refresh=false" not in _calls(tf)[-1]
+
+    # Destroying always requires the next apply to run.
+    tf.destroy()
+    tf.apply(fast=True)
+    assert len(_calls(tf)) == 7
+
+
+def test_fast_apply_remote_state(tf: Terraform):
+    bootstrap = Terraform(
+        tf.working_dir.parent / "bootstrap",
+        plugin_cache_dir=None,
+        timings_file=None,
+    )
+    bootstrap.working_dir.mkdir()
+    _write_state(bootstrap, 1, "foo")
+    (tf.working_dir / "bootstrap.tf").write_text(
+        """\
+data "terraform_remote_state" "bootstrap" {
+  backend = "local"
+  config = {
+    path = "${path.root}/../bootstrap/terraform.tfstate"
+  }
+}
+""",
+    )
+
+    tf.apply(fast=True)
+    tf.apply(fast=True)
+    assert len(_calls(tf)) == 1
+
+    # A change to a stage this depends on requires an apply.
+    _write_state(bootstrap, 2, "foo")
+    tf.apply(fast=True)
+    assert len(_calls(tf)) == 2
+
+
+def _init_calls(tf: Terraform) -> int:
+    return sum(call[0] == "init" for call in _calls(tf))
+
+
+def test_init_skipped(tf: Terraform):
+    module_dir = tf.working_dir.parent / "module"
+    module_dir.mkdir()
+    (module_dir / "main.tf").write_text("# v1")
+    (tf.working_dir / "main.tf").write_text(
+        'module "m" {\n  source = "../module"\n}\n',
+    )
+    tf.init()
+    tf.init()
+    assert _init_calls(tf) == 1
+
+    # Any change to the configuration, a local module or the lock file
+    # requires init to be run again.
+    (tf.working_dir / "main.tf").write_text(
+        'module "m" {\n  source = "../module"\n}\n# v2\n',
+    )
+    tf.init()
+    tf.init()
+    assert _init_calls(tf) == 2
+
+    (module_dir / "main.tf").write_text("# v2")
+    tf.init()
+    assert _init_calls(tf) == 3
+
+    (tf.working_dir / ".terraform.lock.hcl").write_text("# v1")
+    tf.init()
+    tf.init()
+    assert _init_calls(tf) == 4
+
+    # Other files do not affect init.
+    (module_dir / "script.py").write_text("")
+    tf.init()
+    assert _init_calls(tf) == 4
+
+    tf.init(force=True)
+    assert _init_calls(tf) == 5
+
+
+def test_init_concurrent(tf: Terraform):
+    """Concurrent inits of the same directory should only init once."""
+    (tf.working_dir / "main.tf").write_text("# v1")
+    tfs = [
+        Terraform(tf.working_dir, plugin_cache_dir=None, timings_file=None)
+        for _ in range(3)
+    ]
+    barrier = threading.Barrier(len(tfs))
+
+    def init(tf: Terraform) -> None:
+        barrier.wait()
+        tf.init()
+
+    threads = [threading.Thread(target=init, args=(tf,)) for tf in tfs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _init_calls(tf) == 1
+
+
+def test_init_concurrent_async(tf: Terraform):
+    (tf.working_dir / "main.tf").write_text("# v1")
+    tfs = [
+        AsyncTerraform(
+            tf.working_dir,
+            plugin_cache_dir=None,
+            timings_file=None,
+        )
+        for _ in range(3)
+    ]
+
+    async def init_all() -> None:
+        await asyncio.gather(*(tf.init() for tf in tfs))
+
+    asyncio.run(init_all())
+    assert _init_calls(tf) == 1
+
+
+def test_run_concurrently():
+    running = 0
+    max_running = 0
+
+    async def op(i: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return i * 2
+
+    results = asyncio.run(terraform.run_concurrently(range(10), op, limit=3))
+    assert results == [i * 2 for i in range(10)]
+    assert max_running == 3
+
+
+def test_run_concurrently_errors():
+    completed = []
+
+    async def op(i: int) -> int:
+        await asyncio.sleep(0.01)
+        if i % 3 == 0:
+            raise ValueError(i)
+        completed.append(i)
+        return i
+
+    with pytest.raises(ExceptionGroup) as exc_info:
+        asyncio.run(terraform.run_concurrently(range(7), op, limit=2))
+    assert [e.args[0] for e in exc_info.value.exceptions] == [0, 3, 6]
+    # Every operation runs to completion, despite the failures.
+    assert sorted(completed) == [1, 2, 4, 5]
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+
+import timings
+from timings import CommandTimer, read_timings, summarize
+
+# Output of 'terraform apply', with the seconds elapsed before each line.
+_APPLY_OUTPUT = [
+    (0, "data.aws_ami.this: Reading...\n"),
+    (1, "data.aws_ami.this: Read complete after 1s [id=ami-123]\n"),
+    (0, "module.node[0].aws_instance.this: Creating...\n"),
+    (0, 'module.node["beta"].aws_instance.this: Creating...\n'),
+    (2, "module.node[0].aws_instance.this: Still creating... [10s elapsed]\n"),
+    (
+        10,
+        "module.node[0].aws_instance.this: Creation complete after 12s "
+        "[id=i-0]\n",
+    ),
+    (
+        5,
+        'module.node["beta"].aws_instance.this: Creation complete after 17s '
+        "[id=i-1]\n",
+    ),
+    (0, "aws_security_group.this: Modifying... [id=sg-1]\n"),
+    (3, "aws_security_group.this: Modifications complete after 3s\n"),
+    (0, "aws_key_pair.old: Destroying... [id=key]\n"),
+    (0, "\n"),
+    (0, "Apply complete! Resources: 2 added, 1 changed, 1 destroyed.\n"),
+]
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """A fake monotonic clock, which is advanced by setting its value."""
+    now = [100.0]
+    monkeypatch.setattr(timings.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_command_timer(clock: list[float]):
+    timer = CommandTimer(Path("/root"), ["apply", "-auto-approve"])
+    for elapsed, line in _APPLY_OUTPUT:
+        clock[0] += elapsed
+        timer.on_line("stdout", line)
+    # Only stdout is parsed.
+    timer.on_line("stderr", "aws_vpc.this: Creating...\n")
+    timer.returncode = 0
+
+    record = timer.record()
+    assert record["command"] == "apply"
+    assert record["working_dir"] == "/root"
+    assert record["wall_time"] == 21
+    assert record["returncode"] == 0
+    assert record["resources"] == {"added": 2, "changed": 1, "destroyed": 1}
+    assert record["resource_timings"] == [
+        {"address": "data.aws_ami.this", "action": "read", "duration": 1},
+        {
+            "address": "module.node[0].aws_instance.this",
+            "action": "create",
+            "duration": 12,
+        },
+        {
+            "address": 'module.node["beta"].aws_instance.this',
+            "action": "create",
+            "duration": 17,
+        },
+        {
+            "address": "aws_security_group.this",
+            "action": "update",
+            "duration": 3,
+        },
+        # Operations which did not complete have no duration.
+        {"address": "aws_key_pair.old", "action": "destroy", "duration": None},
+    ]
+
+
+def test_summarize(tmp_path: Path, clock: list[float]):
+    timings_file = tmp_path / "timings.jsonl"
+    for _ in range(2):
+        timer = CommandTimer(tmp_path, ["apply"])
+        for elapsed, line in _APPLY_OUTPUT:
+            clock[0] += elapsed
+            timer.on_line("stdout", line)
+        timer.write(timings_file)
+
+    records = read_timings(timings_file)
+    assert len(records) == 2
+
+    # Instances of the same resource are grouped together, and operations
+    # with no duration are ignored.
+    assert summarize(records) == [
+        ("module.node", "aws_instance", "create", 4, 58, 17),
+        ("", "aws_security_group", "update", 2, 6, 3),
+        ("", "data.aws_ami", "read", 2, 2, 1),
+    ]
@@ -0,0 +1,145 @@
+import textwrap
+
+import attrs
+import pytest
+
+from user_data import (
+    UserDataInputs,
+    changed_inputs,
+    normalize_kubelet_args,
+    render,
+    render_template,
+)
+
+
+@pytest.fixture
+def inputs() -> UserDataInputs:
+    return UserDataInputs(
+        cluster_name="cluster",
+        api_endpoint="https://example.com",
+        certificate_authority="Y2VydA==",
+        cidr="172.20.0.0/16",
+        name="node",
+    )
+
+
+@pytest.mark.parametrize(
+    ["template", "vars", "expected"],
+    [
+        ("${a} $${a} %%{ b }", {"a": 1.0}, "1 ${a} %{ b }"),
+        ("%{ if a }yes%{ else }no%{ endif }", {"a": False}, "no"),
+        # The untaken branch is not evaluated.
+        ("%{ if a }${b}%{ endif }", {"a": False, "b": None}, ""),
+        ("%{ for x in xs }[${x}]%{ endfor }", {"xs": [1, True]}, "[1][true]"),
+        # Strip markers only strip up to the nearest newline.
+        ("a\n  %{~ if a ~}  \n  b\n%{ endif ~}\nc", {"a": True}, "a\n  b\nc"),
+        ("a\n%{~ if a }\nb%{ endif }", {"a": True}, "a\nb"),
+    ],
+)
+def test_render_template(template, vars, expected):
+    assert render_template(template, vars) == expected
+
+
+@pytest.mark.parametrize(
+    "template",
+    ["${a.b}", "%{ for x in xs }", "%{ while a }%{ endwhile }", "${c}"],
+)
+def test_render_template_invalid(template):
+    with pytest.raises(ValueError):
+        render_template(template, {"a": {}, "xs": []})
+
+
+def test_render_defaults(inputs: UserDataInputs):
+    assert render(inputs) == textwrap.dedent(
+        """\
+        MIME-Version: 1.0
+        Content-Type: multipart/mixed; boundary="BOUNDARY"
+
+        --BOUNDARY
+        Content-Type: application/node.eks.aws
+
+        ---
+        apiVersion: node.eks.aws/v1alpha1
+        kind: NodeConfig
+        spec:
+          cluster:
+            name: cluster
+            apiServerEndpoint: https://example.com
+            certificateAuthority: Y2VydA==
+            cidr: 172.20.0.0/16
+          kubelet:
+            flags:
+            - --node-labels=ios-xr.cisco.com/name=node
+
+        --BOUNDARY
+        Content-Type: text/x-shellscript; charset="us-ascii"
+
+        #!/bin/bash
+
+        reboot
+
+        --BOUNDARY--
+        """,
+    )
+
+
+def test_render_xrd_bootstrap(inputs: UserDataInputs):
+    inputs.hugepages_gb = 6
+    inputs.isolated_cores = "2-3"
+    inputs.xrd_bootstrap = True
+    inputs.user_data = "echo hello"
+    assert (
+        "#!/bin/bash\n"
+        "HUGEPAGES_GB=6 ISOLATED_CORES=2-3 /etc/xrd/bootstrap.sh\n"
+        "echo hello\n"
+        "reboot\n"
+    ) in render(inputs)
+
+
+@pytest.mark.parametrize(
+    ["args", "expected"],
+    [
+        ([], []),
+        (["--v=2", "--a=1"], ["--a=1", "--v=2"]),
+        # Repeated flags keep their relative order.
+        (
+            ["--b=2", "--a=1", "--b=1", "-c=1"],
+            ["--a=1", "--b=2", "--b=1", "-c=1"],
+        ),
+        # Flags which may be separate from their values are not reordered.
+        (["--v", "2", "--a=1"], ["--v", "2", "--a=1"]),
+        (["foo", "bar"], ["foo", "bar"]),
+    ],
+)
+def test_normalize_kubelet_args(args, expected):
+    assert normalize_kubelet_args(args) == expected
+
+
+def test_changed_inputs(inputs: UserDataInputs):
+    new = attrs.evolve(inputs)
+    assert changed_inputs(inputs, new) == []
+
+    # Reordering labels does not change the user data, but reordering kubelet
+    # arguments does, since they are rendered in the order given.
+    inputs.labels = {"a": "1", "b": "2"}
+    inputs.kubelet_extra_args = ["--a=1", "--b=2"]
+    new.labels = {"b": "2", "a": "1"}
+    new.kubelet_extra_args = ["--a=1", "--b=2"]
+    assert changed_inputs(inputs, new) == []
+    new.kubelet_extra_args = ["--b=2", "--a=1"]
+    assert changed_inputs(inputs, new) == ["kubelet_extra_args"]
+    new.kubelet_extra_args = ["--a=1", "--b=2"]
+
+    # Hugepages are only used by the XRd bootstrap.
+    new.hugepages_gb = 6
+    assert changed_inputs(inputs, new) == []
+
+    new.isolated_cores = "2-3"
+    new.xrd_bootstrap = True
+    new.kubelet_extra_args = ["--b=3", "--a=1"]
+    assert changed_inputs(inputs, new) == [
+        "kubelet_extra_args",
+        "hugepages_gb",
+        "isolated_cores",
+        "xrd_bootstrap",
+    ]
@@ -0,0 +1,90 @@
+import asyncio
+import subprocess
+import sys
+from typing import Callable
+
+import pytest
+
+import utils
+from utils import run_cmd, run_cmd_async
+
+# More than fits in a pipe buffer (64 KiB on Linux).
+_LARGE = 1024 * 1024
+
+
+def _run_sync(cmd: list[str], **kwargs) -> subprocess.CompletedProcess:
+    return run_cmd(cmd, **kwargs)
+
+
+def _run_async(cmd: list[str], **kwargs) -> subprocess.CompletedProcess:
+    return asyncio.run(run_cmd_async(cmd, **kwargs))
+
+
+@pytest.fixture(params=[_run_sync, _run_async], ids=["sync", "async"])
+def run(request: pytest.FixtureRequest) -> Callable:
+    return request.param
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_large_stderr(run: Callable):
+    """A command filling the stderr pipe before writing stdout completes."""
+    # If the pipe is not drained the command blocks, so the alarm kills it
+    # (and the command fails) rather than the test hanging.
+    p = run(
+        _python(
+            "import signal, sys\n"
+            "signal.alarm(30)\n"
+            f"sys.stderr.write('e' * {_LARGE})\n"
+            "sys.stderr.flush()\n"
+            f"sys.stdout.write('o' * {_LARGE})\n",
+        ),
+    )
+    assert p.stderr == "e" * _LARGE
+    assert p.stdout == "o" * _LARGE
+
+
+def test_on_line(run: Callable):
+    """Each line is reported once, including a final unterminated line."""
+    lines = []
+    p = run(
+        _python(
+            "import sys, time\n"
+            "print('one')\n"
+            "sys.stdout.write('tw')\n"
+            "sys.stdout.flush()\n"
+            "time.sleep(0.1)\n"
+            "sys.stdout.write('o\\nthree\\n\\nlast')\n"
+            "sys.stderr.write('error\\n')\n",
+        ),
+        on_line=lambda name, line: lines.append((name, line)),
+    )
+    assert [line for name, line in lines if name == "stdout"] == [
+        "one\n",
+        "two\n",
+        "three\n",
+        "\n",
+        "last",
+    ]
+    assert [line for name, line in lines if name == "stderr"] == ["error\n"]
+    assert p.stdout == "one\ntwo\nthree\n\nlast"
+    assert p.stderr == "error\n"
+
+
+def test_failure(run: Callable):
+    with pytest.raises(subprocess.CalledProcessError):
+        run(_python("raise SystemExit(3)"))
+    assert run(_python("raise SystemExit(3)"), check=False).returncode == 3
+
+
+def test_line_buffer():
+    buf = utils._LineBuffer("stdout", "utf-8")
+    # A multi-byte character may be split between reads.
+    assert buf.feed(b"a\xc3") == []
+    assert buf.feed(b"\xa9\nb\n") == ["aé\n", "b\n"]
+    assert buf.feed(b"c") == []
+    assert buf.close() == ["c"]
+    assert buf.close() == []
+    assert buf.getvalue() == "aé\nb\nc"
@@ -28,20 +28,26 @@ class Outputs(TerraformOutputs):
 
 
 @pytest.fixture(scope="module")
-def tf(this_dir: Path, moto_server) -> Terraform:
+def tf(
+    this_dir: Path,
+    worker_dir: Path,
+    moto_server,
+) -> Terraform:
     tf = Terraform(
         this_dir / "terraform" / "vpc",
         vars={"aws_endpoint": f"http://localhost:{moto_server.port}"},
+        data_dir=worker_dir / "vpc",
+        state_file=worker_dir / "vpc.tfstate",
     )
     tf.init(upgrade=True)
     return tf
 
 
 @pytest.fixture(autouse=True)
-def reset(moto_server: MotoServer, this_dir: Path) -> None:
+def reset(moto_server: MotoServer, tf: Terraform) -> None:
     yield
     moto_server.reset()
-    (this_dir / "terraform.tfstate").unlink(missing_ok=True)
+    tf.state_file.unlink(missing_ok=True)
 
 
 def test_public_and_private_subnets(ec2: EC2ServiceResource, tf: Terraform):
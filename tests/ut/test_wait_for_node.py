@@ -0,0 +1,275 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+SCRIPT = (
+    Path(__file__).parents[2]
+    / "modules"
+    / "aws"
+    / "node"
+    / "scripts"
+    / "wait-for-node.py"
+)
+
+TOKEN = "secret-token"
+
+
+def _node(name: str, ready: bool | None) -> dict[str, Any]:
+    conditions = []
+    if ready is not None:
+        conditions.append(
+            {"type": "Ready", "status": "True" if ready else "False"},
+        )
+    return {
+        "metadata": {
+            "name": f"ip-{name}",
+            "labels": {"ios-xr.cisco.com/name": name},
+        },
+        "status": {"conditions": conditions},
+    }
+
+
+class FakeApiServer:
+    """
+    Fake Kubernetes API server, serving lists and watches of nodes.
+
+    ..attribute:: lists
+        The responses to successive list requests; the last is repeated.
+
+    ..attribute:: watches
+        The events to stream for successive watch requests; once these are
+        used up, watches end with no events.
+
+    ..attribute:: requests
+        The query parameters of each request received.
+
+    """
+
+    def __init__(self):
+        self.lists: list[list[dict[str, Any]]] = [[]]
+        self.watches: list[list[dict[str, Any]]] = []
+        self.requests: list[dict[str, str]] = []
+        self.watch_delay = 0.0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                params = dict(urllib.parse.parse_qsl(url.query))
+                server.requests.append(params)
+                if url.path != "/api/v1/nodes":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if self.headers["Authorization"] != f"Bearer {TOKEN}":
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+
+                key, value = params["labelSelector"].split("=")
+
+                def selected(node: dict[str, Any]) -> bool:
+                    return node["metadata"]["labels"].get(key) == value
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                if "watch" not in params:
+                    items = server.lists[0]
+                    if len(server.lists) > 1:
+                        server.lists.pop(0)
+                    body = {
+                        "kind": "NodeList",
+                        "metadata": {"resourceVersion": "1"},
+                        "items": [n for n in items if selected(n)],
+                    }
+                    self.wfile.write(json.dumps(body).encode())
+                    return
+
+                if not server.watches:
+                    # Hold the watch open for a while, with no changes.
+                    time.sleep(0.5)
+                    return
+                for event in server.watches.pop(0):
+                    if event["type"] != "ERROR" and not selected(
+                        event["object"],
+                    ):
+                        continue
+                    time.sleep(server.watch_delay)
+                    self.wfile.write(json.dumps(event).encode() + b"\n")
+                    self.wfile.flush()
+
+        self.httpd = ThreadingHTTPServer(("localhost", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.httpd.server_address[1]}"
+
+    def __enter__(self) -> "FakeApiServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+
+@pytest.fixture
+def api_server() -> FakeApiServer:
+    with FakeApiServer() as server:
+        yield server
+
+
+def _run(
+    api_server: FakeApiServer,
+    name: str = "node",
+    timeout: float = 10,
+    **env_vars: str,
+) -> subprocess.CompletedProcess:
+    env = os.environ | {
+        "KUBE_SERVER": api_server.url,
+        "KUBE_TOKEN": TOKEN,
+        "NODE_NAME": name,
+        "TIMEOUT": str(timeout),
+        **env_vars,
+    }
+    return subprocess.run(
+        [sys.executable, str(SCRIPT)],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout + 30,
+    )
+
+
+def test_already_ready(api_server: FakeApiServer):
+    api_server.lists = [[_node("node", True)]]
+
+    p = _run(api_server)
+    assert p.returncode == 0, p.stderr
+    assert len(api_server.requests) == 1
+    assert api_server.requests[0] == {
+        "labelSelector": "ios-xr.cisco.com/name=node",
+    }
+
+
+def test_watch(api_server: FakeApiServer):
+    api_server.lists = [[]]
+    api_server.watches = [
+        [
+            {"type": "ADDED", "object": _node("other", True)},
+            {"type": "ADDED", "object": _node("node", None)},
+            {"type": "MODIFIED", "object": _node("node", False)},
+            {"type": "MODIFIED", "object": _node("node", True)},
+        ],
+    ]
+    api_server.watch_delay = 0.1
+
+    p = _run(api_server)
+    assert p.returncode == 0, p.stderr
+    assert len(api_server.requests) == 2
+    assert api_server.requests[1]["watch"] == "1"
+    assert api_server.requests[1]["resourceVersion"] == "1"
+
+
+def test_watch_expired(api_server: FakeApiServer):
+    """If the watch ends, the nodes should be listed again."""
+    api_server.lists = [[_node("node", False)], [_node("node", True)]]
+    api_server.watches = [
+        [
+            {
+                "type": "ERROR",
+                "object": {"code": 410, "message": "too old resource version"},
+            },
+        ],
+    ]
+
+    p = _run(api_server)
+    assert p.returncode == 0, p.stderr
+    assert "too old resource version" in p.stderr
+    assert [r.get("watch") for r in api_server.requests] == [None, "1", None]
+
+
+def test_timeout(api_server: FakeApiServer):
+    api_server.lists = [[_node("node", False), _node("other", True)]]
+
+    start = time.monotonic()
+    p = _run(api_server, timeout=2)
+    assert p.returncode == 1
+    assert "Timed out" in p.stderr
+    assert time.monotonic() - start < 10
+
+
+@pytest.fixture
+def fake_aws(tmp_path: Path) -> Path:
+    """Directory containing a fake AWS CLI, which returns a valid token."""
+    aws = tmp_path / "aws"
+    token = {"status": {"token": TOKEN}}
+    aws.write_text(
+        f"""\
+#!/bin/sh
+echo "$@" >> {tmp_path / "aws-calls"}
+echo '{json.dumps(token)}'
+""",
+    )
+    aws.chmod(0o755)
+    return tmp_path
+
+
+def test_token_refresh(api_server: FakeApiServer, fake_aws: Path):
+    """An expired token should be replaced using the AWS CLI."""
+    api_server.lists = [[_node("node", True)]]
+
+    p = _run(
+        api_server,
+        KUBE_TOKEN="expired",
+        CLUSTER_NAME="cluster",
+        PATH=f"{fake_aws}:{os.environ['PATH']}",
+    )
+    assert p.returncode == 0, p.stderr
+    assert "retrying with a new token" in p.stderr
+    assert (fake_aws / "aws-calls").read_text() == (
+        "eks get-token --cluster-name cluster --output json\n"
+    )
+
+
+def test_token_refresh_credentials(api_server: FakeApiServer, fake_aws: Path):
+    """The token should be fetched with the given region and credentials."""
+    api_server.lists = [[_node("node", True)]]
+
+    p = _run(
+        api_server,
+        KUBE_TOKEN="expired",
+        CLUSTER_NAME="cluster",
+        CLUSTER_REGION="eu-west-1",
+        AWS_CLI_PROFILE="xrd",
+        AWS_CLI_ROLE_ARN="arn:aws:iam::123456789012:role/xrd",
+        PATH=f"{fake_aws}:{os.environ['PATH']}",
+    )
+    assert p.returncode == 0, p.stderr
+    assert (fake_aws / "aws-calls").read_text() == (
+        "eks get-token --cluster-name cluster --output json --region eu-west-1"
+        " --profile xrd --role-arn arn:aws:iam::123456789012:role/xrd\n"
+    )
+
+
+def test_token_rejected(api_server: FakeApiServer):
+    """A rejected token is fatal if it cannot be refreshed."""
+    p = _run(api_server, KUBE_TOKEN="expired")
+    assert p.returncode != 0
+    assert "401" in p.stderr
@@ -1,62 +1,280 @@
-__all__ = ("run_cmd",)
+__all__ = (
+    "run_cmd",
+    "run_cmd_async",
+)
 
 
+import asyncio
+import codecs
 import logging
+import os
+import selectors
 import shlex
 import subprocess
+from typing import IO, Callable
 
 logger = logging.getLogger(__name__)
 
 
+class _LineBuffer:
+    """
+    Accumulates the output of a stream, splitting it into lines.
+
+    Output is collected into a list of chunks which is only joined once the
+    stream is closed, so the cost is linear in the size of the output.
+
+    """
+
+    def __init__(self, name: str, encoding: str):
+        self.name = name
+        self._decoder = codecs.getincrementaldecoder(encoding)(
+            errors="replace",
+        )
+        self._chunks: list[str] = []
+        self._partial: list[str] = []
+
+    def feed(self, data: bytes) -> list[str]:
+        """
+        Add data read from the stream.
+
+        :returns:
+            The lines completed by this data, including the trailing newline.
+
+        """
+        return self._split(self._decoder.decode(data))
+
+    def close(self) -> list[str]:
+        """
+        Mark the stream as closed.
+
+        :returns:
+            Any final unterminated line.
+
+        """
+        lines = self._split(self._decoder.decode(b"", final=True))
+        if self._partial:
+            lines.append("".join(self._partial))
+            self._partial = []
+        return lines
+
+    def _split(self, text: str) -> list[str]:
+        if not text:
+            return []
+        self._chunks.append(text)
+        *complete, last = text.split("\n")
+        lines = []
+        if complete:
+            complete[0] = "".join(self._partial) + complete[0]
+            lines = [line + "\n" for line in complete]
+            self._partial = []
+        if last:
+            self._partial.append(last)
+        return lines
+
+    def getvalue(self) -> str:
+        return "".join(self._chunks)
+
+
+def _drain(
+    streams: dict[IO[bytes], _LineBuffer],
+    on_line: Callable[[str, str], None],
+) -> None:
+    """
+    Read from the given streams concurrently until they are all closed.
+
+    :param streams:
+        Mapping of the stream to read to the buffer to read it into.
+
+    :param on_line:
+        Called with the name of the stream and the line for each line read.
+
+    """
+    with selectors.DefaultSelector() as sel:
+        for stream in streams:
+            sel.register(stream, selectors.EVENT_READ)
+        while sel.get_map():
+            for key, _ in sel.select():
+                buf = streams[key.fileobj]
+                data = os.read(key.fd, 65536)
+                if data:
+                    lines = buf.feed(data)
+                else:
+                    sel.unregister(key.fileobj)
+                    lines = buf.close()
+                for line in lines:
+                    on_line(buf.name, line)
+
+
 def run_cmd(
     cmd: list[str],
     *,
     check: bool = True,
     log_output: bool = True,
+    on_line: Callable[[str, str], None] | None = None,
+    on_start: Callable[[int], None] | None = None,
+    encoding: str = "utf-8",
     **kwargs,
 ) -> subprocess.CompletedProcess[str]:
+    """
+    Run a command, capturing its output.
+
+    Stdout and stderr are read concurrently as the command runs, so neither
+    pipe can fill up and block the command.
+
+    :param cmd:
+        The command to run.
+
+    :param check:
+        Raise `subprocess.CalledProcessError` if the command fails.
+
+    :param log_output:
+        Log each line of stdout as it is read.
+
+    :param on_line:
+        Called for each line of output as it is read, with the name of the
+        stream ("stdout" or "stderr") and the line (including any trailing
+        newline).
+
+    :param on_start:
+        Called with the process ID once the command has started.
+
+    :param encoding:
+        Encoding of the command's output.
+
+    :param kwargs:
+        Passed to `subprocess.Popen`.
+
+    """
     kwargs = {
-        "bufsize": 1,
-        "encoding": "utf-8",
         "stdout": subprocess.PIPE,
         "stderr": subprocess.PIPE,
-        "text": True,
         **kwargs,
     }
 
     logger.info("Running command: %s", shlex.join(cmd))
 
     with subprocess.Popen(cmd, **kwargs) as p:
-        if log_output:
-            stdout = ""
-            for line in p.stdout:
-                stdout += line
-                logger.debug(line.rstrip())
+        if on_start:
+            on_start(p.pid)
+        bufs = {}
+        if p.stdout:
+            bufs[p.stdout] = _LineBuffer("stdout", encoding)
+        if p.stderr:
+            bufs[p.stderr] = _LineBuffer("stderr", encoding)
+        _drain(
+            bufs,
+            lambda name, line: _handle_line(name, line, log_output, on_line),
+        )
+        p.wait()
 
-        maybe_stdout, stderr = p.communicate()
+    stdout = bufs[p.stdout].getvalue() if p.stdout else None
+    stderr = bufs[p.stderr].getvalue() if p.stderr else None
 
-        if not log_output:
-            stdout = maybe_stdout
+    return _result(cmd, p.returncode, stdout, stderr, check, log_output)
 
-    if check and p.returncode != 0:
+
+async def run_cmd_async(
+    cmd: list[str],
+    *,
+    check: bool = True,
+    log_output: bool = True,
+    on_line: Callable[[str, str], None] | None = None,
+    on_start: Callable[[int], None] | None = None,
+    encoding: str = "utf-8",
+    **kwargs,
+) -> subprocess.CompletedProcess[str]:
+    """
+    Run a command asynchronously, capturing its output.
+
+    This is the asynchronous counterpart to `run_cmd`, which it mirrors.
+
+    :param kwargs:
+        Passed to `asyncio.create_subprocess_exec`.
+
+    """
+    kwargs = {
+        "stdout": asyncio.subprocess.PIPE,
+        "stderr": asyncio.subprocess.PIPE,
+        **kwargs,
+    }
+
+    logger.info("Running command: %s", shlex.join(cmd))
+
+    async def read(stream: asyncio.StreamReader, buf: _LineBuffer) -> None:
+        while data := await stream.read(65536):
+            for line in buf.feed(data):
+                _handle_line(buf.name, line, log_output, on_line)
+        for line in buf.close():
+            _handle_line(buf.name, line, log_output, on_line)
+
+    p = await asyncio.create_subprocess_exec(*cmd, **kwargs)
+    if on_start:
+        on_start(p.pid)
+    bufs = {}
+    if p.stdout:
+        bufs[p.stdout] = _LineBuffer("stdout", encoding)
+    if p.stderr:
+        bufs[p.stderr] = _LineBuffer("stderr", encoding)
+    try:
+        await asyncio.gather(
+            *(read(stream, buf) for stream, buf in bufs.items()),
+        )
+        await p.wait()
+    except asyncio.CancelledError:
+        # Give the command the chance to exit gracefully - Terraform handles
+        # SIGTERM by stopping any in-progress operations cleanly.
+        if p.returncode is None:
+            p.terminate()
+            await asyncio.shield(p.wait())
+        raise
+
+    stdout = bufs[p.stdout].getvalue() if p.stdout else None
+    stderr = bufs[p.stderr].getvalue() if p.stderr else None
+
+    return _result(cmd, p.returncode, stdout, stderr, check, log_output)
+
+
+def _handle_line(
+    name: str,
+    line: str,
+    log_output: bool,
+    on_line: Callable[[str, str], None] | None,
+) -> None:
+    if log_output and name == "stdout":
+        logger.debug(line.rstrip())
+    if on_line:
+        on_line(name, line)
+
+
+def _result(
+    cmd: list[str],
+    returncode: int,
+    stdout: str | None,
+    stderr: str | None,
+    check: bool,
+    log_output: bool,
+) -> subprocess.CompletedProcess[str]:
+    """
+    Create the result of running a command.
+
+    :raises subprocess.CalledProcessError:
+        If ``check`` is true and the command failed.
+
+    """
+    if check and returncode != 0:
         stdout_msg = ""
         stderr_msg = ""
-        if p.stdout and not log_output:
+        if stdout and not log_output:
             # Print stdout if we have not already done so.
             stdout_msg = f"\nstdout:\n{stdout}"
-        if p.stderr:
+        if stderr:
             stderr_msg = f"\nstderr:\n{stderr}"
         logger.info(
             "Command failed with exit code: %s%s%s",
-            p.returncode,
+            returncode,
             stdout_msg,
             stderr_msg,
         )
-        raise subprocess.CalledProcessError(p.returncode, cmd)
-
-    return subprocess.CompletedProcess(
-        p.args,
-        p.returncode,
-        stdout,
-        stderr,
-    )
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+    return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)